@@ -0,0 +1,283 @@
+"""
+In-process load driver for the synthetic dataset.
+
+Each scenario is one kind of request: a menu page, add-to-cart, a checkout,
+the kanban board, or an owner report. The driver repeats it through Django's
+test client and times it. The numbers cover routing, middleware, views,
+queries and templates, but not the network or the WSGI server. Any setup a
+request needs, such as filling the cart before a checkout, happens outside
+the timed part.
+
+``run_scenario()`` returns throughput, latency percentiles and the average
+query count. A scenario with any response of 400 or above is reported as
+failed, without numbers: timing an error page says nothing about the view.
+``compare()`` lines up two result sets so runs can be compared, skipping
+failed scenarios on either side.
+
+The menu, orders and dashboard apps' templates are not in this tree, so
+their pages (menu_list, menu_category, menu_item, menu_search,
+order_management, owner_overview and the dashboard reports) fail with
+TemplateDoesNotExist and can't be measured until the templates exist.
+"""
+import math
+import time
+from collections import namedtuple
+from datetime import timedelta
+
+from django.core.cache import caches
+from django.db import connections
+from django.test import Client
+from django.utils import timezone
+
+from accounts.models import User
+from foodapp.kanban import latest_cursor
+from menu.models import Category, MenuItem
+from orders.models import Order
+from .synthetic import ADMIN_USERNAME, CUSTOMER_USERNAME
+
+# What to send: the client to use, HTTP method, path and form data
+Request = namedtuple('Request', 'client method path data')
+
+# name -> (group, function(context, iteration) -> Request)
+SCENARIOS = {}
+
+SEARCH_TERMS = ['chicken', 'spicy', 'burg', 'pasta', 'lemon', 'veg', 'crispy prawn', 'curry']
+
+
+def scenario(name, group):
+    def register(function):
+        SCENARIOS[name] = (group, function)
+        return function
+    return register
+
+
+def select_scenarios(names):
+    """Scenario names for a list of scenario and group names (all of them if empty)."""
+    if not names:
+        return list(SCENARIOS)
+    selected = []
+    for name in names:
+        matches = [key for key, (group, _) in SCENARIOS.items() if name in (key, group)]
+        if not matches:
+            raise ValueError(name)
+        selected.extend(match for match in matches if match not in selected)
+    return selected
+
+
+class LoadContext:
+    """Logged-in clients and the objects the scenarios pick from."""
+
+    def __init__(self):
+        self.customer = Client(raise_request_exception=False)
+        self.customer.force_login(User.objects.get(username=CUSTOMER_USERNAME.format(0)))
+        self.owner = Client(raise_request_exception=False)
+        self.owner.force_login(User.objects.get(username=ADMIN_USERNAME))
+        self.categories = list(Category.objects.filter(is_active=True).values_list('slug', flat=True))
+        self.menu_items = list(MenuItem.objects.filter(is_available=True).values_list('id', 'slug'))
+        self.kanban_cursor = latest_cursor()
+        self.today = timezone.localdate()
+
+    def menu_item(self, iteration):
+        return self.menu_items[iteration % len(self.menu_items)]
+
+    def date_range(self, days):
+        return {'start_date': (self.today - timedelta(days=days)).isoformat(), 'end_date': self.today.isoformat()}
+
+
+# Paths are those of food_ordering_system.urls
+
+@scenario('menu', 'menu')
+def menu(context, iteration):
+    return Request(context.customer, 'GET', '/menu/', None)
+
+
+@scenario('menu_list', 'menu')
+def menu_list(context, iteration):
+    return Request(context.customer, 'GET', '/menu/menu/', None)
+
+
+@scenario('menu_category', 'menu')
+def menu_category(context, iteration):
+    slug = context.categories[iteration % len(context.categories)]
+    return Request(context.customer, 'GET', f'/menu/menu/category/{slug}/', None)
+
+
+@scenario('menu_item', 'menu')
+def menu_item(context, iteration):
+    return Request(context.customer, 'GET', f'/menu/menu/item/{context.menu_item(iteration)[1]}/', None)
+
+
+@scenario('menu_search', 'menu')
+def menu_search(context, iteration):
+    return Request(context.customer, 'GET', '/menu/search/', {'q': SEARCH_TERMS[iteration % len(SEARCH_TERMS)]})
+
+
+@scenario('add_to_cart', 'cart')
+def add_to_cart(context, iteration):
+    return Request(context.customer, 'POST', f'/orders/cart/add/{context.menu_item(iteration)[0]}/', {'quantity': 1})
+
+
+@scenario('checkout', 'checkout')
+def checkout(context, iteration):
+    context.customer.post(f'/orders/cart/add/{context.menu_item(iteration)[0]}/', {'quantity': 1})
+    return Request(context.customer, 'POST', '/orders/checkout/delivery/', {
+        'customer_name': 'Load Test',
+        'customer_phone': '555-0100',
+        'customer_email': 'load@example.com',
+        'delivery_address': '1 Benchmark Street',
+        'payment_method': Order.PaymentMethod.CASH,
+    })
+
+
+@scenario('kanban_board', 'kanban')
+def kanban_board(context, iteration):
+    return Request(context.owner, 'GET', '/manager/', None)
+
+
+@scenario('kanban_changes', 'kanban')
+def kanban_changes(context, iteration):
+    return Request(context.owner, 'GET', '/manager/changes/', {'cursor': context.kanban_cursor})
+
+
+@scenario('order_management', 'kanban')
+def order_management(context, iteration):
+    return Request(context.owner, 'GET', '/dashboard/orders/', None)
+
+
+@scenario('owner_dashboard', 'reports')
+def owner_dashboard(context, iteration):
+    return Request(context.owner, 'GET', '/owner/', None)
+
+
+@scenario('owner_overview', 'reports')
+def owner_overview(context, iteration):
+    return Request(context.owner, 'GET', '/dashboard/owner/', None)
+
+
+@scenario('daily_report', 'reports')
+def daily_report(context, iteration):
+    return Request(context.owner, 'GET', '/dashboard/owner/reports/daily/', None)
+
+
+@scenario('weekly_report', 'reports')
+def weekly_report(context, iteration):
+    return Request(context.owner, 'GET', '/dashboard/owner/reports/weekly/', None)
+
+
+@scenario('monthly_report', 'reports')
+def monthly_report(context, iteration):
+    return Request(context.owner, 'GET', '/dashboard/owner/reports/monthly/', None)
+
+
+@scenario('yearly_report', 'reports')
+def yearly_report(context, iteration):
+    return Request(context.owner, 'GET', '/dashboard/owner/reports/yearly/', None)
+
+
+@scenario('custom_report', 'reports')
+def custom_report(context, iteration):
+    return Request(context.owner, 'POST', '/dashboard/owner/reports/custom/', context.date_range(365))
+
+
+@scenario('sales_data', 'reports')
+def sales_data(context, iteration):
+    return Request(context.owner, 'GET', '/dashboard/api/sales-data/', context.date_range(90))
+
+
+@scenario('category_sales', 'reports')
+def category_sales(context, iteration):
+    return Request(context.owner, 'GET', '/dashboard/api/category-sales/', context.date_range(90))
+
+
+@scenario('expense_breakdown', 'reports')
+def expense_breakdown(context, iteration):
+    return Request(context.owner, 'GET', '/dashboard/api/expense-breakdown/', context.date_range(90))
+
+
+def percentile(ordered, percent):
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return None
+    return ordered[max(math.ceil(percent / 100 * len(ordered)) - 1, 0)]
+
+
+def run_scenario(context, name, requests, warmup=0, cold_cache=False):
+    _, function = SCENARIOS[name]
+    result = {'scenario': name, 'requests': requests, 'error': None}
+    for iteration in range(warmup):
+        request = function(context, iteration)
+        response = send(request)
+        if response.status_code >= 400:
+            return failed(result, request, response)
+
+    query_count = 0
+
+    def count_queries(execute, sql, params, many, query_context):
+        nonlocal query_count
+        query_count += 1
+        return execute(sql, params, many, query_context)
+
+    timings = []
+    for iteration in range(warmup, warmup + requests):
+        request = function(context, iteration)
+        if cold_cache:
+            for cache in caches.all():
+                cache.clear()
+        with connections['default'].execute_wrapper(count_queries):
+            started = time.perf_counter()
+            response = send(request)
+            timings.append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            return failed(result, request, response)
+
+    total = sum(timings)
+    timings.sort()
+    return {
+        **result,
+        'seconds': round(total, 4),
+        'throughput': round(requests / total, 2) if total else None,
+        'mean_ms': round(total / requests * 1000, 2) if requests else None,
+        'p50_ms': milliseconds(percentile(timings, 50)),
+        'p95_ms': milliseconds(percentile(timings, 95)),
+        'p99_ms': milliseconds(percentile(timings, 99)),
+        'max_ms': milliseconds(timings[-1] if timings else None),
+        'queries': round(query_count / requests, 1) if requests else None,
+    }
+
+
+def failed(result, request, response):
+    """Result for a scenario stopped by an error response: no timings, just what failed."""
+    error = f'HTTP {response.status_code} from {request.method} {request.path}'
+    # The test client keeps the exception behind a 500
+    exc_info = getattr(response, 'exc_info', None)
+    if exc_info:
+        error += f' ({exc_info[0].__name__}: {exc_info[1]})'
+    return {**result, 'error': error}
+
+
+def send(request):
+    if request.method == 'GET':
+        return request.client.get(request.path, request.data)
+    return request.client.post(request.path, request.data)
+
+
+def milliseconds(value):
+    return None if value is None else round(value * 1000, 2)
+
+
+def compare(results, baseline):
+    """``(scale, scenario, baseline p95, p95, change %)`` for scenarios in both result sets."""
+    previous = {
+        (run['scale'], row['scenario']): row.get('p95_ms')
+        for run in baseline.get('runs', []) for row in run['scenarios']
+    }
+    rows = []
+    for run in results['runs']:
+        for row in run['scenarios']:
+            before = previous.get((run['scale'], row['scenario']))
+            # Failed scenarios have no p95 on either side
+            if before is None or row.get('p95_ms') is None:
+                continue
+            change = (row['p95_ms'] - before) / before * 100 if before else None
+            rows.append((run['scale'], row['scenario'], before, row['p95_ms'], change))
+    return rows
@@ -0,0 +1,430 @@
+"""
+Synthetic restaurant data for benchmarks and load tests.
+
+``SyntheticDataset.generate()`` creates customers and staff, a menu with
+variants, carts, expenses, and orders for both the ``orders`` and the
+``foodapp`` apps spread over several years, with more orders at meal times,
+on weekends and as the restaurant grows. The same seed always gives the same
+data.
+
+Everything is written with ``bulk_create`` in batches, so model ``save()``
+methods and signals don't run: business dates and order and cart totals are
+filled in here, and ``refresh_derived_data()`` rebuilds the report rollups,
+search index and menu catalogs afterwards. Relies on ``bulk_create``
+returning primary keys (SQLite 3.35+, PostgreSQL, MariaDB 10.5+).
+"""
+import io
+import random
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.utils import timezone
+from django.utils.text import slugify
+
+from accounts.models import User
+from dashboard.models import Expense
+from database.transactions import write_atomic
+from foodapp import catalog as foodapp_catalog
+from foodapp import models as foodapp
+from menu import catalog as menu_catalog
+from menu.models import Category, MenuItem, MenuItemVariant
+from orders.models import Cart, CartItem, Order, OrderItem
+
+ADMIN_USERNAME = 'synthetic-admin'
+MANAGER_USERNAME = 'synthetic-manager'
+CUSTOMER_USERNAME = 'synthetic-customer-{:06d}'
+DEFAULT_PASSWORD = 'synthetic'
+
+CENT = Decimal('0.01')
+TAX_RATE = Decimal('0.08')
+DELIVERY_FEE = Decimal('2.99')
+
+CATEGORY_NAMES = [
+    'Burgers', 'Pizza', 'Pasta', 'Salads', 'Soups', 'Curries', 'Noodles', 'Rice Bowls',
+    'Grill', 'Seafood', 'Sandwiches', 'Wraps', 'Sides', 'Desserts', 'Drinks', 'Breakfast',
+]
+DISH_ADJECTIVES = [
+    'Classic', 'Spicy', 'Smoky', 'Crispy', 'Garlic', 'Lemon', 'Honey', 'Truffle',
+    'Herb', 'Chili', 'Sesame', 'Tandoori', 'Cajun', 'Teriyaki', 'Pesto', 'BBQ',
+]
+DISH_MAINS = [
+    'Chicken', 'Beef', 'Paneer', 'Prawn', 'Mushroom', 'Tofu', 'Lamb', 'Salmon',
+    'Halloumi', 'Falafel', 'Pork', 'Veggie',
+]
+# (name, price adjustment)
+VARIANTS = [
+    ('Small', Decimal('-1.50')), ('Large', Decimal('2.00')), ('Family', Decimal('6.50')),
+    ('Extra cheese', Decimal('1.25')), ('Extra spicy', Decimal('0.50')), ('Gluten free', Decimal('1.00')),
+]
+FIRST_NAMES = [
+    'Aisha', 'Ben', 'Carla', 'Dev', 'Elena', 'Farhan', 'Grace', 'Hiro', 'Imran', 'Julia',
+    'Karim', 'Lena', 'Mateo', 'Nadia', 'Omar', 'Priya', 'Quinn', 'Rafi', 'Sara', 'Tariq',
+]
+LAST_NAMES = [
+    'Ahmed', 'Brown', 'Chowdhury', 'Diaz', 'Evans', 'Fischer', 'Gupta', 'Hossain', 'Ito', 'Khan',
+    'Lopez', 'Miller', 'Nguyen', 'Okafor', 'Patel', 'Rahman', 'Smith', 'Tanaka', 'Uddin', 'Wilson',
+]
+STREETS = ['Lake Road', 'Station Street', 'Park Avenue', 'Mill Lane', 'High Street', 'Garden Row']
+
+# Relative order volume by hour of day (local time): lunch and dinner peaks
+HOUR_WEIGHTS = [
+    0, 0, 0, 0, 0, 0, 1, 2, 4, 4, 5, 9, 14, 12, 6, 4, 5, 9, 14, 15, 11, 7, 4, 1,
+]
+ITEM_COUNT_WEIGHTS = [35, 30, 20, 10, 5]
+QUANTITY_WEIGHTS = [70, 22, 8]
+CANCELLED_SHARE = 0.06
+
+
+@contextmanager
+def historical_timestamps(*models):
+    """Let ``bulk_create`` keep the auto_now/auto_now_add values it is given."""
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def local_date(value):
+    return timezone.localdate(value) if settings.USE_TZ else value.date()
+
+
+def money(value):
+    return Decimal(value).quantize(CENT)
+
+
+class SyntheticDataset:
+    def __init__(self, orders=100000, foodapp_orders=None, users=1000, categories=12, items_per_category=12,
+                 years=3, carts=200, batch_size=5000, seed=0, password=DEFAULT_PASSWORD, progress=None):
+        self.orders = orders
+        self.foodapp_orders = orders if foodapp_orders is None else foodapp_orders
+        self.users = max(users, 1)
+        self.categories = min(max(categories, 1), len(CATEGORY_NAMES))
+        self.items_per_category = max(items_per_category, 1)
+        self.years = max(years, 1)
+        self.carts = min(carts, self.users)
+        self.batch_size = max(batch_size, 1)
+        self.password = password
+        self.progress = progress or (lambda message: None)
+        self.random = random.Random(seed)
+        self.now = timezone.now()
+        self.today = local_date(self.now)
+
+    def generate(self):
+        """Create the whole dataset and return the number of rows created per model."""
+        counts = {}
+        with historical_timestamps(
+            Order, foodapp.Order, Expense, foodapp.Expense, Category, MenuItem, Cart, CartItem
+        ):
+            counts['users'] = self.create_users()
+            counts['menu_items'] = self.create_menu()
+            counts['carts'] = self.create_carts()
+            counts['expenses'] = self.create_expenses()
+            counts['orders'], counts['order_items'] = self.create_orders()
+            counts['foodapp_orders'], counts['foodapp_order_items'] = self.create_foodapp_orders()
+        return counts
+
+    # Calendar
+
+    def day_weights(self):
+        # Volume grows over the years and is higher on Fridays and weekends
+        days = [self.today - timedelta(days=offset) for offset in range(self.years * 365)][::-1]
+        weights = []
+        for position, day in enumerate(days):
+            growth = 0.5 + 0.5 * position / max(len(days) - 1, 1)
+            weekend = 1.35 if day.weekday() >= 4 else 1.0
+            weights.append(growth * weekend)
+        return days, weights
+
+    def timestamps(self, count):
+        """``count`` order times, in ascending order, none in the future."""
+        days, weights = self.day_weights()
+        chosen_days = self.random.choices(days, weights=weights, k=count)
+        hours = self.random.choices(range(24), weights=HOUR_WEIGHTS, k=count)
+        stamps = []
+        for day, hour in zip(chosen_days, hours):
+            stamp = self.at(day) + timedelta(hours=hour, seconds=self.random.randrange(3600))
+            stamps.append(min(stamp, self.now - timedelta(seconds=self.random.randrange(1, 3600))))
+        stamps.sort()
+        return stamps
+
+    def at(self, day, hour=0):
+        value = datetime.combine(day, time(hour))
+        return timezone.make_aware(value) if settings.USE_TZ else value
+
+    def batches(self, values):
+        for start in range(0, len(values), self.batch_size):
+            yield values[start:start + self.batch_size]
+
+    # People
+
+    def create_users(self):
+        self.progress(f'Creating {self.users} customers and the staff accounts...')
+        password = make_password(self.password)
+        staff = [
+            User(username=ADMIN_USERNAME, password=password, role=User.Role.ADMIN, first_name='Synthetic',
+                 last_name='Owner', email='owner@example.com', is_staff=True, is_superuser=True),
+            User(username=MANAGER_USERNAME, password=password, role=User.Role.MANAGER, first_name='Synthetic',
+                 last_name='Manager', email='manager@example.com', is_staff=True),
+        ]
+        customers = []
+        for number in range(self.users):
+            first_name = self.random.choice(FIRST_NAMES)
+            last_name = self.random.choice(LAST_NAMES)
+            customers.append(User(
+                username=CUSTOMER_USERNAME.format(number), password=password, role=User.Role.CUSTOMER,
+                first_name=first_name, last_name=last_name,
+                email=f'{first_name.lower()}.{last_name.lower()}.{number}@example.com',
+                phone_number=f'555-{number % 10000:04d}',
+                address=f'{self.random.randrange(1, 300)} {self.random.choice(STREETS)}',
+            ))
+        with write_atomic():
+            self.admin, self.manager = User.objects.bulk_create(staff)
+            self.customers = []
+            for batch in self.batches(customers):
+                self.customers.extend(User.objects.bulk_create(batch))
+
+        # foodapp's walk-in customers mirror the accounts
+        with write_atomic():
+            self.foodapp_customers = []
+            for batch in self.batches([
+                foodapp.Customer(name=user.get_full_name(), phone=user.phone_number, address=user.address)
+                for user in self.customers
+            ]):
+                self.foodapp_customers.extend(foodapp.Customer.objects.bulk_create(batch))
+        return len(staff) + len(customers)
+
+    # Menu
+
+    def create_menu(self):
+        self.progress(f'Creating {self.categories} categories of {self.items_per_category} menu items...')
+        created_at = self.now - timedelta(days=self.years * 365)
+        dish_names = [f'{adjective} {main}' for adjective in DISH_ADJECTIVES for main in DISH_MAINS]
+
+        with write_atomic():
+            categories = Category.objects.bulk_create([
+                Category(name=name, slug=f'synthetic-{slugify(name)}', description=f'Our {name.lower()}.',
+                         created_at=created_at, updated_at=created_at)
+                for name in CATEGORY_NAMES[:self.categories]
+            ])
+            menu_items = []
+            for category in categories:
+                for name in self.random.sample(dish_names, min(self.items_per_category, len(dish_names))):
+                    item_name = f'{name} {category.name.rstrip("s")}'
+                    menu_items.append(MenuItem(
+                        name=item_name, slug=f'synthetic-{slugify(item_name)}-{len(menu_items)}',
+                        category=category, description=f'{name} with house sauce, made to order.',
+                        price=money(self.random.uniform(4, 24)), image='menu_images/synthetic.jpg',
+                        is_vegetarian=self.random.random() < 0.3, is_gluten_free=self.random.random() < 0.15,
+                        is_available=self.random.random() < 0.95,
+                        preparation_time=self.random.choice([5, 10, 12, 15, 20, 25, 30]),
+                        created_at=created_at, updated_at=created_at,
+                    ))
+            self.menu_items = MenuItem.objects.bulk_create(menu_items)
+            variants = []
+            for item in self.menu_items:
+                for name, adjustment in self.random.sample(VARIANTS, self.random.choice([0, 0, 1, 2, 3])):
+                    variants.append(MenuItemVariant(menu_item=item, name=name, price_adjustment=adjustment))
+            self.variants = {}
+            for variant in MenuItemVariant.objects.bulk_create(variants):
+                self.variants.setdefault(variant.menu_item_id, []).append(variant)
+
+            # The same menu for foodapp's counter orders
+            foodapp_categories = foodapp.Category.objects.bulk_create([
+                foodapp.Category(name=f'{category.name} (synthetic)', display_order=position)
+                for position, category in enumerate(categories)
+            ])
+            by_name = {category.name: foodapp_category for category, foodapp_category in zip(categories, foodapp_categories)}
+            self.foodapp_menu_items = foodapp.MenuItem.objects.bulk_create([
+                foodapp.MenuItem(name=item.name, category=by_name[item.category.name], price=item.price,
+                                 description=item.description, is_available=item.is_available)
+                for item in self.menu_items
+            ])
+        return len(self.menu_items) + len(self.foodapp_menu_items)
+
+    def order_lines(self):
+        """Random (menu item, variant, quantity) lines for one order."""
+        lines = []
+        for _ in range(self.random.choices(range(1, len(ITEM_COUNT_WEIGHTS) + 1), weights=ITEM_COUNT_WEIGHTS)[0]):
+            item = self.random.choice(self.menu_items)
+            variants = self.variants.get(item.pk)
+            variant = self.random.choice(variants) if variants and self.random.random() < 0.35 else None
+            quantity = self.random.choices(range(1, len(QUANTITY_WEIGHTS) + 1), weights=QUANTITY_WEIGHTS)[0]
+            lines.append((item, variant, quantity))
+        return lines
+
+    # Carts and expenses
+
+    def create_carts(self):
+        self.progress(f'Creating {self.carts} open carts...')
+        with write_atomic():
+            carts = Cart.objects.bulk_create([
+                Cart(user=user, created_at=self.now, updated_at=self.now) for user in self.customers[:self.carts]
+            ])
+            cart_items = []
+            for cart in carts:
+                seen = set()
+                for item, variant, quantity in self.order_lines():
+                    key = (item.pk, variant and variant.pk)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    cart_items.append(CartItem(
+                        cart=cart, menu_item=item, variant=variant, quantity=quantity,
+                        created_at=self.now, updated_at=self.now
+                    ))
+            CartItem.objects.bulk_create(cart_items, batch_size=self.batch_size)
+            # bulk_create skips CartItem.save(), which keeps the stored totals current
+            Cart.objects.filter(pk__in=[cart.pk for cart in carts]).recompute_totals()
+        return len(carts)
+
+    def create_expenses(self):
+        self.progress('Creating daily expenses...')
+        days, _ = self.day_weights()
+        categories = [choice for choice, _ in Expense.ExpenseCategory.choices]
+        expenses = []
+        foodapp_expenses = []
+        for day in days:
+            stamp = min(self.at(day, 9), self.now)
+            for _ in range(self.random.choice([0, 1, 1, 2, 3])):
+                category = self.random.choice(categories)
+                expenses.append(Expense(
+                    title=f'{category.title()} {day:%b %d}', amount=money(self.random.uniform(15, 600)),
+                    category=category, date=day, created_by=self.admin, created_at=stamp, updated_at=stamp
+                ))
+            if self.random.random() < 0.6:
+                foodapp_expenses.append(foodapp.Expense(
+                    description=f'Supplies {day:%b %d}', amount=money(self.random.uniform(10, 250)), date=day
+                ))
+        with write_atomic():
+            Expense.objects.bulk_create(expenses, batch_size=self.batch_size)
+            foodapp.Expense.objects.bulk_create(foodapp_expenses, batch_size=self.batch_size)
+        return len(expenses) + len(foodapp_expenses)
+
+    # Orders
+
+    def order_status(self, created_at, order_type):
+        if self.random.random() < CANCELLED_SHARE:
+            return Order.OrderStatus.CANCELLED
+        completed = Order.OrderStatus.DELIVERED if order_type == Order.OrderType.DELIVERY else Order.OrderStatus.PICKED_UP
+        if self.now - created_at > timedelta(hours=2):
+            return completed
+        live = [Order.OrderStatus.NEW, Order.OrderStatus.PREPARING, Order.OrderStatus.READY, completed]
+        if order_type == Order.OrderType.DELIVERY:
+            live.append(Order.OrderStatus.OUT_FOR_DELIVERY)
+        return self.random.choice(live)
+
+    def create_orders(self):
+        self.progress(f'Creating {self.orders} orders...')
+        order_count = item_count = 0
+        number = 0
+        for stamps in self.batches(self.timestamps(self.orders)):
+            orders = []
+            lines_per_order = []
+            for created_at in stamps:
+                number += 1
+                customer = self.random.choice(self.customers)
+                order_type = Order.OrderType.DELIVERY if self.random.random() < 0.65 else Order.OrderType.PICKUP
+                status = self.order_status(created_at, order_type)
+                lines = self.order_lines()
+                subtotal = sum(
+                    ((item.price + (variant.price_adjustment if variant else 0)) * quantity
+                     for item, variant, quantity in lines),
+                    Decimal('0')
+                )
+                tax = money(subtotal * TAX_RATE)
+                delivery_fee = DELIVERY_FEE if order_type == Order.OrderType.DELIVERY else Decimal('0')
+                updated_at = min(created_at + timedelta(minutes=self.random.randrange(15, 75)), self.now)
+                finished = status in (Order.OrderStatus.DELIVERED, Order.OrderStatus.PICKED_UP)
+                orders.append(Order(
+                    user=customer, order_number=f'SYN{number:010d}', status=status, order_type=order_type,
+                    customer_name=customer.get_full_name(), customer_phone=customer.phone_number,
+                    customer_email=customer.email,
+                    delivery_address=customer.address if order_type == Order.OrderType.DELIVERY else '',
+                    payment_status=(
+                        Order.PaymentStatus.PAID if finished
+                        else Order.PaymentStatus.REFUNDED if status == Order.OrderStatus.CANCELLED
+                        else Order.PaymentStatus.PENDING
+                    ),
+                    payment_method=self.random.choice(Order.PaymentMethod.values),
+                    subtotal=subtotal, tax=tax, delivery_fee=delivery_fee, total=subtotal + tax + delivery_fee,
+                    created_at=created_at, updated_at=updated_at, business_date=local_date(created_at),
+                    actual_delivery_time=updated_at if finished else None,
+                ))
+                lines_per_order.append(lines)
+
+            with write_atomic():
+                Order.objects.bulk_create(orders)
+                items = [
+                    OrderItem(
+                        order=order, menu_item=item, variant=variant.name if variant else '', quantity=quantity,
+                        unit_price=item.price + (variant.price_adjustment if variant else 0),
+                        total_price=(item.price + (variant.price_adjustment if variant else 0)) * quantity,
+                    )
+                    for order, lines in zip(orders, lines_per_order)
+                    for item, variant, quantity in lines
+                ]
+                OrderItem.objects.bulk_create(items)
+            order_count += len(orders)
+            item_count += len(items)
+            self.progress(f'  {order_count} / {self.orders} orders')
+        return order_count, item_count
+
+    def foodapp_status(self, created_at):
+        if self.random.random() < CANCELLED_SHARE:
+            return 'cancelled'
+        if self.now - created_at > timedelta(hours=2):
+            return 'delivered'
+        return self.random.choice(['new', 'kitchen', 'ready', 'delivered'])
+
+    def create_foodapp_orders(self):
+        self.progress(f'Creating {self.foodapp_orders} foodapp orders...')
+        order_count = item_count = 0
+        for stamps in self.batches(self.timestamps(self.foodapp_orders)):
+            orders = []
+            lines_per_order = []
+            for created_at in stamps:
+                lines = [
+                    (self.random.choice(self.foodapp_menu_items), quantity)
+                    for _, _, quantity in self.order_lines()
+                ]
+                orders.append(foodapp.Order(
+                    customer=self.random.choice(self.foodapp_customers), status=self.foodapp_status(created_at),
+                    created_at=created_at,
+                    updated_at=min(created_at + timedelta(minutes=self.random.randrange(10, 60)), self.now),
+                    total_price=sum((item.price * quantity for item, quantity in lines), Decimal('0')),
+                    business_date=local_date(created_at),
+                ))
+                lines_per_order.append(lines)
+
+            with write_atomic():
+                foodapp.Order.objects.bulk_create(orders)
+                items = [
+                    foodapp.OrderItem(order=order, menu_item=item, quantity=quantity, unit_price=item.price)
+                    for order, lines in zip(orders, lines_per_order)
+                    for item, quantity in lines
+                ]
+                foodapp.OrderItem.objects.bulk_create(items)
+            order_count += len(orders)
+            item_count += len(items)
+            self.progress(f'  {order_count} / {self.foodapp_orders} foodapp orders')
+        return order_count, item_count
+
+
+def refresh_derived_data():
+    """Rebuild what the skipped save() methods and signals would have kept current."""
+    call_command('rebuild_daily_summaries', stdout=io.StringIO())
+    call_command('rebuild_menu_search_index', stdout=io.StringIO())
+    menu_catalog.invalidate_catalog()
+    foodapp_catalog.invalidate_catalog()
@@ -0,0 +1,179 @@
+"""
+Small caching toolkit shared by every app.
+
+Entries can carry tags. Each tag has a version number stored in the same
+cache, and the versions of an entry's tags are folded into its key, so
+``invalidate_tags('menu')`` makes every entry tagged ``menu`` unreachable in
+one write; the stale entries are left to expire on their own TTL.
+
+Aliases are looked up in ``settings.CACHES`` and fall back to ``default``, so
+code can ask for e.g. the ``reports`` cache under settings that don't
+define one.
+"""
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+
+DEFAULT_TIMEOUT = 300
+TAG_KEY = 'tag:{tag}'
+
+_missing = object()
+
+
+def get_cache(alias='default'):
+    if alias not in settings.CACHES:
+        alias = 'default'
+    return caches[alias]
+
+
+def tag_versions(tags, alias='default'):
+    """Return the current version of each tag, creating missing ones."""
+    cache = get_cache(alias)
+    keys = [TAG_KEY.format(tag=tag) for tag in tags]
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    for key in missing:
+        # Start from the clock so a lost tag key can't resurrect old entries
+        cache.add(key, time.time_ns(), timeout=None)
+    if missing:
+        versions.update(cache.get_many(missing))
+    return [versions.get(key, 0) for key in keys]
+
+
+def tagged_key(key, tags=(), alias='default'):
+    if not tags:
+        return key
+    versions = tag_versions(tags, alias)
+    return '{}:{}'.format(key, '.'.join(str(version) for version in versions))
+
+
+def invalidate_tags(*tags, alias='default'):
+    """Bump the version of every tag, orphaning all entries that carry it."""
+    cache = get_cache(alias)
+    for tag in tags:
+        key = TAG_KEY.format(tag=tag)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+
+
+class VersionedSnapshot:
+    """
+    One cached object per version of ``tag``, e.g. a menu catalog::
+
+        catalog = VersionedSnapshot('menu:catalog', build_catalog, alias='menu')
+        catalog.get()         # build_catalog(version) on a miss
+        catalog.invalidate()  # next get() builds a new version
+
+    ``build`` is called with the tag's current version, which the snapshot
+    can keep to tell callers when it changed. Old snapshots are never
+    deleted, only orphaned until their timeout.
+    """
+
+    def __init__(self, tag, build, timeout=DEFAULT_TIMEOUT, alias='default'):
+        self.tag = tag
+        self.build = build
+        self.timeout = timeout
+        self.alias = alias
+
+    def current_version(self):
+        return tag_versions([self.tag], alias=self.alias)[0]
+
+    def get(self):
+        cache = get_cache(self.alias)
+        version = self.current_version()
+        key = f'snapshot:{self.tag}:{version}'
+        snapshot = cache.get(key)
+        if snapshot is None:
+            snapshot = self.build(version)
+            cache.set(key, snapshot, self.timeout)
+        return snapshot
+
+    def invalidate(self):
+        invalidate_tags(self.tag, alias=self.alias)
+
+
+def get_or_set(key, default, timeout=DEFAULT_TIMEOUT, tags=(), alias='default'):
+    """Return the cached value for ``key``, calling ``default()`` and storing it on a miss."""
+    cache = get_cache(alias)
+    full_key = tagged_key(key, tags, alias)
+    value = cache.get(full_key, _missing)
+    if value is _missing:
+        value = default()
+        cache.set(full_key, value, timeout)
+    return value
+
+
+class cache_fragment:
+    """
+    Cache a computed fragment (rendered HTML, a list of rows, ...)::
+
+        with cache_fragment('sidebar', timeout=60, tags=['menu']) as fragment:
+            if not fragment.hit:
+                fragment.value = render_sidebar()
+        html = fragment.value
+
+    The value is only stored when the block exits without an exception.
+    """
+
+    def __init__(self, key, timeout=DEFAULT_TIMEOUT, tags=(), alias='default'):
+        self.key = key
+        self.timeout = timeout
+        self.tags = tags
+        self.alias = alias
+        self.value = None
+        self.hit = False
+
+    def __enter__(self):
+        self.cache = get_cache(self.alias)
+        self.full_key = tagged_key(self.key, self.tags, self.alias)
+        value = self.cache.get(self.full_key, _missing)
+        self.hit = value is not _missing
+        if self.hit:
+            self.value = value
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None and not self.hit:
+            self.cache.set(self.full_key, self.value, self.timeout)
+        return False
+
+
+def cache_view(timeout=DEFAULT_TIMEOUT, tags=(), alias='default', per_user=True):
+    """
+    Cache successful GET/HEAD responses of a view by full path.
+
+    With ``per_user`` (the default) authenticated users get their own entries,
+    so place it inside ``login_required`` and never on pages that render a
+    CSRF token.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view_func(request, *args, **kwargs)
+
+            key = f'view:{request.get_full_path()}'
+            if per_user and request.user.is_authenticated:
+                key = f'{key}:user:{request.user.pk}'
+
+            cache = get_cache(alias)
+            full_key = tagged_key(key, tags, alias)
+            response = cache.get(full_key)
+            if response is not None:
+                return response
+
+            response = view_func(request, *args, **kwargs)
+            if response.status_code == 200 and not response.streaming:
+                if hasattr(response, 'render') and callable(response.render):
+                    response.add_post_render_callback(
+                        lambda rendered: cache.set(full_key, rendered, timeout)
+                    )
+                else:
+                    cache.set(full_key, response, timeout)
+            return response
+        return wrapper
+    return decorator
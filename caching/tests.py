@@ -0,0 +1,107 @@
+import shutil
+import tempfile
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from .helpers import VersionedSnapshot, cache_fragment, get_or_set, invalidate_tags
+
+LOCMEM = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'caching-tests'}
+
+
+class CacheBackendMixin:
+    """Runs each test against the local memory stand-in; see FileCacheMixin."""
+
+    def setUp(self):
+        super().setUp()
+        settings_override = override_settings(CACHES={'default': self.cache_settings()})
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        caches['default'].clear()
+
+    def cache_settings(self):
+        return LOCMEM
+
+
+class FileCacheMixin(CacheBackendMixin):
+    def cache_settings(self):
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location, ignore_errors=True)
+        return {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location}
+
+
+class VersionedSnapshotTests(CacheBackendMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.builds = []
+        self.snapshot = VersionedSnapshot('test:catalog', self.build)
+
+    def build(self, version):
+        self.builds.append(version)
+        return {'version': version}
+
+    def test_builds_once_per_version(self):
+        first = self.snapshot.get()
+        self.assertEqual(self.snapshot.get(), first)
+        self.assertEqual(self.builds, [first['version']])
+
+    def test_invalidate_builds_a_new_version(self):
+        first = self.snapshot.get()
+        self.snapshot.invalidate()
+        second = self.snapshot.get()
+        self.assertNotEqual(second['version'], first['version'])
+        self.assertEqual(len(self.builds), 2)
+
+
+class GetOrSetTests(CacheBackendMixin, SimpleTestCase):
+    def test_default_is_only_called_on_a_miss(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return len(calls)
+
+        self.assertEqual(get_or_set('count', compute, tags=['orders']), 1)
+        self.assertEqual(get_or_set('count', compute, tags=['orders']), 1)
+        invalidate_tags('orders')
+        self.assertEqual(get_or_set('count', compute, tags=['orders']), 2)
+
+    def test_none_is_cached(self):
+        calls = []
+        for _ in range(2):
+            get_or_set('nothing', lambda: calls.append(1))
+        self.assertEqual(len(calls), 1)
+
+
+class CacheFragmentTests(CacheBackendMixin, SimpleTestCase):
+    def test_miss_then_hit(self):
+        with cache_fragment('sidebar', tags=['menu']) as fragment:
+            self.assertFalse(fragment.hit)
+            fragment.value = '<ul></ul>'
+        with cache_fragment('sidebar', tags=['menu']) as fragment:
+            self.assertTrue(fragment.hit)
+            self.assertEqual(fragment.value, '<ul></ul>')
+
+        invalidate_tags('menu')
+        with cache_fragment('sidebar', tags=['menu']) as fragment:
+            self.assertFalse(fragment.hit)
+
+    def test_nothing_is_stored_when_the_block_fails(self):
+        with self.assertRaises(ValueError):
+            with cache_fragment('sidebar') as fragment:
+                fragment.value = 'partial'
+                raise ValueError
+        with cache_fragment('sidebar') as fragment:
+            self.assertFalse(fragment.hit)
+
+
+class FileVersionedSnapshotTests(FileCacheMixin, VersionedSnapshotTests):
+    pass
+
+
+class FileGetOrSetTests(FileCacheMixin, GetOrSetTests):
+    pass
+
+
+class FileCacheFragmentTests(FileCacheMixin, CacheFragmentTests):
+    pass
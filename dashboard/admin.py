@@ -1,4 +1,12 @@
-from django.contrib import admin
+import io
+
+from django.contrib import admin, messages
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+
+from .forms import ExpenseImportForm
+from .imports import import_expenses
 from .models import Expense, DailySummary, CategorySales, PopularItem
 
 class CategorySalesInline(admin.TabularInline):
@@ -12,9 +20,54 @@ class PopularItemInline(admin.TabularInline):
 @admin.register(Expense)
 class ExpenseAdmin(admin.ModelAdmin):
     list_display = ('title', 'amount', 'category', 'date', 'created_by')
-    list_filter = ('category', 'date', 'created_by')
+    # Only users who have recorded expenses, not every account
+    list_filter = ('category', 'date', ('created_by', admin.RelatedOnlyFieldListFilter))
+    list_select_related = ('created_by',)
     search_fields = ('title', 'description')
+    autocomplete_fields = ('created_by',)
     date_hierarchy = 'date'
+    change_list_template = 'admin/dashboard/expense/change_list.html'
+    
+    def get_urls(self):
+        return [
+            path(
+                'import-csv/',
+                self.admin_site.admin_view(self.import_csv),
+                name='dashboard_expense_import'
+            ),
+        ] + super().get_urls()
+    
+    def import_csv(self, request):
+        # Supplier statements: streamed, validated row by row and bulk inserted
+        if not self.has_add_permission(request):
+            return redirect('admin:dashboard_expense_changelist')
+        
+        result = None
+        if request.method == 'POST':
+            form = ExpenseImportForm(request.POST, request.FILES)
+            if form.is_valid():
+                stream = io.TextIOWrapper(form.cleaned_data['csv_file'].file, encoding='utf-8-sig', newline='')
+                result = import_expenses(stream, request.user, dry_run=form.cleaned_data['dry_run'])
+                verb = 'would be imported' if form.cleaned_data['dry_run'] else 'imported'
+                if result.unreadable:
+                    messages.error(request, f'The file could not be read, so no expenses {verb}.')
+                else:
+                    messages.success(request, f'{result.created} expense(s) {verb}.')
+                if result.errors:
+                    messages.warning(request, f'{result.error_count} row(s) rejected.')
+                else:
+                    return redirect('admin:dashboard_expense_changelist')
+        else:
+            form = ExpenseImportForm()
+        
+        return TemplateResponse(request, 'admin/dashboard/expense/import_csv.html', {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Import expenses',
+            'form': form,
+            'result': result,
+            'errors': result.errors[:100] if result else [],
+        })
 
 @admin.register(DailySummary)
 class DailySummaryAdmin(admin.ModelAdmin):
@@ -28,10 +81,16 @@ class DailySummaryAdmin(admin.ModelAdmin):
 class CategorySalesAdmin(admin.ModelAdmin):
     list_display = ('summary', 'category_name', 'total_sales', 'items_sold')
     list_filter = ('summary__date', 'category_name')
+    list_select_related = ('summary',)
     search_fields = ('category_name',)
+    raw_id_fields = ('summary',)
+    date_hierarchy = 'summary__date'
 
 @admin.register(PopularItem)
 class PopularItemAdmin(admin.ModelAdmin):
     list_display = ('summary', 'item_name', 'quantity_sold', 'revenue')
     list_filter = ('summary__date',)
+    list_select_related = ('summary',)
     search_fields = ('item_name',)
+    raw_id_fields = ('summary',)
+    date_hierarchy = 'summary__date'
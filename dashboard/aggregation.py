@@ -0,0 +1,63 @@
+"""
+Date-range aggregation helpers shared by the dashboard and foodapp owner views.
+
+This module deliberately imports no models so it can be used from projects
+where the dashboard app itself is not installed.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db.models import F
+from django.db.models.functions import TruncDate
+
+ZERO = Decimal('0.00')
+
+
+def sum_by_day(queryset, date_field, aggregate, start_date, end_date):
+    """
+    Return ``{date: total}`` for every day between ``start_date`` and
+    ``end_date`` using a single grouped query.
+
+    ``date_field`` may be a DateField or a DateTimeField (grouped on its
+    local date) and ``aggregate`` is an aggregate expression such as
+    ``Sum('total')``. Days without rows are zero-filled in Python.
+    """
+    field = queryset.model._meta.get_field(date_field)
+    if field.get_internal_type() == 'DateTimeField':
+        rows = queryset.filter(**{
+            f'{date_field}__date__range': [start_date, end_date]
+        }).annotate(day=TruncDate(date_field))
+    else:
+        rows = queryset.filter(**{
+            f'{date_field}__range': [start_date, end_date]
+        }).annotate(day=F(date_field))
+
+    totals = {
+        row['day']: row['total'] or ZERO
+        for row in rows.order_by().values('day').annotate(total=aggregate)
+    }
+
+    series = {}
+    current_date = start_date
+    while current_date <= end_date:
+        series[current_date] = totals.get(current_date, ZERO)
+        current_date += timedelta(days=1)
+    return series
+
+
+def daily_series(revenue_by_day, expenses_by_day=None):
+    """
+    Merge ``sum_by_day`` results into chart rows of the form
+    ``{'date': 'YYYY-MM-DD', 'revenue': float, 'expenses': float, 'profit': float}``.
+    """
+    expenses_by_day = expenses_by_day or {}
+    data = []
+    for day, revenue in revenue_by_day.items():
+        expenses = expenses_by_day.get(day, ZERO)
+        data.append({
+            'date': day.strftime('%Y-%m-%d'),
+            'revenue': float(revenue),
+            'expenses': float(expenses),
+            'profit': float(revenue - expenses),
+        })
+    return data
@@ -25,6 +25,17 @@ class DateRangeForm(forms.Form):
         required=True
     )
 
+class ExportForm(DateRangeForm):
+    format = forms.ChoiceField(
+        choices=[('csv', 'CSV'), ('jsonl', 'JSON Lines')],
+        widget=forms.Select(attrs={'class': 'form-control'}),
+        required=False
+    )
+
+class ExpenseImportForm(forms.Form):
+    csv_file = forms.FileField(label='CSV file')
+    dry_run = forms.BooleanField(required=False, help_text='Only validate the file')
+
 class OrderStatusUpdateForm(forms.Form):
     status = forms.ChoiceField(
         choices=Order.OrderStatus.choices,
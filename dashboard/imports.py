@@ -0,0 +1,166 @@
+"""
+Bulk expense import from supplier statements.
+
+The CSV is read as a stream, one row at a time. Rows are checked against
+lookups built once per import (category values and labels, the amount
+column's precision), so validation never touches the database. Valid rows
+go in with ``bulk_create`` in batches; invalid rows are skipped and reported
+with their line numbers. The whole import is one transaction: a file that
+can't be read to the end (not UTF-8, broken quoting) inserts nothing.
+
+Expected columns: ``date`` (YYYY-MM-DD), ``title``, ``category`` (value or
+label, any case), ``amount`` and optionally ``description``.
+"""
+import csv
+from contextlib import nullcontext
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from database.transactions import write_atomic
+from .models import Expense
+from .rollups import last_closed_day, rebuild_summaries
+
+BATCH_SIZE = 1000
+REQUIRED_COLUMNS = ('date', 'title', 'category', 'amount')
+
+CENT = Decimal('0.01')
+
+
+class UnreadableFile(Exception):
+    pass
+
+
+class ImportResult:
+    def __init__(self):
+        self.created = 0
+        self.errors = []
+        self.dates = set()
+        # Set when the file could not be read to the end; nothing is imported then
+        self.unreadable = False
+
+    @property
+    def error_count(self):
+        return len(self.errors)
+
+    def add_error(self, line, message):
+        self.errors.append((line, message))
+
+    def write_error_report(self, stream):
+        writer = csv.writer(stream)
+        writer.writerow(['line', 'error'])
+        writer.writerows(self.errors)
+
+
+def _category_lookup():
+    lookup = {}
+    for value, label in Expense.ExpenseCategory.choices:
+        lookup[value.lower()] = value
+        lookup[label.lower()] = value
+    return lookup
+
+
+def parse_rows(stream, created_by, result):
+    """Yield unsaved ``Expense`` objects for the valid rows of a CSV text stream."""
+    reader = csv.DictReader(stream)
+    try:
+        yield from _parse_rows(reader, created_by, result)
+    except UnicodeDecodeError:
+        # Text is decoded in chunks ahead of the reader, so there is no line to point at
+        result.add_error('', 'Could not read the file: it is not UTF-8 text. Save it as "CSV UTF-8" and retry.')
+        result.unreadable = True
+    except csv.Error as e:
+        result.add_error(reader.line_num, f'Could not read the file: malformed CSV ({e}).')
+        result.unreadable = True
+
+
+def _parse_rows(reader, created_by, result):
+    if reader.fieldnames is None:
+        result.add_error(1, 'The file is empty.')
+        return
+    reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+    missing = [column for column in REQUIRED_COLUMNS if column not in reader.fieldnames]
+    if missing:
+        result.add_error(1, f'Missing column(s): {", ".join(missing)}.')
+        return
+
+    categories = _category_lookup()
+    amount_field = Expense._meta.get_field('amount')
+    max_amount = Decimal(10) ** (amount_field.max_digits - amount_field.decimal_places)
+    title_length = Expense._meta.get_field('title').max_length
+
+    for row in reader:
+        line = reader.line_num
+        errors = []
+
+        try:
+            date = datetime.strptime((row['date'] or '').strip(), '%Y-%m-%d').date()
+        except ValueError:
+            errors.append(f'invalid date "{row["date"]}"')
+
+        title = (row['title'] or '').strip()
+        if not title:
+            errors.append('missing title')
+        elif len(title) > title_length:
+            errors.append(f'title longer than {title_length} characters')
+
+        category = categories.get((row['category'] or '').strip().lower())
+        if category is None:
+            errors.append(f'unknown category "{row["category"]}"')
+
+        try:
+            amount = Decimal((row['amount'] or '').strip().replace(',', ''))
+            if not amount.is_finite() or amount <= 0 or amount >= max_amount or amount != amount.quantize(CENT):
+                raise InvalidOperation
+        except InvalidOperation:
+            errors.append(f'invalid amount "{row["amount"]}"')
+
+        if errors:
+            result.add_error(line, '; '.join(errors))
+            continue
+
+        yield Expense(
+            date=date,
+            title=title,
+            category=category,
+            amount=amount,
+            description=(row.get('description') or '').strip(),
+            created_by=created_by,
+        )
+
+
+def import_expenses(stream, created_by, batch_size=BATCH_SIZE, dry_run=False):
+    """
+    Import the expenses in a CSV text stream and return an ``ImportResult``.
+    With ``dry_run`` the file is only validated.
+    """
+    result = ImportResult()
+    batch = []
+
+    def flush():
+        if not dry_run:
+            Expense.objects.bulk_create(batch)
+        result.created += len(batch)
+        result.dates.update(expense.date for expense in batch)
+        batch.clear()
+
+    try:
+        # A dry run writes nothing, so it doesn't need the write lock
+        with nullcontext() if dry_run else write_atomic():
+            for expense in parse_rows(stream, created_by, result):
+                batch.append(expense)
+                if len(batch) >= batch_size:
+                    flush()
+            if result.unreadable:
+                # Roll back the batches already inserted
+                raise UnreadableFile
+            if batch:
+                flush()
+
+            # bulk_create skips the signals that keep the rollups current
+            closed_dates = [day for day in result.dates if day <= last_closed_day()]
+            if closed_dates and not dry_run:
+                rebuild_summaries(min(closed_dates), max(closed_dates))
+    except UnreadableFile:
+        result.created = 0
+        result.dates.clear()
+    return result
@@ -0,0 +1,36 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from dashboard.exports import EXPORTS, FORMATS, export_lines
+
+
+class Command(BaseCommand):
+    help = 'Stream orders, order items or expenses for a date range as CSV or JSON Lines.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(EXPORTS))
+        parser.add_argument('--start', required=True, help='First day (YYYY-MM-DD).')
+        parser.add_argument('--end', required=True, help='Last day (YYYY-MM-DD).')
+        parser.add_argument('--format', choices=sorted(FORMATS), default='csv')
+        parser.add_argument('--output', help='File to write. Defaults to stdout.')
+
+    def handle(self, *args, **options):
+        start_date = self.parse_date(options['start'])
+        end_date = self.parse_date(options['end'])
+        if start_date > end_date:
+            raise CommandError('--start must not be after --end.')
+
+        lines = export_lines(options['kind'], options['format'], start_date, end_date)
+        if options['output']:
+            with open(options['output'], 'w', newline='', encoding='utf-8') as output:
+                output.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
+
+    def parse_date(self, value):
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError(f'Invalid date "{value}", expected YYYY-MM-DD.')
@@ -0,0 +1,48 @@
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from dashboard.imports import BATCH_SIZE, import_expenses
+
+
+class Command(BaseCommand):
+    help = 'Import expenses from a CSV supplier statement (date, title, category, amount[, description]).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV file to import, or - for stdin.')
+        parser.add_argument('--user', required=True, help='Username recorded as created_by.')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Rows per bulk insert.')
+        parser.add_argument('--dry-run', action='store_true', help='Validate the file without importing it.')
+        parser.add_argument('--errors', help='Write the rejected rows report to this CSV file instead of stderr.')
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(username=options['user'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f'Unknown user "{options["user"]}".')
+
+        batch_size = max(options['batch_size'], 1)
+        if options['path'] == '-':
+            result = import_expenses(sys.stdin, user, batch_size, options['dry_run'])
+        else:
+            try:
+                with open(options['path'], newline='', encoding='utf-8-sig') as stream:
+                    result = import_expenses(stream, user, batch_size, options['dry_run'])
+            except OSError as e:
+                raise CommandError(f'Could not read {options["path"]}: {e}')
+
+        if result.errors:
+            if options['errors']:
+                with open(options['errors'], 'w', newline='', encoding='utf-8') as report:
+                    result.write_error_report(report)
+            else:
+                result.write_error_report(self.stderr)
+
+        if result.unreadable:
+            raise CommandError('The file could not be read; nothing was imported.')
+
+        verb = 'Validated' if options['dry_run'] else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {result.created} expense(s); {result.error_count} row(s) rejected.'
+        ))
@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+from django.utils import timezone
+
+from dashboard.models import Expense
+from dashboard.rollups import last_closed_day, rebuild_summaries
+from orders.models import Order
+
+
+class Command(BaseCommand):
+    help = 'Rebuild DailySummary, CategorySales and PopularItem rollups for closed days.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First day to rebuild (YYYY-MM-DD). Defaults to the first order or expense.')
+        parser.add_argument('--end', help='Last day to rebuild (YYYY-MM-DD). Defaults to yesterday.')
+        parser.add_argument('--chunk-days', type=int, default=31, help='Days rebuilt per transaction.')
+
+    def handle(self, *args, **options):
+        start_date = self.parse_date(options['start']) if options['start'] else self.first_activity_date()
+        end_date = self.parse_date(options['end']) if options['end'] else last_closed_day()
+        end_date = min(end_date, last_closed_day())
+        chunk_days = max(options['chunk_days'], 1)
+
+        if start_date is None or start_date > end_date:
+            self.stdout.write('Nothing to rebuild.')
+            return
+
+        rebuilt = 0
+        chunk_start = start_date
+        while chunk_start <= end_date:
+            chunk_end = min(chunk_start + timedelta(days=chunk_days - 1), end_date)
+            rebuilt += rebuild_summaries(chunk_start, chunk_end)
+            chunk_start = chunk_end + timedelta(days=1)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {rebuilt} daily summaries from {start_date} to {end_date}.'
+        ))
+
+    def parse_date(self, value):
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError(f'Invalid date "{value}", expected YYYY-MM-DD.')
+
+    def first_activity_date(self):
+        first_order = Order.objects.aggregate(first=Min('created_at'))['first']
+        first_expense = Expense.objects.aggregate(first=Min('date'))['first']
+        candidates = [d for d in (first_order and timezone.localdate(first_order), first_expense) if d]
+        return min(candidates) if candidates else None
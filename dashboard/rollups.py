@@ -0,0 +1,315 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+from caching.helpers import invalidate_tags
+from database.routers import PRIMARY
+from orders.models import Order, OrderItem
+from .models import Expense, DailySummary, CategorySales, PopularItem
+
+ZERO = Decimal('0.00')
+
+# Cached chart and report responses carry this tag in the ``reports`` cache
+REPORTS_TAG = 'reports'
+
+
+def as_date(value):
+    """Normalise a date/datetime (e.g. ``Expense.date`` before refresh) to a date."""
+    if isinstance(value, datetime):
+        return timezone.localdate(value) if timezone.is_aware(value) else value.date()
+    return value
+
+
+def date_range(start_date, end_date):
+    current_date = start_date
+    while current_date <= end_date:
+        yield current_date
+        current_date += timedelta(days=1)
+
+
+def last_closed_day():
+    # Every day before today is closed and can be served from DailySummary
+    return timezone.localdate() - timedelta(days=1)
+
+
+def aggregate_days(start_date, end_date):
+    """
+    Aggregate raw orders, order items and expenses for every day in the range.
+
+    Runs one grouped query per source regardless of the number of days and
+    returns ``{date: {...}}`` with zero-filled entries for quiet days.
+    """
+    days = {
+        day: {
+            'date': day,
+            'total_orders': 0,
+            'total_revenue': ZERO,
+            'total_expenses': ZERO,
+            'category_sales': [],
+            'popular_items': [],
+        }
+        for day in date_range(start_date, end_date)
+    }
+
+    orders = Order.objects.filter(
+        business_date__range=[start_date, end_date]
+    ).annotate(
+        day=F('business_date')
+    ).values('day').annotate(
+        total_orders=Count('id'),
+        total_revenue=Sum('total')
+    ).order_by('day')
+    for row in orders:
+        days[row['day']]['total_orders'] = row['total_orders']
+        days[row['day']]['total_revenue'] = row['total_revenue'] or ZERO
+
+    expenses = Expense.objects.filter(
+        date__range=[start_date, end_date]
+    ).values('date').annotate(
+        total=Sum('amount')
+    ).order_by('date')
+    for row in expenses:
+        days[row['date']]['total_expenses'] = row['total'] or ZERO
+
+    items = OrderItem.objects.filter(
+        order__business_date__range=[start_date, end_date]
+    ).annotate(
+        day=F('order__business_date')
+    )
+
+    category_sales = items.values(
+        'day', 'menu_item__category__name'
+    ).annotate(
+        total_sales=Sum('total_price'),
+        items_sold=Sum('quantity')
+    ).order_by('day', '-total_sales')
+    for row in category_sales:
+        days[row['day']]['category_sales'].append({
+            'category_name': row['menu_item__category__name'] or 'Uncategorized',
+            'total_sales': row['total_sales'] or ZERO,
+            'items_sold': row['items_sold'] or 0,
+        })
+
+    # Every item sold is kept (not just a top N) so that summing PopularItem
+    # rows over a range stays exact.
+    popular_items = items.values(
+        'day', 'menu_item__name'
+    ).annotate(
+        quantity_sold=Sum('quantity'),
+        revenue=Sum('total_price')
+    ).order_by('day', '-quantity_sold')
+    for row in popular_items:
+        days[row['day']]['popular_items'].append({
+            'item_name': row['menu_item__name'],
+            'quantity_sold': row['quantity_sold'] or 0,
+            'revenue': row['revenue'] or ZERO,
+        })
+
+    for day in days.values():
+        day['net_profit'] = day['total_revenue'] - day['total_expenses']
+    return days
+
+
+@transaction.atomic
+def rebuild_summaries(start_date, end_date):
+    """Recompute and store DailySummary, CategorySales and PopularItem rows for a date range."""
+    days = aggregate_days(start_date, end_date)
+
+    DailySummary.objects.filter(date__range=[start_date, end_date]).delete()
+    DailySummary.objects.bulk_create([
+        DailySummary(
+            date=day['date'],
+            total_orders=day['total_orders'],
+            total_revenue=day['total_revenue'],
+            total_expenses=day['total_expenses'],
+            net_profit=day['net_profit'],
+        )
+        for day in days.values()
+    ])
+
+    summaries = DailySummary.objects.filter(
+        date__range=[start_date, end_date]
+    ).in_bulk(field_name='date')
+    CategorySales.objects.bulk_create([
+        CategorySales(summary=summaries[day['date']], **row)
+        for day in days.values()
+        for row in day['category_sales']
+    ])
+    PopularItem.objects.bulk_create([
+        PopularItem(summary=summaries[day['date']], **row)
+        for day in days.values()
+        for row in day['popular_items']
+    ])
+    transaction.on_commit(lambda: invalidate_tags(REPORTS_TAG, alias='reports'))
+    return len(days)
+
+
+def refresh_summary(day):
+    """Rebuild a single closed day; today is always computed live and never stored."""
+    if day <= last_closed_day():
+        rebuild_summaries(day, day)
+
+
+def ensure_summaries(start_date, end_date):
+    """Build any closed days in the range that have no DailySummary yet."""
+    end_date = min(end_date, last_closed_day())
+    if start_date > end_date:
+        return
+
+    # Ask the primary: a replica that hasn't caught up with the last rebuild
+    # would make those days look missing and rebuild them again on every request
+    existing = set(
+        DailySummary.objects.using(PRIMARY).filter(
+            date__range=[start_date, end_date]
+        ).values_list('date', flat=True)
+    )
+    missing = [day for day in date_range(start_date, end_date) if day not in existing]
+    if missing:
+        rebuild_summaries(missing[0], missing[-1])
+
+
+def _open_day(start_date, end_date):
+    # Today, if it falls inside the range; it is never served from rollups
+    today = timezone.localdate()
+    if start_date <= today <= end_date:
+        return today
+    return None
+
+
+def daily_totals(start_date, end_date):
+    """
+    Return one dict per day in the range with order, revenue, expense and
+    profit totals: closed days come from DailySummary, today is computed live
+    and future days are zero-filled.
+    """
+    ensure_summaries(start_date, end_date)
+
+    rows = {
+        day: {
+            'date': day,
+            'total_orders': 0,
+            'total_revenue': ZERO,
+            'total_expenses': ZERO,
+            'net_profit': ZERO,
+        }
+        for day in date_range(start_date, end_date)
+    }
+
+    summaries = DailySummary.objects.filter(
+        date__range=[start_date, min(end_date, last_closed_day())]
+    ).values('date', 'total_orders', 'total_revenue', 'total_expenses', 'net_profit')
+    for summary in summaries:
+        rows[summary['date']].update(summary)
+
+    today = _open_day(start_date, end_date)
+    if today:
+        live = aggregate_days(today, today)[today]
+        rows[today].update({
+            key: live[key]
+            for key in ('total_orders', 'total_revenue', 'total_expenses', 'net_profit')
+        })
+
+    return list(rows.values())
+
+
+def summarize(rows):
+    """Collapse ``daily_totals`` rows into a report summary dict."""
+    total_orders = sum(row['total_orders'] for row in rows)
+    total_revenue = sum((row['total_revenue'] for row in rows), ZERO)
+    total_expenses = sum((row['total_expenses'] for row in rows), ZERO)
+    return {
+        'total_orders': total_orders,
+        'total_revenue': total_revenue,
+        'average_order_value': total_revenue / total_orders if total_orders else 0,
+        'total_expenses': total_expenses,
+        'net_profit': total_revenue - total_expenses,
+    }
+
+
+def category_sales(start_date, end_date):
+    """Sales per category over the range, highest first."""
+    ensure_summaries(start_date, end_date)
+
+    totals = defaultdict(lambda: {'total_sales': ZERO, 'items_sold': 0})
+    closed = CategorySales.objects.filter(
+        summary__date__range=[start_date, min(end_date, last_closed_day())]
+    ).values('category_name').annotate(
+        total_sales=Sum('total_sales'),
+        items_sold=Sum('items_sold')
+    )
+    live = []
+    today = _open_day(start_date, end_date)
+    if today:
+        live = aggregate_days(today, today)[today]['category_sales']
+
+    for row in list(closed) + live:
+        total = totals[row['category_name']]
+        total['total_sales'] += row['total_sales']
+        total['items_sold'] += row['items_sold']
+
+    return sorted(
+        (
+            {'menu_item__category__name': name, **total}
+            for name, total in totals.items()
+        ),
+        key=lambda row: row['total_sales'],
+        reverse=True
+    )
+
+
+def popular_items(start_date, end_date, limit=10):
+    """Best selling items over the range by quantity."""
+    ensure_summaries(start_date, end_date)
+
+    totals = defaultdict(lambda: {'quantity_sold': 0, 'revenue': ZERO})
+    closed = PopularItem.objects.filter(
+        summary__date__range=[start_date, min(end_date, last_closed_day())]
+    ).values('item_name').annotate(
+        quantity_sold=Sum('quantity_sold'),
+        revenue=Sum('revenue')
+    )
+    live = []
+    today = _open_day(start_date, end_date)
+    if today:
+        live = aggregate_days(today, today)[today]['popular_items']
+
+    for row in list(closed) + live:
+        total = totals[row['item_name']]
+        total['quantity_sold'] += row['quantity_sold']
+        total['revenue'] += row['revenue']
+
+    return sorted(
+        (
+            {'menu_item__name': name, **total}
+            for name, total in totals.items()
+        ),
+        key=lambda row: row['quantity_sold'],
+        reverse=True
+    )[:limit]
+
+
+def week_start(day):
+    return day - timedelta(days=day.weekday())
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def group_totals(rows, period):
+    """Sum ``daily_totals`` rows into buckets keyed by ``period(date)``, e.g. ``week_start``."""
+    groups = {}
+    for row in rows:
+        group = groups.setdefault(period(row['date']), {
+            'total_orders': 0,
+            'total_revenue': ZERO,
+            'total_expenses': ZERO,
+        })
+        group['total_orders'] += row['total_orders']
+        group['total_revenue'] += row['total_revenue']
+        group['total_expenses'] += row['total_expenses']
+    return [{'period': key, **values} for key, values in groups.items()]
@@ -0,0 +1,50 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from orders.models import Order, OrderItem
+from .models import Expense
+from .rollups import as_date, last_closed_day, refresh_summary
+
+
+def schedule_refresh(day):
+    # Today is always reported live, so only edits to closed days need a rebuild
+    if day and day <= last_closed_day():
+        transaction.on_commit(lambda: refresh_summary(day))
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+def order_changed(sender, instance, **kwargs):
+    schedule_refresh(instance.business_date)
+
+
+@receiver(post_save, sender=OrderItem)
+@receiver(post_delete, sender=OrderItem)
+def order_item_changed(sender, instance, **kwargs):
+    if OrderItem.order.is_cached(instance):
+        order = instance.order
+    else:
+        order = Order.objects.filter(pk=instance.order_id).only('business_date').first()
+    if order:
+        schedule_refresh(order.business_date)
+
+
+@receiver(pre_save, sender=Expense)
+def remember_expense_date(sender, instance, **kwargs):
+    # An edit can move an expense to another day; both days need rebuilding
+    instance._previous_date = None
+    if instance.pk:
+        instance._previous_date = Expense.objects.filter(
+            pk=instance.pk
+        ).values_list('date', flat=True).first()
+
+
+@receiver(post_save, sender=Expense)
+@receiver(post_delete, sender=Expense)
+def expense_changed(sender, instance, **kwargs):
+    day = as_date(instance.date)
+    schedule_refresh(day)
+    previous_date = getattr(instance, '_previous_date', None)
+    if previous_date and previous_date != day:
+        schedule_refresh(previous_date)
@@ -0,0 +1,74 @@
+import io
+from datetime import timedelta
+from unittest import SkipTest, skipUnless
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Sum
+from django.test import TestCase
+from django.utils import timezone
+
+# Discovery reaches this module under restaurant.settings too, which doesn't install the dashboard
+if not apps.is_installed('dashboard'):
+    raise SkipTest('dashboard is only installed by food_ordering_system')
+
+from orders.models import Order
+from .imports import import_expenses
+from .models import Expense
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Plans are checked in SQLite EXPLAIN QUERY PLAN form')
+class ReportIndexTests(TestCase):
+    """The report and order board filters must stay on their indexes."""
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(f'USING INDEX {index_name}', plan, plan)
+
+    def test_daily_report_uses_business_date_index(self):
+        self.assertUsesIndex(Order.objects.filter(business_date=timezone.localdate()), 'orders_order_bdate_idx')
+
+    def test_date_range_totals_use_business_date_index(self):
+        end_date = timezone.localdate()
+        rows = Order.objects.filter(
+            business_date__range=[end_date - timedelta(days=30), end_date]
+        ).order_by().values('business_date').annotate(total=Sum('total'))
+        self.assertUsesIndex(rows, 'orders_order_bdate_idx')
+
+    def test_order_management_columns_use_status_index(self):
+        self.assertUsesIndex(
+            Order.objects.filter(status=Order.OrderStatus.NEW).order_by('-created_at'), 'orders_order_status_idx'
+        )
+
+
+class ExpenseImportTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='owner', password='secret')
+
+    def import_bytes(self, data, **kwargs):
+        stream = io.TextIOWrapper(io.BytesIO(data), encoding='utf-8-sig', newline='')
+        return import_expenses(stream, self.user, **kwargs)
+
+    def test_unreadable_file_imports_nothing(self):
+        category = Expense.ExpenseCategory.choices[0][0]
+        rows = ''.join(f'2024-01-01,Supplier {number},{category},1.00\n' for number in range(20))
+        data = f'date,title,category,amount\n{rows}'.encode() + f'2024-01-02,Caf\xe9,{category},1.00\n'.encode('latin-1')
+
+        result = self.import_bytes(data, batch_size=5)
+
+        self.assertTrue(result.unreadable)
+        self.assertEqual(result.created, 0)
+        self.assertEqual(result.error_count, 1)
+        self.assertFalse(Expense.objects.exists())
+
+    def test_valid_rows_are_imported_and_invalid_ones_reported(self):
+        category = Expense.ExpenseCategory.choices[0][0]
+        data = f'date,title,category,amount\n2024-01-01,Flour,{category},12.50\n2024-01-01,,{category},1\n'.encode()
+
+        result = self.import_bytes(data)
+
+        self.assertFalse(result.unreadable)
+        self.assertEqual(result.created, 1)
+        self.assertEqual(result.errors, [(3, 'missing title')])
+        self.assertEqual(Expense.objects.count(), 1)
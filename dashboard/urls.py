@@ -5,6 +5,7 @@ urlpatterns = [
     # Manager Dashboard
     path('', views.manager_dashboard, name='manager_dashboard'),
     path('orders/', views.order_management, name='order_management'),
+    path('orders/events/', views.order_events, name='order_events_stream'),
     path('orders/<str:order_number>/', views.order_detail, name='manager_order_detail'),
     path('orders/<str:order_number>/update/', views.update_order_status, name='update_order_status'),
     path('orders/<str:order_number>/assign/', views.assign_order, name='assign_order'),
@@ -17,6 +18,7 @@ urlpatterns = [
     path('owner/reports/monthly/', views.monthly_report, name='monthly_report'),
     path('owner/reports/yearly/', views.yearly_report, name='yearly_report'),
     path('owner/reports/custom/', views.custom_report, name='custom_report'),
+    path('owner/export/<str:kind>/', views.export_data, name='export_data'),
     
     # Expenses
     path('owner/expenses/', views.expense_list, name='expense_list'),
@@ -4,17 +4,23 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.db.models import Sum, Count, F, Q
-from django.db.models.functions import TruncDay, TruncWeek, TruncMonth
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
 from django.utils import timezone
 from django.core.paginator import Paginator
 from .models import Expense, DailySummary
-from .forms import ExpenseForm, DateRangeForm, OrderStatusUpdateForm
+from . import exports, rollups
+from .aggregation import sum_by_day, daily_series
+from .forms import ExpenseForm, DateRangeForm, ExportForm, OrderStatusUpdateForm
+from caching.helpers import cache_view
+from database.routers import use_replica
+from instrumentation.metrics import query_budget
 from orders.models import Order, OrderItem, OrderStatusUpdate
+from orders.events import STAFF_CHANNEL, event_stream_response, get_authenticated_user
 from accounts.models import User
 from menu.models import Category, MenuItem
 
 @login_required
+@query_budget(12)
 def manager_dashboard(request):
     # Check if user is a manager or admin
     if not (request.user.is_admin() or request.user.is_manager()):
@@ -22,10 +28,10 @@ def manager_dashboard(request):
         return redirect('home')
     
     # Get today's date
-    today = timezone.now().date()
+    today = timezone.localdate()
     
     # Get today's orders
-    today_orders = Order.objects.filter(created_at__date=today)
+    today_orders = Order.objects.filter(business_date=today)
     
     # Get order counts by status
     new_orders_count = today_orders.filter(status=Order.OrderStatus.NEW).count()
@@ -40,7 +46,7 @@ def manager_dashboard(request):
     
     # Get popular items for today
     popular_items = OrderItem.objects.filter(
-        order__created_at__date=today
+        order__business_date=today
     ).values(
         'menu_item__name', 'menu_item__price'
     ).annotate(
@@ -64,6 +70,7 @@ def manager_dashboard(request):
     return render(request, 'dashboard/manager_dashboard.html', context)
 
 @login_required
+@query_budget(10)
 def order_management(request):
     # Check if user is a manager or admin
     if not (request.user.is_admin() or request.user.is_manager()):
@@ -90,7 +97,16 @@ def order_management(request):
     }
     return render(request, 'dashboard/order_management.html', context)
 
+async def order_events(request):
+    # Server-sent events stream of every order status change, for staff screens
+    user = await get_authenticated_user(request)
+    if user is None or not (user.is_admin() or user.is_manager()):
+        return JsonResponse({'error': 'Permission denied'}, status=403)
+    
+    return event_stream_response(request, STAFF_CHANNEL)
+
 @login_required
+@query_budget(8)
 def order_detail(request, order_number):
     # Check if user is a manager or admin
     if not (request.user.is_admin() or request.user.is_manager()):
@@ -175,6 +191,8 @@ def assign_order(request, order_number):
     return redirect('manager_order_detail', order_number=order_number)
 
 @login_required
+@use_replica
+@query_budget(14)
 def owner_dashboard(request):
     # Check if user is an owner/admin
     if not request.user.is_admin():
@@ -182,12 +200,12 @@ def owner_dashboard(request):
         return redirect('home')
     
     # Get today's date
-    today = timezone.now().date()
+    today = timezone.localdate()
     
     # Get today's summary
     today_summary = {
-        'orders': Order.objects.filter(created_at__date=today).count(),
-        'revenue': Order.objects.filter(created_at__date=today).aggregate(total=Sum('total'))['total'] or 0,
+        'orders': Order.objects.filter(business_date=today).count(),
+        'revenue': Order.objects.filter(business_date=today).aggregate(total=Sum('total'))['total'] or 0,
         'expenses': Expense.objects.filter(date=today).aggregate(total=Sum('amount'))['total'] or 0,
     }
     today_summary['profit'] = today_summary['revenue'] - today_summary['expenses']
@@ -195,8 +213,8 @@ def owner_dashboard(request):
     # Get yesterday's summary for comparison
     yesterday = today - timedelta(days=1)
     yesterday_summary = {
-        'orders': Order.objects.filter(created_at__date=yesterday).count(),
-        'revenue': Order.objects.filter(created_at__date=yesterday).aggregate(total=Sum('total'))['total'] or 0,
+        'orders': Order.objects.filter(business_date=yesterday).count(),
+        'revenue': Order.objects.filter(business_date=yesterday).aggregate(total=Sum('total'))['total'] or 0,
         'expenses': Expense.objects.filter(date=yesterday).aggregate(total=Sum('amount'))['total'] or 0,
     }
     yesterday_summary['profit'] = yesterday_summary['revenue'] - yesterday_summary['expenses']
@@ -224,7 +242,7 @@ def owner_dashboard(request):
     
     # Get popular items for today
     popular_items = OrderItem.objects.filter(
-        order__created_at__date=today
+        order__business_date=today
     ).values(
         'menu_item__name', 'menu_item__price'
     ).annotate(
@@ -268,6 +286,7 @@ def owner_dashboard(request):
     return render(request, 'dashboard/owner_dashboard.html', context)
 
 @login_required
+@use_replica
 def sales_reports(request):
     # Check if user is an owner/admin
     if not request.user.is_admin():
@@ -277,6 +296,8 @@ def sales_reports(request):
     return render(request, 'dashboard/sales_reports.html')
 
 @login_required
+@use_replica
+@query_budget(22)
 def daily_report(request):
     # Check if user is an owner/admin
     if not request.user.is_admin():
@@ -289,19 +310,15 @@ def daily_report(request):
         try:
             report_date = datetime.strptime(date_str, '%Y-%m-%d').date()
         except ValueError:
-            report_date = timezone.now().date()
+            report_date = timezone.localdate()
     else:
-        report_date = timezone.now().date()
+        report_date = timezone.localdate()
     
-    # Get orders for the day
-    orders = Order.objects.filter(created_at__date=report_date)
+    # Get order summary (from the rollups for closed days, live for today)
+    order_summary = rollups.summarize(rollups.daily_totals(report_date, report_date))
     
-    # Get order summary
-    order_summary = {
-        'total_orders': orders.count(),
-        'total_revenue': orders.aggregate(total=Sum('total'))['total'] or 0,
-        'average_order_value': orders.aggregate(avg=Sum('total') / Count('id'))['avg'] or 0,
-    }
+    # Get orders for the day
+    orders = Order.objects.filter(business_date=report_date)
     
     # Get order breakdown by status
     status_breakdown = orders.values('status').annotate(
@@ -316,28 +333,14 @@ def daily_report(request):
     ).order_by('order_type')
     
     # Get sales by category
-    category_sales = OrderItem.objects.filter(
-        order__created_at__date=report_date
-    ).values(
-        'menu_item__category__name'
-    ).annotate(
-        total_sales=Sum('total_price'),
-        items_sold=Sum('quantity')
-    ).order_by('-total_sales')
+    category_sales = rollups.category_sales(report_date, report_date)
     
     # Get popular items
-    popular_items = OrderItem.objects.filter(
-        order__created_at__date=report_date
-    ).values(
-        'menu_item__name'
-    ).annotate(
-        quantity_sold=Sum('quantity'),
-        revenue=Sum('total_price')
-    ).order_by('-quantity_sold')[:10]
+    popular_items = rollups.popular_items(report_date, report_date, limit=10)
     
     # Get expenses for the day
     expenses = Expense.objects.filter(date=report_date)
-    total_expenses = expenses.aggregate(total=Sum('amount'))['total'] or 0
+    total_expenses = order_summary['total_expenses']
     
     # Get expense breakdown
     expense_breakdown = expenses.values('category').annotate(
@@ -345,7 +348,7 @@ def daily_report(request):
     ).order_by('-total')
     
     # Calculate net profit
-    net_profit = order_summary['total_revenue'] - total_expenses
+    net_profit = order_summary['net_profit']
     
     context = {
         'report_date': report_date,
@@ -361,6 +364,8 @@ def daily_report(request):
     return render(request, 'dashboard/daily_report.html', context)
 
 @login_required
+@use_replica
+@query_budget(22)
 def weekly_report(request):
     # Check if user is an owner/admin
     if not request.user.is_admin():
@@ -368,39 +373,31 @@ def weekly_report(request):
         return redirect('home')
     
     # Get start and end dates for the week
-    today = timezone.now().date()
+    today = timezone.localdate()
     start_of_week = today - timedelta(days=today.weekday())
     end_of_week = start_of_week + timedelta(days=6)
     
-    # Get orders for the week
-    orders = Order.objects.filter(created_at__date__range=[start_of_week, end_of_week])
+    # Get daily totals for the week (from the rollups for closed days, live for today)
+    days = rollups.daily_totals(start_of_week, end_of_week)
     
     # Get daily breakdown
-    daily_breakdown = orders.annotate(
-        day=TruncDay('created_at')
-    ).values('day').annotate(
-        total_orders=Count('id'),
-        total_revenue=Sum('total')
-    ).order_by('day')
+    daily_breakdown = [
+        {'day': day['date'], 'total_orders': day['total_orders'], 'total_revenue': day['total_revenue']}
+        for day in days if day['total_orders']
+    ]
     
     # Get weekly summary
-    weekly_summary = {
-        'total_orders': orders.count(),
-        'total_revenue': orders.aggregate(total=Sum('total'))['total'] or 0,
-        'average_order_value': orders.aggregate(avg=Sum('total') / Count('id'))['avg'] or 0,
-    }
-    
-    # Get expenses for the week
-    expenses = Expense.objects.filter(date__range=[start_of_week, end_of_week])
-    total_expenses = expenses.aggregate(total=Sum('amount'))['total'] or 0
+    weekly_summary = rollups.summarize(days)
+    total_expenses = weekly_summary['total_expenses']
     
     # Get daily expense breakdown
-    daily_expenses = expenses.values('date').annotate(
-        total=Sum('amount')
-    ).order_by('date')
+    daily_expenses = [
+        {'date': day['date'], 'total': day['total_expenses']}
+        for day in days if day['total_expenses']
+    ]
     
     # Calculate net profit
-    net_profit = weekly_summary['total_revenue'] - total_expenses
+    net_profit = weekly_summary['net_profit']
     
     context = {
         'start_of_week': start_of_week,
@@ -414,6 +411,8 @@ def weekly_report(request):
     return render(request, 'dashboard/weekly_report.html', context)
 
 @login_required
+@use_replica
+@query_budget(22)
 def monthly_report(request):
     # Check if user is an owner/admin
     if not request.user.is_admin():
@@ -445,27 +444,21 @@ def monthly_report(request):
     else:
         end_date = datetime(year, month + 1, 1).date() - timedelta(days=1)
     
-    # Get orders for the month
-    orders = Order.objects.filter(created_at__date__range=[start_date, end_date])
+    # Get daily totals for the month (from the rollups for closed days, live for today)
+    days = rollups.daily_totals(start_date, end_date)
     
     # Get weekly breakdown
-    weekly_breakdown = orders.annotate(
-        week=TruncWeek('created_at')
-    ).values('week').annotate(
-        total_orders=Count('id'),
-        total_revenue=Sum('total')
-    ).order_by('week')
+    weekly_breakdown = [
+        {'week': week['period'], 'total_orders': week['total_orders'], 'total_revenue': week['total_revenue']}
+        for week in rollups.group_totals(days, rollups.week_start) if week['total_orders']
+    ]
     
     # Get monthly summary
-    monthly_summary = {
-        'total_orders': orders.count(),
-        'total_revenue': orders.aggregate(total=Sum('total'))['total'] or 0,
-        'average_order_value': orders.aggregate(avg=Sum('total') / Count('id'))['avg'] or 0,
-    }
+    monthly_summary = rollups.summarize(days)
     
     # Get expenses for the month
     expenses = Expense.objects.filter(date__range=[start_date, end_date])
-    total_expenses = expenses.aggregate(total=Sum('amount'))['total'] or 0
+    total_expenses = monthly_summary['total_expenses']
     
     # Get expense breakdown by category
     expense_breakdown = expenses.values('category').annotate(
@@ -473,7 +466,7 @@ def monthly_report(request):
     ).order_by('-total')
     
     # Calculate net profit
-    net_profit = monthly_summary['total_revenue'] - total_expenses
+    net_profit = monthly_summary['net_profit']
     
     context = {
         'month': month,
@@ -489,6 +482,8 @@ def monthly_report(request):
     return render(request, 'dashboard/monthly_report.html', context)
 
 @login_required
+@use_replica
+@query_budget(22)
 def yearly_report(request):
     # Check if user is an owner/admin
     if not request.user.is_admin():
@@ -510,37 +505,28 @@ def yearly_report(request):
     start_date = datetime(year, 1, 1).date()
     end_date = datetime(year, 12, 31).date()
     
-    # Get orders for the year
-    orders = Order.objects.filter(created_at__date__range=[start_date, end_date])
+    # Get daily totals for the year (from the rollups for closed days, live for today)
+    days = rollups.daily_totals(start_date, end_date)
+    months = rollups.group_totals(days, rollups.month_start)
     
     # Get monthly breakdown
-    monthly_breakdown = orders.annotate(
-        month=TruncMonth('created_at')
-    ).values('month').annotate(
-        total_orders=Count('id'),
-        total_revenue=Sum('total')
-    ).order_by('month')
+    monthly_breakdown = [
+        {'month': month['period'], 'total_orders': month['total_orders'], 'total_revenue': month['total_revenue']}
+        for month in months if month['total_orders']
+    ]
     
     # Get yearly summary
-    yearly_summary = {
-        'total_orders': orders.count(),
-        'total_revenue': orders.aggregate(total=Sum('total'))['total'] or 0,
-        'average_order_value': orders.aggregate(avg=Sum('total') / Count('id'))['avg'] or 0,
-    }
-    
-    # Get expenses for the year
-    expenses = Expense.objects.filter(date__range=[start_date, end_date])
-    total_expenses = expenses.aggregate(total=Sum('amount'))['total'] or 0
+    yearly_summary = rollups.summarize(days)
+    total_expenses = yearly_summary['total_expenses']
     
     # Get monthly expense breakdown
-    monthly_expenses = expenses.annotate(
-        month=TruncMonth('date')
-    ).values('month').annotate(
-        total=Sum('amount')
-    ).order_by('month')
+    monthly_expenses = [
+        {'month': month['period'], 'total': month['total_expenses']}
+        for month in months if month['total_expenses']
+    ]
     
     # Calculate net profit
-    net_profit = yearly_summary['total_revenue'] - total_expenses
+    net_profit = yearly_summary['net_profit']
     
     context = {
         'year': year,
@@ -555,6 +541,7 @@ def yearly_report(request):
     return render(request, 'dashboard/yearly_report.html', context)
 
 @login_required
+@use_replica
 def custom_report(request):
     # Check if user is an owner/admin
     if not request.user.is_admin():
@@ -567,27 +554,21 @@ def custom_report(request):
             start_date = form.cleaned_data['start_date']
             end_date = form.cleaned_data['end_date']
             
-            # Get orders for the date range
-            orders = Order.objects.filter(created_at__date__range=[start_date, end_date])
+            # Get daily totals for the date range (from the rollups for closed days, live for today)
+            days = rollups.daily_totals(start_date, end_date)
             
             # Get daily breakdown
-            daily_breakdown = orders.annotate(
-                day=TruncDay('created_at')
-            ).values('day').annotate(
-                total_orders=Count('id'),
-                total_revenue=Sum('total')
-            ).order_by('day')
+            daily_breakdown = [
+                {'day': day['date'], 'total_orders': day['total_orders'], 'total_revenue': day['total_revenue']}
+                for day in days if day['total_orders']
+            ]
             
             # Get summary
-            summary = {
-                'total_orders': orders.count(),
-                'total_revenue': orders.aggregate(total=Sum('total'))['total'] or 0,
-                'average_order_value': orders.aggregate(avg=Sum('total') / Count('id'))['avg'] or 0,
-            }
+            summary = rollups.summarize(days)
             
             # Get expenses for the date range
             expenses = Expense.objects.filter(date__range=[start_date, end_date])
-            total_expenses = expenses.aggregate(total=Sum('amount'))['total'] or 0
+            total_expenses = summary['total_expenses']
             
             # Get expense breakdown by category
             expense_breakdown = expenses.values('category').annotate(
@@ -595,7 +576,7 @@ def custom_report(request):
             ).order_by('-total')
             
             # Calculate net profit
-            net_profit = summary['total_revenue'] - total_expenses
+            net_profit = summary['net_profit']
             
             context = {
                 'form': form,
@@ -610,7 +591,7 @@ def custom_report(request):
             return render(request, 'dashboard/custom_report.html', context)
     else:
         # Default to last 30 days
-        end_date = timezone.now().date()
+        end_date = timezone.localdate()
         start_date = end_date - timedelta(days=30)
         form = DateRangeForm(initial={'start_date': start_date, 'end_date': end_date})
     
@@ -620,6 +601,30 @@ def custom_report(request):
     return render(request, 'dashboard/custom_report.html', context)
 
 @login_required
+@use_replica
+def export_data(request, kind):
+    # Check if user is an owner/admin
+    if not request.user.is_admin():
+        return JsonResponse({'error': 'Permission denied'}, status=403)
+    
+    if kind not in exports.EXPORTS:
+        raise Http404('Unknown export')
+    
+    # Same date range filter as the reports
+    form = ExportForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'error': form.errors}, status=400)
+    
+    # Streamed row by row, so a year of orders never sits in memory
+    return exports.export_response(
+        kind,
+        form.cleaned_data['format'] or 'csv',
+        form.cleaned_data['start_date'],
+        form.cleaned_data['end_date']
+    )
+
+@login_required
+@query_budget(6)
 def expense_list(request):
     # Check if user is an owner/admin
     if not request.user.is_admin():
@@ -654,7 +659,7 @@ def add_expense(request):
             messages.success(request, 'Expense added successfully.')
             return redirect('expense_list')
     else:
-        form = ExpenseForm(initial={'date': timezone.now().date()})
+        form = ExpenseForm(initial={'date': timezone.localdate()})
     
     context = {
         'form': form,
@@ -706,6 +711,9 @@ def delete_expense(request, pk):
     return render(request, 'dashboard/delete_expense.html', context)
 
 @login_required
+@use_replica
+@cache_view(timeout=60, tags=[rollups.REPORTS_TAG], alias='reports')
+@query_budget(6)
 def sales_data(request):
     # Check if user is an owner/admin
     if not request.user.is_admin():
@@ -721,35 +729,13 @@ def sales_data(request):
             end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date()
         else:
             # Default to last 30 days
-            end_date = timezone.now().date()
+            end_date = timezone.localdate()
             start_date = end_date - timedelta(days=30)
         
-        # Get daily sales and expenses
-        daily_data = []
-        
-        current_date = start_date
-        while current_date <= end_date:
-            # Get orders for the day
-            daily_revenue = Order.objects.filter(
-                created_at__date=current_date
-            ).aggregate(total=Sum('total'))['total'] or 0
-            
-            # Get expenses for the day
-            daily_expenses = Expense.objects.filter(
-                date=current_date
-            ).aggregate(total=Sum('amount'))['total'] or 0
-            
-            # Calculate profit
-            daily_profit = daily_revenue - daily_expenses
-            
-            daily_data.append({
-                'date': current_date.strftime('%Y-%m-%d'),
-                'revenue': float(daily_revenue),
-                'expenses': float(daily_expenses),
-                'profit': float(daily_profit)
-            })
-            
-            current_date += timedelta(days=1)
+        # Get daily sales and expenses (one grouped query each, empty days zero-filled)
+        daily_revenue = sum_by_day(Order.objects.all(), 'business_date', Sum('total'), start_date, end_date)
+        daily_expenses = sum_by_day(Expense.objects.all(), 'date', Sum('amount'), start_date, end_date)
+        daily_data = daily_series(daily_revenue, daily_expenses)
         
         return JsonResponse({'data': daily_data})
     
@@ -757,6 +743,9 @@ def sales_data(request):
         return JsonResponse({'error': str(e)}, status=400)
 
 @login_required
+@use_replica
+@cache_view(timeout=60, tags=[rollups.REPORTS_TAG], alias='reports')
+@query_budget(5)
 def category_sales(request):
     # Check if user is an owner/admin
     if not request.user.is_admin():
@@ -772,12 +761,12 @@ def category_sales(request):
             end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date()
         else:
             # Default to last 30 days
-            end_date = timezone.now().date()
+            end_date = timezone.localdate()
             start_date = end_date - timedelta(days=30)
         
         # Get sales by category
         category_data = OrderItem.objects.filter(
-            order__created_at__date__range=[start_date, end_date]
+            order__business_date__range=[start_date, end_date]
         ).values(
             'menu_item__category__name'
         ).annotate(
@@ -801,6 +790,9 @@ def category_sales(request):
         return JsonResponse({'error': str(e)}, status=400)
 
 @login_required
+@use_replica
+@cache_view(timeout=60, tags=[rollups.REPORTS_TAG], alias='reports')
+@query_budget(5)
 def expense_breakdown(request):
     # Check if user is an owner/admin
     if not request.user.is_admin():
@@ -816,7 +808,7 @@ def expense_breakdown(request):
             end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date()
         else:
             # Default to last 30 days
-            end_date = timezone.now().date()
+            end_date = timezone.localdate()
             start_date = end_date - timedelta(days=30)
         
         # Get expense breakdown by category
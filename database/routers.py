@@ -0,0 +1,140 @@
+"""
+Read-replica routing for reports and dashboards.
+
+Only code that opts in reads from the ``replica`` alias: views decorated with
+``use_replica`` (or blocks inside ``reading_from_replica()``). Everything else,
+and every write, stays on ``default``. Within an opted-in block, reads go back
+to the primary when:
+
+- there is no ``replica`` alias in ``DATABASES``;
+- the replica is further behind than ``REPLICA_MAX_LAG`` seconds, or its lag
+  can't be measured (checked at most every ``REPLICA_LAG_CHECK_INTERVAL``
+  seconds per process);
+- the block has written anything, or is inside a transaction on the primary;
+- the request comes from a client that wrote something in the last
+  ``REPLICA_PIN_SECONDS`` (see ``ReplicaPinMiddleware``), so people see
+  their own changes.
+
+Lag is read from ``pg_last_xact_replay_timestamp()`` on PostgreSQL, and for
+an SQLite copy from the heartbeat row ``sync_replica`` stamps into it.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+PRIMARY = 'default'
+REPLICA = 'replica'
+HEARTBEAT_TABLE = 'replica_heartbeat'
+PIN_COOKIE = 'pin_primary'
+
+# None outside opted-in code, else a dict: {'pinned': bool}
+_replica_reads = ContextVar('replica_reads', default=None)
+
+_lag_lock = threading.Lock()
+_lag_state = {'checked_at': None, 'healthy': False}
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def replica_lag(alias=REPLICA):
+    """Seconds the replica is behind the primary, or None if it can't be told."""
+    connection = connections[alias]
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                # A caught-up standby replays nothing new, however old its last replay is
+                cursor.execute(
+                    'SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 '
+                    'ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END'
+                )
+                row = cursor.fetchone()
+                return float(row[0]) if row and row[0] is not None else 0.0
+            if connection.vendor == 'sqlite':
+                cursor.execute(f'SELECT synced_at FROM {HEARTBEAT_TABLE} WHERE id = 1')
+                row = cursor.fetchone()
+                return max(time.time() - row[0], 0.0) if row else None
+    except DatabaseError:
+        return None
+    return None
+
+
+def replica_is_healthy():
+    interval = _setting('REPLICA_LAG_CHECK_INTERVAL', 5)
+    with _lag_lock:
+        checked_at = _lag_state['checked_at']
+        if checked_at is not None and time.monotonic() - checked_at < interval:
+            return _lag_state['healthy']
+        lag = replica_lag()
+        _lag_state['healthy'] = lag is not None and lag <= _setting('REPLICA_MAX_LAG', 30)
+        _lag_state['checked_at'] = time.monotonic()
+        return _lag_state['healthy']
+
+
+@contextmanager
+def reading_from_replica():
+    """Route reads in this block to the replica, subject to the guards above."""
+    token = _replica_reads.set({'pinned': False})
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def use_replica(view_func):
+    """View decorator: serve GET/HEAD requests from the replica unless the client is pinned."""
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD') or PIN_COOKIE in request.COOKIES:
+            return view_func(request, *args, **kwargs)
+        with reading_from_replica():
+            return view_func(request, *args, **kwargs)
+    return wrapper
+
+
+class ReplicaPinMiddleware:
+    """After a request that may have written, read from the primary for REPLICA_PIN_SECONDS."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in ('GET', 'HEAD', 'OPTIONS', 'TRACE') and REPLICA in settings.DATABASES:
+            response.set_cookie(
+                PIN_COOKIE, '1', max_age=_setting('REPLICA_PIN_SECONDS', 60), httponly=True, samesite='Lax'
+            )
+        return response
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _replica_reads.get()
+        if state is None or state['pinned'] or REPLICA not in settings.DATABASES:
+            return None
+        if connections[PRIMARY].in_atomic_block:
+            return None
+        if not replica_is_healthy():
+            return None
+        return REPLICA
+
+    def db_for_write(self, model, **hints):
+        state = _replica_reads.get()
+        if state is not None:
+            # Read your writes for the rest of the block
+            state['pinned'] = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica is a copy of the primary and is never migrated itself
+        return db == PRIMARY
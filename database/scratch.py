@@ -0,0 +1,39 @@
+"""
+Throwaway databases for benchmarks.
+
+``scratch_database()`` points the ``default`` alias at another database for
+the duration of a block, in every thread, and puts the original settings
+back afterwards. Management commands use it to measure against data they
+create without touching the configured database.
+"""
+from contextlib import contextmanager
+
+from django.core.management import call_command
+from django.db import connections
+
+
+def _drop_default_connection():
+    try:
+        del connections['default']
+    except AttributeError:
+        # Not opened in this thread yet
+        pass
+
+
+@contextmanager
+def scratch_database(name, engine='database.sqlite3', options=None, migrate=True):
+    # New connections (in every thread) are built from this settings dict
+    connections.close_all()
+    settings_dict = connections.settings['default']
+    saved = dict(settings_dict)
+    settings_dict.update(ENGINE=engine, NAME=name, OPTIONS=options or {}, CONN_MAX_AGE=0)
+    _drop_default_connection()
+    try:
+        if migrate:
+            call_command('migrate', run_syncdb=True, interactive=False, verbosity=0)
+        yield
+    finally:
+        connections.close_all()
+        settings_dict.clear()
+        settings_dict.update(saved)
+        _drop_default_connection()
@@ -0,0 +1,33 @@
+"""
+Write transactions that take the database write lock up front.
+
+A plain ``atomic`` block on SQLite starts with ``BEGIN`` (deferred): it reads
+under a shared snapshot and only asks for the write lock at its first
+``INSERT``. If another connection wrote in between, SQLite can't upgrade the
+snapshot and fails at once with "database is locked", ignoring the busy
+timeout. ``write_atomic`` starts the block with ``BEGIN IMMEDIATE`` instead,
+so concurrent writers queue on the busy timeout at the start of the block.
+
+On other databases, other SQLite backends, or inside an existing atomic
+block it's a plain ``transaction.atomic``.
+"""
+from contextlib import contextmanager
+
+from django.db import transaction
+
+
+@contextmanager
+def write_atomic(using=None):
+    """``transaction.atomic`` beginning with ``BEGIN IMMEDIATE``; also usable as a decorator."""
+    connection = transaction.get_connection(using)
+    immediate = hasattr(connection, 'begin_immediate') and not connection.in_atomic_block
+    if immediate:
+        connection.begin_immediate = True
+    try:
+        with transaction.atomic(using=using):
+            if immediate:
+                connection.begin_immediate = False
+            yield
+    finally:
+        if immediate:
+            connection.begin_immediate = False
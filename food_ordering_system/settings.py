@@ -36,6 +36,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Server-Timing headers, per-request metrics log and query budgets (see instrumentation.metrics)
+    'instrumentation.metrics.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -43,13 +45,18 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Read-your-writes for clients that just changed something (see database.routers)
+    'database.routers.ReplicaPinMiddleware',
+    # Guest carts live in a signed cookie (see orders.cart)
+    'orders.middleware.CartMiddleware',
 ]
 
 ROOT_URLCONF = 'food_ordering_system.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # Django's backend, plus render timing for the instrumentation middleware
+        'BACKEND': 'instrumentation.templates.DjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -58,6 +65,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'orders.context_processors.cart_summary',
             ],
         },
     },
@@ -66,13 +74,131 @@ TEMPLATES = [
 WSGI_APPLICATION = 'food_ordering_system.wsgi.application'
 
 # Database
+# SQLite with WAL and tuned pragmas (see database/sqlite3/base.py). Connections
+# are kept for CONN_MAX_AGE seconds and checked before reuse.
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'database.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 600)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Seconds a writer waits for the lock (PRAGMA busy_timeout)
+            'timeout': int(os.environ.get('DB_BUSY_TIMEOUT', 20)),
+        },
     }
 }
 
+# Seconds each kanban poll reads back (see foodapp.kanban.changes_since); a write
+# can commit up to the busy timeout after its updated_at was stamped
+KANBAN_CHANGES_OVERLAP = int(os.environ.get('DB_BUSY_TIMEOUT', 20)) + 10
+
+# Optional read replica for reports and dashboards (see database/routers.py).
+# For SQLite, keep the copy fresh with `manage.py sync_replica --interval 10`.
+if os.environ.get('DB_REPLICA_NAME'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.environ['DB_REPLICA_NAME'],
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['database.routers.ReplicaRouter']
+# Seconds of replica lag tolerated before reports fall back to the primary
+REPLICA_MAX_LAG = int(os.environ.get('DB_REPLICA_MAX_LAG', 30))
+# Seconds a client reads from the primary after writing something
+REPLICA_PIN_SECONDS = 60
+
+# Request instrumentation
+# Views over their @query_budget only log a warning; the test runner turns this on
+# so they fail the test instead
+QUERY_BUDGET_ENFORCE = False
+TEST_RUNNER = 'instrumentation.testing.QueryBudgetTestRunner'
+
+# Logging
+# One JSON line per request on the "instrumentation" logger; raise its level to silence it
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'instrumentation': {
+            'handlers': ['console'],
+            'level': os.environ.get('INSTRUMENTATION_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
+# Caches
+# Local memory by default, one store per alias. CACHE_BACKEND=file switches to
+# files on disk, under CACHE_LOCATION (default BASE_DIR/cache) with a directory
+# per alias, so tests and CI can run against a cache that several processes share.
+# In production point every alias at a shared cache, e.g.
+# CACHE_BACKEND=django.core.cache.backends.redis.RedisCache and
+# CACHE_LOCATION=redis://127.0.0.1:6379/1; KEY_PREFIX keeps the aliases apart, but
+# clear() flushes the whole Redis database, every alias included.
+# Local memory is per process: with several workers, menu catalog and report
+# invalidations only reach the worker that made them, and the others serve stale
+# entries until their TTL runs out (a day for the menu catalog).
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+}
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'locmem')
+CACHE_BACKEND = CACHE_BACKENDS.get(CACHE_BACKEND, CACHE_BACKEND)
+CACHE_LOCATION = os.environ.get('CACHE_LOCATION', '')
+SHARED_CACHE = CACHE_BACKEND not in (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def cache_location(alias):
+    if CACHE_BACKEND == 'django.core.cache.backends.filebased.FileBasedCache':
+        # clear() empties the directory, so each alias needs its own
+        return os.path.join(CACHE_LOCATION or BASE_DIR / 'cache', alias)
+    return CACHE_LOCATION or alias
+
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': cache_location('default'),
+        'KEY_PREFIX': 'default',
+        'TIMEOUT': 300,
+    },
+    # Menu catalog snapshots, invalidated by version tags rather than TTL
+    'menu': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': cache_location('menu'),
+        'KEY_PREFIX': 'menu',
+        'TIMEOUT': 60 * 60 * 24,
+    },
+    'sessions': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': cache_location('sessions'),
+        'KEY_PREFIX': 'sessions',
+        'TIMEOUT': 60 * 60 * 24 * 14,
+    },
+    # Short-lived report and chart data
+    'reports': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': cache_location('reports'),
+        'KEY_PREFIX': 'reports',
+        'TIMEOUT': 60,
+    },
+}
+
+# Sessions are written through to the database and read from the cache, but only
+# when the cache is shared: with a per-process cache a logout would clear just
+# one worker's copy and the others would keep the session alive
+if SHARED_CACHE:
+    SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+    SESSION_CACHE_ALIAS = 'sessions'
+else:
+    SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -119,6 +245,15 @@ LOGOUT_REDIRECT_URL = 'home'
 CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
 CRISPY_TEMPLATE_PACK = "bootstrap5"
 
+# Order status push channel (see orders.events); swap for a shared broker when running several processes
+ORDER_EVENTS_BROKER = 'orders.events.InProcessBroker'
+
+# Delivery estimates (see orders.eta): orders cooked side by side, minutes on the road,
+# and how often each process reloads the kitchen queue to catch other processes' changes
+KITCHEN_STATIONS = 2
+DELIVERY_MINUTES = 25
+KITCHEN_QUEUE_REFRESH = 60
+
 # Rest Framework
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
@@ -131,6 +266,6 @@ REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'pagination.keyset.KeysetPagination',
     'PAGE_SIZE': 10,
 }
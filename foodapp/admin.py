@@ -1,9 +1,15 @@
 from django.contrib import admin
+from django.db.models import OuterRef, Subquery, Sum
+from pagination.estimated import EstimatedCountPaginator
 from .models import Customer, MenuItem, Order, OrderItem, Delivery, Expense, Category
 
 class OrderItemInline(admin.TabularInline):
     model = OrderItem
     extra = 1
+    autocomplete_fields = ('menu_item',)
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('menu_item')
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
@@ -20,27 +26,53 @@ class CustomerAdmin(admin.ModelAdmin):
 class MenuItemAdmin(admin.ModelAdmin):
     list_display = ('name', 'category', 'price', 'is_available')
     list_filter = ('category', 'is_available')
+    list_select_related = ('category',)
     search_fields = ('name',)
 
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
-    list_display = ('id', 'customer', 'status', 'created_at', 'total_price')
-    list_filter = ('status', 'created_at')
+    list_display = ('id', 'customer', 'status', 'item_count', 'created_at', 'total_price')
+    list_filter = ('status',)
+    list_select_related = ('customer',)
     search_fields = ('customer__name',)
+    autocomplete_fields = ('customer',)
+    # business_date leads foodapp_order_bdate_idx, so drilling down is an index range scan
+    date_hierarchy = 'business_date'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     inlines = [OrderItemInline]
+    
+    def get_queryset(self, request):
+        # Per-row subquery, evaluated only for the rows on the page
+        item_count = OrderItem.objects.filter(order=OuterRef('pk')).order_by().values('order').annotate(
+            count=Sum('quantity')
+        ).values('count')
+        return super().get_queryset(request).annotate(item_count=Subquery(item_count))
+    
+    @admin.display(description='Items', ordering='item_count')
+    def item_count(self, obj):
+        return obj.item_count or 0
 
 @admin.register(OrderItem)
 class OrderItemAdmin(admin.ModelAdmin):
     list_display = ('order', 'menu_item', 'quantity')
     list_filter = ('order__status',)
+    # Order.__str__ shows the customer's name
+    list_select_related = ('order__customer', 'menu_item')
+    autocomplete_fields = ('order', 'menu_item')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 @admin.register(Delivery)
 class DeliveryAdmin(admin.ModelAdmin):
     list_display = ('order', 'delivery_person', 'delivered_at')
     list_filter = ('delivered_at',)
+    list_select_related = ('order',)
+    raw_id_fields = ('order',)
 
 @admin.register(Expense)
 class ExpenseAdmin(admin.ModelAdmin):
     list_display = ('description', 'amount', 'date')
     list_filter = ('date',)
     search_fields = ('description',)
+    date_hierarchy = 'date'
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class FoodappConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'foodapp'
+
+    def ready(self):
+        # Invalidate the cached menu catalog and resize new images when the menu changes
+        from . import signals  # noqa: F401
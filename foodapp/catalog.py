@@ -0,0 +1,40 @@
+from django.db.models import Prefetch
+
+from caching.helpers import VersionedSnapshot
+from .models import Category, MenuItem
+
+SNAPSHOT_TIMEOUT = 60 * 60 * 24
+
+
+class FoodappCatalog:
+    """
+    Snapshot of the categories (with their available items prefetched) and the
+    uncategorised items shown on the menu and order pages. Pickled into the
+    cache, so those pages render without touching the database.
+    """
+
+    def __init__(self, version, categories, menu_items_no_category):
+        self.version = version
+        self.categories = categories
+        self.menu_items_no_category = menu_items_no_category
+
+
+def build_catalog(version):
+    categories = list(Category.objects.prefetch_related(
+        Prefetch('menu_items', queryset=MenuItem.objects.filter(is_available=True))
+    ))
+    menu_items_no_category = list(MenuItem.objects.filter(category__isnull=True, is_available=True))
+    return FoodappCatalog(version, categories, menu_items_no_category)
+
+
+catalog = VersionedSnapshot('foodapp:catalog', build_catalog, timeout=SNAPSHOT_TIMEOUT, alias='menu')
+
+
+def get_catalog():
+    """Return the current catalog snapshot, building and caching it on a miss."""
+    return catalog.get()
+
+
+def invalidate_catalog():
+    """Move to a new catalog version; the old snapshot simply expires."""
+    catalog.invalidate()
@@ -0,0 +1,160 @@
+"""
+Bulk order import for replaying POS and aggregator orders.
+
+A batch is validated record by record, menu items and customers are resolved
+with one ``in_bulk`` each, and valid records are written with ``bulk_create``
+in chunks, each chunk in its own transaction. A record may carry the time it
+was originally placed (``placed_at``), which then sets ``created_at`` and the
+business day. Every record carries an
+idempotency key; a key that is already stored is reported as a duplicate
+instead of creating a second order, so a whole batch can safely be replayed.
+
+Relies on ``bulk_create`` returning primary keys (SQLite 3.35+, PostgreSQL,
+MariaDB 10.5+).
+"""
+from django.db import IntegrityError
+from django.db.models import Case, DateTimeField, Value, When
+from django.utils import timezone
+
+from database.transactions import write_atomic
+from .models import Customer, MenuItem, Order, OrderItem
+from .serializers import BulkOrderSerializer
+
+MAX_BATCH_SIZE = 5000
+CHUNK_SIZE = 500
+
+CREATED = 'created'
+DUPLICATE = 'duplicate'
+ERROR = 'error'
+
+
+def _result(index, key, status, order=None, errors=None):
+    result = {'index': index, 'idempotency_key': key, 'status': status}
+    if order is not None:
+        result['order'] = order
+    if errors:
+        result['errors'] = errors
+    return result
+
+
+def ingest_orders(records, chunk_size=CHUNK_SIZE):
+    """Import ``records`` and return one result dict per record, in input order."""
+    results = [None] * len(records)
+
+    valid = []
+    for index, record in enumerate(records):
+        serializer = BulkOrderSerializer(data=record)
+        if serializer.is_valid():
+            valid.append((index, serializer.validated_data))
+        else:
+            key = record.get('idempotency_key') if isinstance(record, dict) else None
+            results[index] = _result(index, key, ERROR, errors=serializer.errors)
+
+    # Resolve every referenced menu item and customer with one query each
+    menu_items = MenuItem.objects.in_bulk({item['menu_item'] for _, data in valid for item in data['items']})
+    customers = Customer.objects.in_bulk({data['customer'] for _, data in valid if 'customer' in data})
+
+    pending = []
+    first_by_key = {}
+    repeats = []
+    for index, data in valid:
+        key = data['idempotency_key']
+        errors = {}
+        missing = sorted({item['menu_item'] for item in data['items']} - menu_items.keys())
+        if missing:
+            errors['items'] = [f'Unknown menu item id(s): {", ".join(map(str, missing))}.']
+        if 'customer' in data and data['customer'] not in customers:
+            errors['customer'] = [f'Unknown customer id: {data["customer"]}.']
+        if errors:
+            results[index] = _result(index, key, ERROR, errors=errors)
+        elif key in first_by_key:
+            # The same order twice in one batch resolves to whatever the first copy became
+            repeats.append((index, first_by_key[key]))
+        else:
+            first_by_key[key] = index
+            pending.append((index, data))
+
+    for start in range(0, len(pending), chunk_size):
+        chunk = pending[start:start + chunk_size]
+        try:
+            _write_chunk(chunk, menu_items, customers, results)
+        except IntegrityError:
+            # A concurrent import stored some of these keys first; the retry sees them as duplicates
+            try:
+                _write_chunk(chunk, menu_items, customers, results)
+            except IntegrityError:
+                for index, data in chunk:
+                    results[index] = _result(
+                        index, data['idempotency_key'], ERROR,
+                        errors={'non_field_errors': ['Could not be stored; retry the batch.']}
+                    )
+
+    for index, first_index in repeats:
+        first = results[first_index]
+        if first['status'] == ERROR:
+            results[index] = _result(index, first['idempotency_key'], ERROR, errors=first['errors'])
+        else:
+            results[index] = _result(index, first['idempotency_key'], DUPLICATE, order=first['order'])
+
+    return results
+
+
+@write_atomic()
+def _write_chunk(chunk, menu_items, customers, results):
+    keys = [data['idempotency_key'] for _, data in chunk]
+    existing = Order.objects.filter(idempotency_key__in=keys).only('id', 'idempotency_key').in_bulk(
+        field_name='idempotency_key'
+    )
+
+    new = []
+    for index, data in chunk:
+        order = existing.get(data['idempotency_key'])
+        if order is not None:
+            results[index] = _result(index, data['idempotency_key'], DUPLICATE, order=order.pk)
+        else:
+            new.append((index, data))
+    if not new:
+        return
+
+    # Records without a customer id bring their own customer details
+    new_customers = iter(Customer.objects.bulk_create([
+        Customer(
+            name=data.get('customer_name', ''),
+            phone=data.get('customer_phone', ''),
+            address=data.get('customer_address', ''),
+        )
+        for _, data in new if 'customer' not in data
+    ]))
+
+    # Orders count on the day they were placed; without placed_at that is today
+    today = timezone.localdate()
+    orders = Order.objects.bulk_create([
+        Order(
+            customer=customers[data['customer']] if 'customer' in data else next(new_customers),
+            status=data['status'],
+            business_date=timezone.localdate(data['placed_at']) if 'placed_at' in data else today,
+            idempotency_key=data['idempotency_key'],
+            # Overridden by auto_now_add on insert; written through below
+            created_at=data.get('placed_at'),
+        )
+        for _, data in new
+    ])
+    placed = [(order.pk, data['placed_at']) for order, (_, data) in zip(orders, new) if 'placed_at' in data]
+    if placed:
+        Order.objects.filter(pk__in=[pk for pk, _ in placed]).update(created_at=Case(
+            *[When(pk=pk, then=Value(placed_at)) for pk, placed_at in placed],
+            output_field=DateTimeField(),
+        ))
+
+    OrderItem.objects.bulk_create([
+        OrderItem(
+            order=order, menu_item=menu_items[item['menu_item']], quantity=item['quantity'],
+            unit_price=menu_items[item['menu_item']].price,
+        )
+        for order, (_, data) in zip(orders, new)
+        for item in data['items']
+    ])
+    Order.objects.filter(pk__in=[order.pk for order in orders]).update_totals()
+
+    for order, (index, data) in zip(orders, new):
+        results[index] = _result(index, data['idempotency_key'], CREATED, order=order.pk)
@@ -0,0 +1,135 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import Prefetch, Q, prefetch_related_objects
+from django.utils import timezone
+
+from .models import Order, OrderItem
+
+# Column order on the manager kanban board, one per order status
+KANBAN_STATUSES = [status for status, label in Order.STATUS_CHOICES]
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def is_on_board(order, today):
+    # Delivered orders only stay on the board on the day they were placed
+    if order.status == 'delivered':
+        return order.business_date == today
+    return True
+
+
+def kanban_orders(today):
+    """
+    Every order shown on the kanban board, with customer, delivery and items
+    (with their menu items) loaded up front: two queries however many cards
+    are on the board.
+    """
+    return Order.objects.filter(
+        Q(status__in=['new', 'kitchen', 'ready', 'cancelled']) |
+        # Show only today's delivered orders
+        Q(status='delivered', business_date=today)
+    ).with_items().select_related('delivery').order_by('-created_at')
+
+
+def kanban_columns(today):
+    """Split ``kanban_orders`` into ``{status: [orders]}``, newest first."""
+    columns = {status: [] for status in KANBAN_STATUSES}
+    for order in kanban_orders(today):
+        columns[order.status].append(order)
+    return columns
+
+
+def change_overlap():
+    """
+    How far back each poll looks again. ``updated_at`` is set before a writer
+    waits for the database lock, so a change can commit up to the busy
+    timeout after later-stamped ones; this must be at least that long.
+    """
+    return timedelta(seconds=getattr(settings, 'KANBAN_CHANGES_OVERLAP', 30))
+
+
+def _micros(updated_at):
+    return (updated_at - EPOCH) // timedelta(microseconds=1)
+
+
+def encode_cursor(updated_at, order_id, sent=()):
+    """
+    Cursor for the change feed: the newest change sent (microseconds since
+    the epoch and order id), then the ``(order_id, updated_at)`` changes sent
+    within the overlap window before it, so the next poll can skip them.
+    """
+    cursor = f'{_micros(updated_at)}-{order_id}'
+    if sent:
+        cursor += '.' + ','.join(f'{sent_id}:{_micros(sent_at)}' for sent_id, sent_at in sorted(sent))
+    return cursor
+
+
+def decode_cursor(cursor):
+    """Inverse of ``encode_cursor``; raises ValueError on malformed input."""
+    head, _, tail = cursor.partition('.')
+    micros, order_id = head.split('-')
+    updated_at = EPOCH + timedelta(microseconds=int(micros))
+    sent = set()
+    for pair in filter(None, tail.split(',')):
+        sent_id, sent_micros = pair.split(':')
+        sent.add((int(sent_id), EPOCH + timedelta(microseconds=int(sent_micros))))
+    return updated_at, int(order_id), sent
+
+
+def latest_cursor():
+    """
+    Cursor pointing at the most recently changed order, or '' when there are
+    none. Changes inside the overlap window are already on the board being
+    rendered, so they are marked as sent (the newest included, since each
+    poll reads it back).
+    """
+    recent = list(
+        Order.objects.filter(updated_at__gte=timezone.now() - change_overlap())
+        .order_by('-updated_at', '-id').values_list('id', 'updated_at')
+    )
+    if not recent:
+        recent = list(Order.objects.order_by('-updated_at', '-id').values_list('id', 'updated_at')[:1])
+    if not recent:
+        return ''
+    latest_id, latest_at = recent[0]
+    return encode_cursor(latest_at, latest_id, [
+        (order_id, updated_at) for order_id, updated_at in recent if updated_at >= latest_at - change_overlap()
+    ])
+
+
+def changes_since(cursor, limit=100):
+    """
+    Orders changed after ``cursor``, oldest change first, walking the
+    (updated_at, id) index. Returns ``(orders, next_cursor, has_more)``; an
+    idle board costs a single indexed query.
+
+    Each poll reads back over the overlap window as well, so a change that
+    committed after a later-stamped one is still sent; changes the cursor
+    records as sent are skipped.
+    """
+    orders = Order.objects.select_related('customer', 'delivery').order_by('updated_at', 'id')
+    sent = set()
+    if cursor:
+        latest_at, latest_id, sent = decode_cursor(cursor)
+        orders = orders.filter(updated_at__gte=latest_at - change_overlap())
+    else:
+        latest_at, latest_id = None, None
+
+    # Skipped rows take up slots too
+    rows = list(orders[:limit + 1 + len(sent)])
+    changed = [order for order in rows if (order.id, order.updated_at) not in sent]
+    has_more = len(changed) > limit
+    changed = changed[:limit]
+    if not changed:
+        return [], cursor, False
+
+    prefetch_related_objects(
+        changed, Prefetch('items', queryset=OrderItem.objects.select_related('menu_item'))
+    )
+    last = changed[-1]
+    if latest_at is None or (last.updated_at, last.id) > (latest_at, latest_id):
+        latest_at, latest_id = last.updated_at, last.id
+    sent |= {(order.id, order.updated_at) for order in changed}
+    sent = {(order_id, updated_at) for order_id, updated_at in sent if updated_at >= latest_at - change_overlap()}
+    return changed, encode_cursor(latest_at, latest_id, sent), has_more
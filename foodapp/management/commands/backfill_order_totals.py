@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from foodapp.models import Order
+
+
+class Command(BaseCommand):
+    help = 'Recompute the stored total_price of foodapp orders from their items.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help='Orders updated per UPDATE statement.')
+
+    def handle(self, *args, **options):
+        batch_size = max(options['batch_size'], 1)
+        updated = 0
+        last_id = 0
+        while True:
+            ids = list(
+                Order.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            updated += Order.objects.filter(id__in=ids).update_totals()
+            last_id = ids[-1]
+
+        self.stdout.write(self.style.SUCCESS(f'Updated totals for {updated} orders.'))
@@ -0,0 +1,47 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from thumbnails.derivatives import generate_many
+
+# (app label, model, image field) of every uploaded photo shown on the menu
+IMAGE_FIELDS = (
+    ('menu', 'MenuItem', 'image'),
+    ('menu', 'Category', 'image'),
+    ('foodapp', 'MenuItem', 'image'),
+)
+
+
+class Command(BaseCommand):
+    help = 'Generate resized WebP/JPEG derivatives for existing menu and category images.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Regenerate derivatives that already exist.')
+        parser.add_argument(
+            '--processes', type=int, default=None, help='Worker processes (default: one per CPU; 1 runs inline).'
+        )
+
+    def handle(self, *args, **options):
+        names = set()
+        for app_label, model_name, field in IMAGE_FIELDS:
+            if not apps.is_installed(app_label):
+                continue
+            model = apps.get_model(app_label, model_name)
+            names.update(
+                model.objects.exclude(**{f'{field}__isnull': True}).exclude(**{field: ''}).values_list(field, flat=True)
+            )
+
+        generated = skipped = failed = 0
+        for name, written, error in generate_many(sorted(names), options['force'], options['processes']):
+            if error:
+                failed += 1
+                self.stderr.write(f'{name}: {error}')
+            elif written:
+                generated += 1
+                if options['verbosity'] > 1:
+                    self.stdout.write(f'{name}: {written} derivative(s)')
+            else:
+                skipped += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated derivatives for {generated} image(s); {skipped} already done, {failed} failed.'
+        ))
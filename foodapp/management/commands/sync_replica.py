@@ -0,0 +1,50 @@
+import sqlite3
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from database.routers import HEARTBEAT_TABLE, PRIMARY, REPLICA
+
+
+class Command(BaseCommand):
+    help = (
+        'Copy the SQLite primary database into the replica with the online backup API and stamp the '
+        'replica heartbeat used by the lag guard. Repeats every --interval seconds if given.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=None, help='Keep syncing, this many seconds apart.'
+        )
+
+    def handle(self, *args, **options):
+        if REPLICA not in connections.settings:
+            raise CommandError('No "replica" database is configured (set DB_REPLICA_NAME).')
+        for alias in (PRIMARY, REPLICA):
+            if connections[alias].vendor != 'sqlite':
+                raise CommandError('sync_replica copies SQLite files; use the database\'s own replication instead.')
+
+        while True:
+            elapsed = self.sync()
+            self.stdout.write(f'Replica synced in {elapsed * 1000:.0f} ms.')
+            if options['interval'] is None:
+                break
+            time.sleep(max(options['interval'] - elapsed, 0))
+
+    def sync(self):
+        started = time.time()
+        # Raw connections: the backup API works on whole files, outside Django's pragmas and transactions
+        source = sqlite3.connect(connections[PRIMARY].settings_dict['NAME'])
+        target = sqlite3.connect(connections[REPLICA].settings_dict['NAME'])
+        try:
+            # Readers of the replica keep their connections; the copy is written in place
+            source.backup(target)
+            # The copy is as fresh as the moment the backup started
+            target.execute(f'CREATE TABLE IF NOT EXISTS {HEARTBEAT_TABLE} (id INTEGER PRIMARY KEY, synced_at REAL)')
+            target.execute(f'INSERT OR REPLACE INTO {HEARTBEAT_TABLE} (id, synced_at) VALUES (1, ?)', [started])
+            target.commit()
+        finally:
+            source.close()
+            target.close()
+        return time.time() - started
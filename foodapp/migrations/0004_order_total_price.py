@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-16 09:12
+
+from django.db import migrations, models
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_order_totals(apps, schema_editor):
+    Order = apps.get_model('foodapp', 'Order')
+    OrderItem = apps.get_model('foodapp', 'OrderItem')
+    items_total = OrderItem.objects.filter(
+        order=OuterRef('pk')
+    ).values('order').annotate(
+        total=Sum(F('menu_item__price') * F('quantity'), output_field=DecimalField(max_digits=10, decimal_places=2))
+    ).values('total')
+    Order.objects.update(total_price=Coalesce(
+        Subquery(items_total),
+        Value(0),
+        output_field=DecimalField(max_digits=10, decimal_places=2)
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodapp', '0003_alter_customer_address_alter_customer_name_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='total_price',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=10),
+        ),
+        migrations.RunPython(backfill_order_totals, migrations.RunPython.noop),
+    ]
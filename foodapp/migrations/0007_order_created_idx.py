@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-16 22:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodapp', '0006_order_business_date'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['created_at', 'id'], name='foodapp_order_created_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-16 23:58
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def fill_unit_price(apps, schema_editor):
+    # Existing lines take today's menu price, which is what their order totals were built from
+    MenuItem = apps.get_model('foodapp', 'MenuItem')
+    OrderItem = apps.get_model('foodapp', 'OrderItem')
+    OrderItem.objects.update(
+        unit_price=Subquery(MenuItem.objects.filter(pk=OuterRef('menu_item_id')).values('price')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodapp', '0008_order_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderitem',
+            name='unit_price',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=6),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_unit_price, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,9 @@
+from decimal import Decimal
+
 from django.db import models
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 
 class Customer(models.Model):
     name = models.CharField(max_length=100, blank=True, null=True)
@@ -35,6 +40,30 @@ class MenuItem(models.Model):
     def __str__(self):
         return self.name
 
+class OrderQuerySet(models.QuerySet):
+    def with_items(self):
+        # Customer joined in, items and their menu items prefetched: two queries for any number of orders
+        return self.select_related('customer').prefetch_related(
+            models.Prefetch('items', queryset=OrderItem.objects.select_related('menu_item'))
+        )
+    
+    def update_totals(self):
+        # Recompute the stored total of every order in the queryset with a single UPDATE
+        items_total = OrderItem.objects.filter(
+            order=OuterRef('pk')
+        ).values('order').annotate(
+            total=Sum(F('unit_price') * F('quantity'), output_field=DecimalField(max_digits=10, decimal_places=2))
+        ).values('total')
+        return self.update(
+            total_price=Coalesce(
+                Subquery(items_total),
+                Value(0),
+                output_field=DecimalField(max_digits=10, decimal_places=2)
+            ),
+            # The card content changed, so kanban clients polling for changes must see it
+            updated_at=timezone.now()
+        )
+
 class Order(models.Model):
     STATUS_CHOICES = [
         ('new', 'New'),
@@ -46,21 +75,71 @@ class Order(models.Model):
     customer = models.ForeignKey(Customer, on_delete=models.CASCADE)
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='new')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Denormalized sum of item unit price x quantity, kept in sync by OrderItem.save and
+    # the OrderItem post_delete receiver (see foodapp.signals)
+    total_price = models.DecimalField(max_digits=10, decimal_places=2, default=0, editable=False)
+    # Local date the order was placed on; reports filter on it instead of created_at__date
+    business_date = models.DateField(editable=False)
+    # Client-supplied key for orders imported in bulk, so replaying a batch doesn't duplicate them
+    idempotency_key = models.CharField(max_length=100, unique=True, null=True, blank=True, editable=False)
+    
+    objects = OrderQuerySet.as_manager()
+    
+    class Meta:
+        indexes = [
+            # Kanban "changes since cursor" polling walks (updated_at, id)
+            models.Index(fields=['updated_at', 'id'], name='foodapp_order_updated_idx'),
+            models.Index(fields=['status', 'created_at'], name='foodapp_order_status_idx'),
+            models.Index(fields=['business_date', 'status'], name='foodapp_order_bdate_idx'),
+            # API list pages on (created_at, id)
+            models.Index(fields=['created_at', 'id'], name='foodapp_order_created_idx'),
+        ]
     
     def __str__(self):
         return f"Order #{self.id} - {self.customer.name}"
     
-    @property
-    def total_price(self):
-        return sum(item.menu_item.price * item.quantity for item in self.items.all())
+    def save(self, *args, **kwargs):
+        if self.business_date is None:
+            self.business_date = timezone.localdate(self.created_at or timezone.now())
+        super().save(*args, **kwargs)
+    
+    def update_total(self):
+        Order.objects.filter(pk=self.pk).update_totals()
+        self.refresh_from_db(fields=['total_price'])
 
 class OrderItem(models.Model):
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='items')
     menu_item = models.ForeignKey(MenuItem, on_delete=models.CASCADE)
     quantity = models.PositiveIntegerField()
+    # The menu price when the item was ordered; later menu price changes don't reprice orders
+    unit_price = models.DecimalField(max_digits=6, decimal_places=2, editable=False)
     
     def __str__(self):
         return f"{self.quantity} x {self.menu_item.name}"
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored order so moving the item recomputes the order it left too,
+        # and the stored menu item so swapping it takes the new item's price
+        if 'order_id' in field_names:
+            instance._stored_order_id = instance.order_id
+        if 'menu_item_id' in field_names:
+            instance._stored_menu_item_id = instance.menu_item_id
+        return instance
+    
+    def _affected_order_ids(self):
+        return {self.order_id, getattr(self, '_stored_order_id', self.order_id)}
+    
+    def save(self, *args, **kwargs):
+        if self.unit_price is None or self.menu_item_id != getattr(self, '_stored_menu_item_id', self.menu_item_id):
+            self.unit_price = self.menu_item.price
+        order_ids = self._affected_order_ids()
+        super().save(*args, **kwargs)
+        self._stored_order_id = self.order_id
+        self._stored_menu_item_id = self.menu_item_id
+        Order.objects.filter(pk__in=order_ids).update_totals()
 
 class Delivery(models.Model):
     order = models.OneToOneField(Order, on_delete=models.CASCADE)
@@ -81,5 +160,5 @@ class Expense(models.Model):
     def save(self, *args, **kwargs):
         # Ensure amount is stored as a decimal
         if isinstance(self.amount, str):
-            self.amount = float(self.amount)
+            self.amount = Decimal(self.amount)
         super().save(*args, **kwargs)
@@ -1,3 +1,4 @@
+from django.utils import timezone
 from rest_framework import serializers
 from .models import Customer, Order, OrderItem, MenuItem, Delivery, Expense
 
@@ -13,7 +14,8 @@ class MenuItemSerializer(serializers.ModelSerializer):
 
 class OrderItemSerializer(serializers.ModelSerializer):
     menu_item_name = serializers.ReadOnlyField(source='menu_item.name')
-    menu_item_price = serializers.ReadOnlyField(source='menu_item.price')
+    # The price the order was charged, not the current menu price
+    menu_item_price = serializers.ReadOnlyField(source='unit_price')
     
     class Meta:
         model = OrderItem
@@ -22,6 +24,7 @@ class OrderItemSerializer(serializers.ModelSerializer):
 class OrderSerializer(serializers.ModelSerializer):
     items = OrderItemSerializer(many=True, read_only=True)
     customer_name = serializers.ReadOnlyField(source='customer.name')
+    # Stored on the order and kept current from its items' unit prices
     total_price = serializers.ReadOnlyField()
     
     class Meta:
@@ -30,11 +33,42 @@ class OrderSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         items_data = self.context.get('items_data', [])
+        # One query for the prices, one INSERT for the items and one UPDATE for the total
+        menu_item_ids = [getattr(item_data['menu_item'], 'pk', item_data['menu_item']) for item_data in items_data]
+        menu_items = MenuItem.objects.in_bulk(menu_item_ids)
+        unknown = set(menu_item_ids) - set(menu_items)
+        if unknown:
+            raise serializers.ValidationError({'items': f'Unknown menu items: {sorted(unknown, key=str)}'})
         order = Order.objects.create(**validated_data)
-        for item_data in items_data:
-            OrderItem.objects.create(order=order, **item_data)
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, menu_item=menu_items[menu_item_id], quantity=item_data['quantity'],
+                      unit_price=menu_items[menu_item_id].price)
+            for menu_item_id, item_data in zip(menu_item_ids, items_data)
+        ])
+        order.update_total()
         return order
 
+class BulkOrderItemSerializer(serializers.Serializer):
+    menu_item = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=1)
+
+class BulkOrderSerializer(serializers.Serializer):
+    """One record of a bulk import; menu items and customers are resolved by ``foodapp.ingest``."""
+    idempotency_key = serializers.CharField(max_length=100)
+    customer = serializers.IntegerField(required=False)
+    customer_name = serializers.CharField(max_length=100, required=False, allow_blank=True)
+    customer_phone = serializers.CharField(max_length=15, required=False, allow_blank=True)
+    customer_address = serializers.CharField(required=False, allow_blank=True)
+    status = serializers.ChoiceField(choices=Order.STATUS_CHOICES, default='new')
+    # When the order was originally taken; replays of an outage keep their own business day
+    placed_at = serializers.DateTimeField(required=False)
+    items = BulkOrderItemSerializer(many=True, allow_empty=False)
+
+    def validate_placed_at(self, value):
+        if value > timezone.now():
+            raise serializers.ValidationError('Cannot be in the future.')
+        return value
+
 class DeliverySerializer(serializers.ModelSerializer):
     class Meta:
         model = Delivery
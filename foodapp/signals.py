@@ -0,0 +1,28 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from thumbnails.derivatives import generate_on_commit
+from .catalog import invalidate_catalog
+from .models import Category, MenuItem, Order, OrderItem
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=MenuItem)
+@receiver(post_delete, sender=MenuItem)
+def menu_changed(sender, **kwargs):
+    transaction.on_commit(invalidate_catalog)
+
+
+@receiver(post_save, sender=MenuItem)
+def menu_item_image_saved(sender, instance, **kwargs):
+    # Resized WebP/JPEG copies for srcset; skipped when they already exist
+    generate_on_commit(instance.image)
+
+
+@receiver(post_delete, sender=OrderItem)
+def order_item_deleted(sender, instance, **kwargs):
+    # Also runs for cascades (a deleted menu item takes its order lines with it),
+    # which never call OrderItem.delete
+    Order.objects.filter(pk=instance.order_id).update_totals()
@@ -0,0 +1,45 @@
+from django import template
+from django.forms.utils import flatatt
+from django.utils.html import format_html, format_html_join
+
+from thumbnails.derivatives import FORMATS, WIDTHS, derivative_name, has_derivatives
+
+register = template.Library()
+
+# Width used for the plain src of browsers without srcset support
+FALLBACK_WIDTH = 640
+
+
+@register.simple_tag
+def responsive_image(image, alt='', sizes='100vw', **attrs):
+    """
+    ``{% responsive_image item.image alt=item.name sizes="(min-width: 768px) 33vw, 100vw" class="card-img-top" %}``
+
+    Renders a lazily loaded ``<picture>`` with WebP and JPEG ``srcset``s of the
+    image's derivatives, or the original upload until they have been generated.
+    """
+    if not image:
+        return ''
+    attrs = {'alt': alt, 'loading': 'lazy', 'decoding': 'async', **attrs}
+    if not has_derivatives(image):
+        return format_html('<img src="{}"{}>', image.url, flatatt(attrs))
+
+    storage = image.storage
+
+    def srcset(extension):
+        return ', '.join(
+            f'{storage.url(derivative_name(image.name, width, extension))} {width}w' for width in WIDTHS
+        )
+
+    sources = format_html_join(
+        '', '<source type="{}" srcset="{}" sizes="{}">',
+        ((mime_type, srcset(extension), sizes) for extension, (_, mime_type) in FORMATS.items() if extension != 'jpeg')
+    )
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" sizes="{}"{}></picture>',
+        sources,
+        storage.url(derivative_name(image.name, FALLBACK_WIDTH, 'jpeg')),
+        srcset('jpeg'),
+        sizes,
+        flatatt(attrs)
+    )
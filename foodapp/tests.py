@@ -0,0 +1,129 @@
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from .kanban import kanban_orders
+from .models import Customer, MenuItem, Order, OrderItem
+
+
+def create_orders(count, items_per_order=3):
+    customer = Customer.objects.create(name='Test Customer', phone='555-0100', address='1 Test Street')
+    menu_items = [
+        MenuItem.objects.create(name=f'Item {number}', price=number + 5) for number in range(items_per_order)
+    ]
+    statuses = [status for status, label in Order.STATUS_CHOICES]
+    orders = Order.objects.bulk_create(
+        Order(customer=customer, status=statuses[number % len(statuses)], business_date=timezone.localdate())
+        for number in range(count)
+    )
+    OrderItem.objects.bulk_create(
+        OrderItem(order=order, menu_item=menu_item, quantity=2, unit_price=menu_item.price)
+        for order in orders for menu_item in menu_items
+    )
+    return orders
+
+
+class OrderTotalTests(TestCase):
+    def setUp(self):
+        customer = Customer.objects.create(name='Test Customer')
+        self.pizza = MenuItem.objects.create(name='Pizza', price=Decimal('10.00'))
+        self.salad = MenuItem.objects.create(name='Salad', price=Decimal('4.00'))
+        self.order = Order.objects.create(customer=customer)
+        self.pizza_line = OrderItem.objects.create(order=self.order, menu_item=self.pizza, quantity=2)
+        OrderItem.objects.create(order=self.order, menu_item=self.salad, quantity=1)
+
+    def assertTotal(self, total):
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.total_price, Decimal(total))
+
+    def test_total_uses_the_price_when_ordered(self):
+        self.assertTotal('24.00')
+        self.pizza.price = Decimal('12.00')
+        self.pizza.save()
+        self.assertTotal('24.00')
+
+        # Changing one line doesn't reprice the others
+        line = OrderItem.objects.get(pk=self.pizza_line.pk)
+        line.quantity = 3
+        line.save()
+        self.assertEqual(line.unit_price, Decimal('10.00'))
+        self.assertTotal('34.00')
+
+    def test_deleting_a_menu_item_updates_the_orders_it_was_on(self):
+        self.salad.delete()
+        self.assertTotal('20.00')
+
+    def test_deleting_items_in_bulk_updates_the_order(self):
+        OrderItem.objects.filter(order=self.order).delete()
+        self.assertTotal('0.00')
+
+
+class ManagerDashboardQueryCountTests(TestCase):
+    def setUp(self):
+        manager = get_user_model().objects.create_user(
+            username='manager', password='secret', role=get_user_model().Role.MANAGER
+        )
+        self.client.force_login(manager)
+
+    def render_board(self):
+        # By path: food_ordering_system's dashboard app reuses the manager_dashboard name
+        response = self.client.get('/manager/')
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_query_count_does_not_grow_with_orders(self):
+        create_orders(5)
+        # Warm up the session and any caches first
+        self.render_board()
+        with CaptureQueriesContext(connection) as queries:
+            self.render_board()
+
+        create_orders(10)
+        with self.assertNumQueries(len(queries)):
+            response = self.render_board()
+        self.assertEqual(sum(len(response.context[name]) for name in (
+            'new_orders', 'kitchen_orders', 'ready_orders', 'delivered_orders', 'cancelled_orders'
+        )), 15)
+
+
+class OrderListQueryCountTests(APITestCase):
+    def setUp(self):
+        # food_ordering_system requires an authenticated API user
+        self.client.force_authenticate(get_user_model().objects.create_user(username='api', password='secret'))
+
+    def list_orders(self):
+        response = self.client.get('/api/orders/')
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_query_count_does_not_grow_with_orders(self):
+        create_orders(1, items_per_order=4)
+        with CaptureQueriesContext(connection) as queries:
+            self.list_orders()
+
+        create_orders(9, items_per_order=4)
+        with self.assertNumQueries(len(queries)):
+            response = self.list_orders()
+        self.assertEqual(len(response.data['results']), 10)
+        self.assertTrue(all(len(order['items']) == 4 for order in response.data['results']))
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Plans are checked in SQLite EXPLAIN QUERY PLAN form')
+class OrderIndexTests(TestCase):
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(f'USING INDEX {index_name}', plan, plan)
+
+    def test_kanban_board_uses_status_and_business_date_indexes(self):
+        queryset = kanban_orders(timezone.localdate())
+        self.assertUsesIndex(queryset, 'foodapp_order_status_idx')
+        self.assertUsesIndex(queryset, 'foodapp_order_bdate_idx')
+
+    def test_daily_orders_use_business_date_index(self):
+        self.assertUsesIndex(Order.objects.filter(business_date=timezone.localdate()), 'foodapp_order_bdate_idx')
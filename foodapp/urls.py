@@ -24,6 +24,7 @@ urlpatterns = [
     
     # Manager Module
     path('manager/', views.manager_dashboard, name='manager_dashboard'),
+    path('manager/changes/', views.kanban_changes, name='kanban_changes'),
     path('manager/order/<int:order_id>/update/', views.update_order_status, name='update_order_status'),
     
     # Owner Module
@@ -1,11 +1,12 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.http import JsonResponse
+from django.template.loader import render_to_string
 from django.db.models import Sum, Count, Prefetch
 from django.utils import timezone
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib.auth.decorators import login_required, user_passes_test
 from rest_framework import viewsets
-from rest_framework.decorators import api_view
+from rest_framework.decorators import action, api_view
 from rest_framework.response import Response
 import json
 from datetime import datetime, timedelta
@@ -13,6 +14,12 @@ from datetime import datetime, timedelta
 from .models import Customer, MenuItem, Order, OrderItem, Delivery, Expense, Category
 from .serializers import CustomerSerializer, MenuItemSerializer, OrderSerializer, OrderItemSerializer, DeliverySerializer, ExpenseSerializer
 from .forms import CustomerForm, OrderForm, OrderItemFormSet
+from .catalog import get_catalog
+from .kanban import kanban_columns, latest_cursor, changes_since, is_on_board
+from .ingest import CREATED, DUPLICATE, ERROR, MAX_BATCH_SIZE, ingest_orders
+from dashboard.aggregation import sum_by_day, daily_series
+from database.routers import use_replica
+from instrumentation.metrics import query_budget
 
 # Helper functions for role-based access
 def is_manager_or_admin(user):
@@ -25,9 +32,10 @@ def is_admin(user):
 class CustomerViewSet(viewsets.ModelViewSet):
     queryset = Customer.objects.all()
     serializer_class = CustomerSerializer
+    keyset_ordering = ('-id',)
 
 class OrderViewSet(viewsets.ModelViewSet):
-    queryset = Order.objects.all().order_by('-created_at')
+    queryset = Order.objects.with_items().order_by('-created_at')
     serializer_class = OrderSerializer
     
     def create(self, request, *args, **kwargs):
@@ -36,32 +44,53 @@ class OrderViewSet(viewsets.ModelViewSet):
         serializer.is_valid(raise_exception=True)
         self.perform_create(serializer)
         return Response(serializer.data)
+    
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        # POS/aggregator replays: {"orders": [{"idempotency_key": ..., "items": [...]}, ...]}
+        records = request.data.get('orders') if isinstance(request.data, dict) else None
+        if not isinstance(records, list):
+            return Response({'error': 'Expected a JSON object with an "orders" list'}, status=400)
+        if len(records) > MAX_BATCH_SIZE:
+            return Response({'error': f'At most {MAX_BATCH_SIZE} orders per batch'}, status=400)
+        
+        results = ingest_orders(records)
+        return Response({
+            'created': sum(1 for result in results if result['status'] == CREATED),
+            'duplicates': sum(1 for result in results if result['status'] == DUPLICATE),
+            'errors': sum(1 for result in results if result['status'] == ERROR),
+            'results': results,
+        })
 
 class MenuItemViewSet(viewsets.ModelViewSet):
+    query_budget = 5
     queryset = MenuItem.objects.all()
     serializer_class = MenuItemSerializer
+    keyset_ordering = ('name', 'id')
 
 class DeliveryViewSet(viewsets.ModelViewSet):
     queryset = Delivery.objects.all()
     serializer_class = DeliverySerializer
+    keyset_ordering = ('-id',)
 
 class ExpenseViewSet(viewsets.ModelViewSet):
+    query_budget = 5
     queryset = Expense.objects.all()
     serializer_class = ExpenseSerializer
+    keyset_ordering = ('-date', '-id')
 
 # Frontend Views
 def home(request):
     return render(request, 'foodapp/home.html')
 
 # Customer Module Views
+@query_budget(6)
 def menu(request):
-    categories = Category.objects.prefetch_related(
-        Prefetch('menu_items', queryset=MenuItem.objects.filter(is_available=True))
-    ).all()
-    menu_items_no_category = MenuItem.objects.filter(category__isnull=True, is_available=True)
+    # Served from the cached menu catalog snapshot
+    catalog = get_catalog()
     return render(request, 'foodapp/menu.html', {
-        'categories': categories,
-        'menu_items_no_category': menu_items_no_category
+        'categories': catalog.categories,
+        'menu_items_no_category': catalog.menu_items_no_category
     })
 
 def place_order(request):
@@ -87,17 +116,15 @@ def place_order(request):
             return redirect('order_confirmation', order_id=order.id)
     else:
         customer_form = CustomerForm()
-        # Get all categories with their available menu items
-        categories = Category.objects.prefetch_related(
-            Prefetch('menu_items', queryset=MenuItem.objects.filter(is_available=True))
-        ).all()
-        # Also get menu items without category
-        menu_items_no_category = MenuItem.objects.filter(category__isnull=True, is_available=True)
+    
+    # Categories with their available menu items, and items without a category,
+    # served from the cached menu catalog snapshot
+    catalog = get_catalog()
     
     return render(request, 'foodapp/place_order.html', {
         'customer_form': customer_form,
-        'categories': categories,
-        'menu_items_no_category': menu_items_no_category
+        'categories': catalog.categories,
+        'menu_items_no_category': catalog.menu_items_no_category
     })
 
 def order_confirmation(request, order_id):
@@ -107,28 +134,49 @@ def order_confirmation(request, order_id):
 # Manager Module Views
 @login_required
 @user_passes_test(is_manager_or_admin, login_url='login')
+@query_budget(6)
 def manager_dashboard(request):
-    from django.utils import timezone
-    from datetime import timedelta
+    today = timezone.localdate()
     
-    today = timezone.now().date()
+    # Take the cursor first so changes made while the board loads are picked up by the next poll
+    kanban_cursor = latest_cursor()
     
-    new_orders = Order.objects.filter(status='new').order_by('-created_at')
-    kitchen_orders = Order.objects.filter(status='kitchen').order_by('-created_at')
-    ready_orders = Order.objects.filter(status='ready').order_by('-created_at')
-    # Show only today's delivered orders
-    delivered_orders = Order.objects.filter(
-        status='delivered',
-        created_at__date=today
-    ).order_by('-created_at')
-    cancelled_orders = Order.objects.filter(status='cancelled').order_by('-created_at')
+    # All columns come from one prefetched query, so the board renders in a fixed number of queries
+    columns = kanban_columns(today)
     
     return render(request, 'foodapp/manager_dashboard.html', {
-        'new_orders': new_orders,
-        'kitchen_orders': kitchen_orders,
-        'ready_orders': ready_orders,
-        'delivered_orders': delivered_orders,
-        'cancelled_orders': cancelled_orders
+        'new_orders': columns['new'],
+        'kitchen_orders': columns['kitchen'],
+        'ready_orders': columns['ready'],
+        'delivered_orders': columns['delivered'],
+        'cancelled_orders': columns['cancelled'],
+        'kanban_cursor': kanban_cursor,
+    })
+
+@login_required
+@user_passes_test(is_manager_or_admin, login_url='login')
+@query_budget(6)
+def kanban_changes(request):
+    today = timezone.localdate()
+    
+    try:
+        orders, cursor, has_more = changes_since(request.GET.get('cursor', ''))
+    except ValueError:
+        return JsonResponse({'error': 'Invalid cursor'}, status=400)
+    
+    # Send only the cards that changed; the page patches them into place
+    return JsonResponse({
+        'cursor': cursor,
+        'has_more': has_more,
+        'orders': [
+            {
+                'id': order.id,
+                'status': order.status,
+                'visible': is_on_board(order, today),
+                'html': render_to_string('foodapp/order_card.html', {'order': order}, request=request),
+            }
+            for order in orders
+        ],
     })
 
 @login_required
@@ -141,10 +189,8 @@ def update_order_status(request, order_id):
         new_status = data.get('status')
         
         if new_status in [status[0] for status in Order.STATUS_CHOICES]:
-            order.status = new_status
-            order.save()
-            
-            # If status is delivered, create delivery record
+            # If status is delivered, create delivery record (before saving the order,
+            # so the card a polling kanban receives already shows the delivery person)
             if new_status == 'delivered':
                 delivery_person = data.get('delivery_person', 'Unknown')
                 Delivery.objects.create(
@@ -153,6 +199,9 @@ def update_order_status(request, order_id):
                     delivered_at=timezone.now()
                 )
             
+            order.status = new_status
+            order.save()
+            
             return JsonResponse({'success': True})
         
     return JsonResponse({'success': False})
@@ -160,46 +209,27 @@ def update_order_status(request, order_id):
 # Owner Module Views
 @login_required
 @user_passes_test(is_admin, login_url='login')
+@use_replica
+@query_budget(9)
 def owner_dashboard(request):
     # Get date range
-    end_date = timezone.now().date()
+    end_date = timezone.localdate()
     start_date = end_date - timedelta(days=30)
     
     # Get orders in date range
-    orders = Order.objects.filter(created_at__date__range=[start_date, end_date])
-    expenses = Expense.objects.all().order_by('-date')
-    total_expenses_amount = sum(expense.amount for expense in expenses)
-    # Calculate daily revenue
-    daily_revenue = []
-    current_date = start_date
-    while current_date <= end_date:
-        day_orders = orders.filter(created_at__date=current_date)
-        day_total = sum(order.total_price for order in day_orders)
-        daily_revenue.append({
-            'date': current_date.strftime('%Y-%m-%d'),
-            'revenue': float(day_total)
-        })
-        current_date += timedelta(days=1)
+    orders = Order.objects.filter(business_date__range=[start_date, end_date])
+    total_expenses_amount = Expense.objects.aggregate(total=Sum('amount'))['total'] or 0
+    # Calculate daily revenue and expenses (one grouped query each, empty days zero-filled)
+    revenue_by_day = sum_by_day(Order.objects.all(), 'business_date', Sum('total_price'), start_date, end_date)
+    expenses_by_day = sum_by_day(Expense.objects.all(), 'date', Sum('amount'), start_date, end_date)
+    daily_revenue = daily_series(revenue_by_day, expenses_by_day)
     
-    # Get expenses in date range - use a more explicit query
+    # Get expenses in date range
     expenses = Expense.objects.filter(date__range=[start_date, end_date])
-    
-    # Debug information
-    print(f"Date range: {start_date} to {end_date}")
-    print(f"Number of expenses found: {expenses.count()}")
-    
-    # Try multiple methods to calculate total expenses
-    total_expenses_aggregate = expenses.aggregate(total=Sum('amount'))['total'] or 0
-    total_expenses_manual = sum(float(expense.amount) for expense in expenses)
-    
-    print(f"Total expenses (aggregate): {total_expenses_aggregate}")
-    print(f"Total expenses (manual): {total_expenses_manual}")
-    
-    # Use the manual calculation to be safe
-    total_expenses = total_expenses_manual
+    total_expenses = sum(expenses_by_day.values())
     
     # Calculate total revenue
-    total_revenue = sum(order.total_price for order in orders)
+    total_revenue = sum(revenue_by_day.values())
     
     # Calculate net profit
     net_profit = total_revenue - total_expenses_amount
@@ -233,6 +263,7 @@ def owner_dashboard(request):
 
 @login_required
 @user_passes_test(is_admin, login_url='login')
+@query_budget(5)
 def expense_list(request):
     expenses = Expense.objects.all().order_by('-date')
     total_amount = sum(expense.amount for expense in expenses)
@@ -253,7 +284,7 @@ def add_expense(request):
             Expense.objects.create(
                 description=description,
                 amount=float(amount),
-                date=timezone.now().date()
+                date=timezone.localdate()
             )
             return redirect('expense_list')
     
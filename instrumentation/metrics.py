@@ -0,0 +1,141 @@
+"""
+Per-request query and latency instrumentation.
+
+``InstrumentationMiddleware`` times every request: wall time, number of
+queries and time spent in SQL (on every database alias), and time spent
+rendering templates (through the ``instrumentation.templates.DjangoTemplates``
+backend). The numbers go out as a ``Server-Timing`` header, which browser dev
+tools show next to the request, and as one JSON log line per request on the
+``instrumentation`` logger. For streaming responses (exports, event streams)
+only the work done before the first byte is measured.
+
+Views can declare how many queries they are allowed::
+
+    @login_required
+    @query_budget(8)
+    def order_list(request):
+        ...
+
+(DRF views and viewsets set a ``query_budget`` class attribute instead.)
+Set a budget from the ``queries`` the view's log line reports for a
+realistic page, plus a little headroom.
+Going over budget logs a warning; with ``QUERY_BUDGET_ENFORCE`` on, as
+``instrumentation.testing.QueryBudgetTestRunner`` sets it, it raises
+``QueryBudgetExceeded`` so the test fails.
+
+The budgets on the menu, orders and dashboard views are provisional: those
+apps' templates aren't in the tree, so they were measured with placeholder
+templates and only count the view's own queries. No test requests those
+views yet; re-measure them once the templates exist. Budgets are only
+checked for views a test requests, which so far is foodapp's
+``manager_dashboard`` (foodapp/tests.py).
+"""
+import json
+import logging
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('instrumentation')
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def query_budget(max_queries):
+    """Declare the most queries a view may run per request."""
+    def decorator(view_func):
+        view_func.query_budget = max_queries
+        return view_func
+    return decorator
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.wall_time = 0.0
+        self.query_count = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+
+    def execute(self, execute, sql, params, many, context):
+        # connection.execute_wrapper hook
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - started
+            self.query_count += 1
+
+    def finish(self):
+        self.wall_time = time.perf_counter() - self.started
+
+    def server_timing(self):
+        return ', '.join([
+            f'db;dur={self.sql_time * 1000:.1f};desc="{self.query_count} queries"',
+            f'tpl;dur={self.template_time * 1000:.1f};desc="Templates"',
+            f'total;dur={self.wall_time * 1000:.1f}',
+        ])
+
+
+def current_metrics():
+    """Metrics of the request being handled, or None outside the middleware."""
+    return _current.get()
+
+
+def _view_budget(view_func):
+    budget = getattr(view_func, 'query_budget', None)
+    if budget is None:
+        # DRF's as_view() keeps the class on the function
+        budget = getattr(getattr(view_func, 'cls', None), 'query_budget', None)
+    return budget
+
+
+class InstrumentationMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics.execute))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        metrics.finish()
+
+        response['Server-Timing'] = metrics.server_timing()
+        resolver_match = getattr(request, 'resolver_match', None)
+        view = resolver_match.view_name if resolver_match else None
+        budget = getattr(request, '_query_budget', None)
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': view,
+            'status': response.status_code,
+            'queries': metrics.query_count,
+            'budget': budget,
+            'sql_ms': round(metrics.sql_time * 1000, 1),
+            'template_ms': round(metrics.template_time * 1000, 1),
+            'total_ms': round(metrics.wall_time * 1000, 1),
+        }
+        logger.info(json.dumps(record))
+
+        if budget is not None and metrics.query_count > budget:
+            message = f'{view} ran {metrics.query_count} queries, over its budget of {budget}'
+            if getattr(settings, 'QUERY_BUDGET_ENFORCE', False):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._query_budget = _view_budget(view_func)
@@ -0,0 +1,36 @@
+"""
+Template backend that adds its render time to the request's metrics.
+
+Configured in ``TEMPLATES`` in place of Django's own backend; only top-level
+renders are timed, so included templates aren't counted twice. Queries that
+run while rendering (lazy querysets) count towards both SQL and template time.
+"""
+import time
+
+from django.template import TemplateDoesNotExist
+from django.template.backends import django as django_backend
+
+from .metrics import current_metrics
+
+
+class Template(django_backend.Template):
+    def render(self, context=None, request=None):
+        metrics = current_metrics()
+        if metrics is None:
+            return super().render(context, request)
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics.template_time += time.perf_counter() - started
+
+
+class DjangoTemplates(django_backend.DjangoTemplates):
+    def from_string(self, template_code):
+        return Template(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return Template(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            django_backend.reraise(exc, self)
@@ -0,0 +1,27 @@
+"""
+Test runner that fails tests whose views go over their query budget.
+
+Set ``TEST_RUNNER = 'instrumentation.testing.QueryBudgetTestRunner'``. Other
+runners (pytest-django, ...) can get the same by running the session under
+``override_settings(QUERY_BUDGET_ENFORCE=True)``.
+"""
+import logging
+
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class QueryBudgetTestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._enforce_budgets = override_settings(QUERY_BUDGET_ENFORCE=True)
+        self._enforce_budgets.enable()
+        # One JSON line per request would bury the test output; over-budget warnings still show
+        self._logger = logging.getLogger('instrumentation')
+        self._log_level = self._logger.level
+        self._logger.setLevel(logging.WARNING)
+
+    def teardown_test_environment(self, **kwargs):
+        self._logger.setLevel(self._log_level)
+        self._enforce_budgets.disable()
+        super().teardown_test_environment(**kwargs)
@@ -4,6 +4,10 @@ from .models import Category, MenuItem, Ingredient, MenuItemIngredient, MenuItem
 class MenuItemIngredientInline(admin.TabularInline):
     model = MenuItemIngredient
     extra = 1
+    autocomplete_fields = ('ingredient',)
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('ingredient')
 
 class MenuItemVariantInline(admin.TabularInline):
     model = MenuItemVariant
@@ -20,6 +24,7 @@ class CategoryAdmin(admin.ModelAdmin):
 class MenuItemAdmin(admin.ModelAdmin):
     list_display = ('name', 'category', 'price', 'is_vegetarian', 'is_vegan', 'is_gluten_free', 'is_available')
     list_filter = ('category', 'is_vegetarian', 'is_vegan', 'is_gluten_free', 'is_available')
+    list_select_related = ('category',)
     search_fields = ('name', 'description')
     prepopulated_fields = {'slug': ('name',)}
     inlines = [MenuItemIngredientInline, MenuItemVariantInline]
@@ -34,10 +39,18 @@ class IngredientAdmin(admin.ModelAdmin):
 class MenuItemIngredientAdmin(admin.ModelAdmin):
     list_display = ('menu_item', 'ingredient', 'quantity')
     list_filter = ('ingredient', 'menu_item')
+    list_select_related = ('menu_item', 'ingredient')
     search_fields = ('menu_item__name', 'ingredient__name')
+    autocomplete_fields = ('menu_item', 'ingredient')
 
 @admin.register(MenuItemVariant)
 class MenuItemVariantAdmin(admin.ModelAdmin):
     list_display = ('menu_item', 'name', 'price_adjustment')
     list_filter = ('menu_item',)
+    list_select_related = ('menu_item',)
     search_fields = ('menu_item__name', 'name')
+    autocomplete_fields = ('menu_item',)
+    
+    def get_queryset(self, request):
+        # Also serves the variant autocomplete, whose labels read the menu item
+        return super().get_queryset(request).select_related('menu_item')
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class MenuConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'menu'
+
+    def ready(self):
+        # Invalidate the cached menu catalog and search index, and resize new images, when the menu changes
+        from . import signals  # noqa: F401
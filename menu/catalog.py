@@ -0,0 +1,70 @@
+from django.db.models import Prefetch
+
+from caching.helpers import VersionedSnapshot
+from .models import Category, MenuItem, MenuItemIngredient
+
+SNAPSHOT_TIMEOUT = 60 * 60 * 24
+
+
+class MenuCatalog:
+    """
+    Immutable snapshot of every category and menu item, with variants and
+    ingredients preloaded. Pickled into the cache, so menu pages render from
+    it without touching the database.
+    """
+
+    def __init__(self, version, categories, items):
+        self.version = version
+        self.categories = categories
+        self.items = items
+        self._categories_by_slug = {category.slug: category for category in categories}
+        self._items_by_slug = {item.slug: item for item in items}
+        self._items_by_id = {item.id: item for item in items}
+
+    def active_categories(self):
+        return [category for category in self.categories if category.is_active]
+
+    def available_items(self):
+        return [item for item in self.items if item.is_available]
+
+    def get_category(self, slug):
+        return self._categories_by_slug.get(slug)
+
+    def get_item(self, slug):
+        return self._items_by_slug.get(slug)
+
+    def get_item_by_id(self, item_id):
+        return self._items_by_id.get(item_id)
+
+    def items_in_category(self, category):
+        return [item for item in self.items if item.category_id == category.id]
+
+
+def build_catalog(version):
+    categories = list(Category.objects.all())
+    categories_by_id = {category.id: category for category in categories}
+
+    items = list(
+        MenuItem.objects.prefetch_related(
+            'variants',
+            Prefetch('ingredients', queryset=MenuItemIngredient.objects.select_related('ingredient')),
+        )
+    )
+    for item in items:
+        # Share the category instances instead of joining them in again
+        item.category = categories_by_id[item.category_id]
+
+    return MenuCatalog(version, categories, items)
+
+
+catalog = VersionedSnapshot('menu:catalog', build_catalog, timeout=SNAPSHOT_TIMEOUT, alias='menu')
+
+
+def get_catalog():
+    """Return the current catalog snapshot, building and caching it on a miss."""
+    return catalog.get()
+
+
+def invalidate_catalog():
+    """Move to a new catalog version; the old snapshot simply expires."""
+    catalog.invalidate()
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from menu.search import InMemoryIndex, get_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the menu search index from scratch.'
+
+    def handle(self, *args, **options):
+        index = get_index()
+        if isinstance(index, InMemoryIndex):
+            self.stdout.write('Using the in-memory index; it is rebuilt from the menu catalog on demand.')
+            return
+
+        index.rebuild()
+        self.stdout.write(self.style.SUCCESS('Rebuilt the menu search index.'))
@@ -0,0 +1,60 @@
+from django.db import migrations
+
+# FTS5 index behind menu.search.SQLiteFTSIndex; columns follow search.FIELD_WEIGHTS
+CREATE_INDEX = (
+    'CREATE VIRTUAL TABLE IF NOT EXISTS menu_search_index USING fts5('
+    "name, category, ingredients, description, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+)
+
+
+def fts5_available(connection):
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        return any(row[0] == 'ENABLE_FTS5' for row in cursor.fetchall())
+
+
+def create_search_index(apps, schema_editor):
+    # Other databases, and SQLite builds without FTS5, search in memory instead
+    if not fts5_available(schema_editor.connection):
+        return
+    MenuItem = apps.get_model('menu', 'MenuItem')
+    items = MenuItem.objects.filter(is_available=True).select_related('category').prefetch_related(
+        'ingredients__ingredient'
+    )
+    rows = [
+        [
+            item.id,
+            item.name,
+            item.category.name,
+            ' '.join(row.ingredient.name for row in item.ingredients.all()),
+            item.description,
+        ]
+        for item in items
+    ]
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(CREATE_INDEX)
+        cursor.execute('DELETE FROM menu_search_index')
+        if rows:
+            cursor.executemany(
+                'INSERT INTO menu_search_index (rowid, name, category, ingredients, description) '
+                'VALUES (%s, %s, %s, %s, %s)',
+                rows
+            )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS menu_search_index')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
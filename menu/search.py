@@ -0,0 +1,223 @@
+"""
+Ranked menu search over item names, categories, ingredients and descriptions.
+
+On SQLite builds with FTS5 the index is a virtual table (created by
+migration 0002) kept up to date item by item from the menu signals. Elsewhere an in-memory inverted index is built
+from the cached menu catalog and rebuilt whenever the catalog version moves.
+Every query term is matched as a prefix, so partial words work for
+as-you-type search.
+"""
+import math
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+from functools import lru_cache
+
+from django.db import connection
+from django.db.models import Prefetch
+
+from .catalog import get_catalog
+from .models import MenuItem, MenuItemIngredient
+
+SEARCH_LIMIT = 50
+
+# Field weights: a hit in the name counts for more than one in the description
+FIELD_WEIGHTS = {
+    'name': 10.0,
+    'category': 4.0,
+    'ingredients': 3.0,
+    'description': 2.0,
+}
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(text):
+    """Lower-case, accent-stripped word tokens."""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return TOKEN_RE.findall(text.lower())
+
+
+def document_for(item):
+    """Searchable text of a menu item; ``ingredients`` should be prefetched."""
+    return {
+        'name': item.name,
+        'category': item.category.name,
+        'ingredients': ' '.join(row.ingredient.name for row in item.ingredients.all()),
+        'description': item.description,
+    }
+
+
+def searchable_items(item_ids=None):
+    items = MenuItem.objects.filter(is_available=True).select_related('category').prefetch_related(
+        Prefetch('ingredients', queryset=MenuItemIngredient.objects.select_related('ingredient'))
+    )
+    if item_ids is not None:
+        items = items.filter(id__in=item_ids)
+    return items
+
+
+class SQLiteFTSIndex:
+    """FTS5 virtual table keyed by menu item id (the rowid)."""
+
+    table = 'menu_search_index'
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+        self._insert(searchable_items().iterator(chunk_size=500))
+
+    def update(self, item_ids):
+        """Reindex the given items; unavailable or deleted ones drop out."""
+        item_ids = list(item_ids)
+        if not item_ids:
+            return
+        self.remove(item_ids)
+        self._insert(searchable_items(item_ids))
+
+    def remove(self, item_ids):
+        item_ids = list(item_ids)
+        if not item_ids:
+            return
+        placeholders = ', '.join(['%s'] * len(item_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE rowid IN ({placeholders})', item_ids)
+
+    def _insert(self, items):
+        columns = ', '.join(FIELD_WEIGHTS)
+        placeholders = ', '.join(['%s'] * (len(FIELD_WEIGHTS) + 1))
+        rows = [
+            [item.id, *document_for(item).values()]
+            for item in items
+        ]
+        if rows:
+            with connection.cursor() as cursor:
+                cursor.executemany(
+                    f'INSERT INTO {self.table} (rowid, {columns}) VALUES ({placeholders})', rows
+                )
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        terms = tokenize(query)
+        if not terms:
+            return []
+        # Quoted prefix queries: every term must match the start of some word
+        match = ' '.join(f'"{term}"*' for term in terms)
+        weights = ', '.join(str(weight) for weight in FIELD_WEIGHTS.values())
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s '
+                f'ORDER BY bm25({self.table}, {weights}) LIMIT %s',
+                [match, limit]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class InMemoryIndex:
+    """
+    Inverted index of the cached catalog. Terms are kept sorted so the words
+    starting with a prefix are found with a binary search.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.version = None
+        self.postings = {}
+        self.terms = []
+        self.document_count = 0
+
+    def rebuild(self, items, version=None):
+        postings = defaultdict(lambda: defaultdict(float))
+        document_count = 0
+        for item in items:
+            if not item.is_available:
+                continue
+            document_count += 1
+            for field, text in document_for(item).items():
+                for term in tokenize(text):
+                    postings[term][item.id] += FIELD_WEIGHTS[field]
+
+        with self._lock:
+            self.postings = {term: dict(documents) for term, documents in postings.items()}
+            self.terms = sorted(self.postings)
+            self.document_count = document_count
+            self.version = version
+
+    def update(self, item_ids):
+        # Follows the catalog version instead; see ``search``
+        pass
+
+    def remove(self, item_ids):
+        pass
+
+    def _expand(self, prefix):
+        start = bisect_left(self.terms, prefix)
+        for term in self.terms[start:]:
+            if not term.startswith(prefix):
+                break
+            yield term
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        catalog = get_catalog()
+        if catalog.version != self.version:
+            self.rebuild(catalog.items, catalog.version)
+
+        with self._lock:
+            postings, document_count = self.postings, self.document_count
+            scores = None
+            for prefix in terms:
+                term_scores = defaultdict(float)
+                for term in self._expand(prefix):
+                    documents = postings[term]
+                    idf = math.log(1 + (document_count - len(documents) + 0.5) / (len(documents) + 0.5))
+                    for item_id, weight in documents.items():
+                        # Best matching word per query term, not the sum over all expansions
+                        term_scores[item_id] = max(term_scores[item_id], weight * idf)
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {
+                        item_id: score + term_scores[item_id]
+                        for item_id, score in scores.items()
+                        if item_id in term_scores
+                    }
+                if not scores:
+                    return []
+
+        return sorted(scores, key=lambda item_id: -scores[item_id])[:limit]
+
+
+def fts_table_exists():
+    # Migration 0002 creates it only on SQLite builds with FTS5
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [SQLiteFTSIndex.table])
+        return cursor.fetchone() is not None
+
+
+@lru_cache(maxsize=None)
+def get_index():
+    return SQLiteFTSIndex() if fts_table_exists() else InMemoryIndex()
+
+
+def search_menu_items(query, limit=SEARCH_LIMIT):
+    """Available menu items matching ``query``, best match first."""
+    item_ids = get_index().search(query, limit)
+    catalog = get_catalog()
+    items = (catalog.get_item_by_id(item_id) for item_id in item_ids)
+    return [item for item in items if item is not None and item.is_available]
+
+
+def reindex_items(item_ids):
+    get_index().update(item_ids)
+
+
+def remove_items(item_ids):
+    get_index().remove(item_ids)
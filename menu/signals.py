@@ -0,0 +1,59 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from thumbnails.derivatives import generate_on_commit
+from .catalog import invalidate_catalog
+from .models import Category, Ingredient, MenuItem, MenuItemIngredient, MenuItemVariant
+from .search import reindex_items, remove_items
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=MenuItem)
+@receiver(post_delete, sender=MenuItem)
+@receiver(post_save, sender=MenuItemVariant)
+@receiver(post_delete, sender=MenuItemVariant)
+@receiver(post_save, sender=MenuItemIngredient)
+@receiver(post_delete, sender=MenuItemIngredient)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def menu_changed(sender, **kwargs):
+    transaction.on_commit(invalidate_catalog)
+
+
+@receiver(post_save, sender=MenuItem)
+def menu_item_saved(sender, instance, **kwargs):
+    transaction.on_commit(lambda: reindex_items([instance.pk]))
+
+
+@receiver(post_delete, sender=MenuItem)
+def menu_item_deleted(sender, instance, **kwargs):
+    transaction.on_commit(lambda: remove_items([instance.pk]))
+
+
+@receiver(post_save, sender=Category)
+def category_saved(sender, instance, **kwargs):
+    item_ids = list(instance.menu_items.values_list('id', flat=True))
+    transaction.on_commit(lambda: reindex_items(item_ids))
+
+
+@receiver(post_save, sender=MenuItemIngredient)
+@receiver(post_delete, sender=MenuItemIngredient)
+def menu_item_ingredient_changed(sender, instance, **kwargs):
+    transaction.on_commit(lambda: reindex_items([instance.menu_item_id]))
+
+
+@receiver(post_save, sender=Ingredient)
+def ingredient_saved(sender, instance, **kwargs):
+    item_ids = list(
+        MenuItemIngredient.objects.filter(ingredient=instance).values_list('menu_item_id', flat=True)
+    )
+    transaction.on_commit(lambda: reindex_items(item_ids))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=MenuItem)
+def image_saved(sender, instance, **kwargs):
+    # Resized WebP/JPEG copies for srcset; skipped when they already exist
+    generate_on_commit(instance.image)
@@ -7,4 +7,5 @@ urlpatterns = [
     path('menu/category/<slug:category_slug>/', views.category_detail, name='category_detail'),
     path('menu/item/<slug:item_slug>/', views.menu_item_detail, name='menu_item_detail'),
     path('search/', views.search_menu, name='search_menu'),
+    path('search/suggest/', views.search_suggestions, name='search_suggestions'),
 ]
@@ -1,10 +1,16 @@
 from django.shortcuts import render, get_object_or_404
-from django.db.models import Q
+from django.http import Http404, JsonResponse
+from django.urls import reverse
 from .models import Category, MenuItem
+from .catalog import get_catalog
+from .search import search_menu_items
+from instrumentation.metrics import query_budget
 
+@query_budget(6)
 def home(request):
-    categories = Category.objects.filter(is_active=True)[:6]
-    featured_items = MenuItem.objects.filter(is_available=True)[:8]
+    catalog = get_catalog()
+    categories = catalog.active_categories()[:6]
+    featured_items = catalog.available_items()[:8]
     
     context = {
         'categories': categories,
@@ -12,24 +18,26 @@ def home(request):
     }
     return render(request, 'menu/home.html', context)
 
+@query_budget(8)
 def menu_list(request):
-    categories = Category.objects.filter(is_active=True)
+    catalog = get_catalog()
+    categories = catalog.active_categories()
     
     # Filter options
     is_vegetarian = request.GET.get('vegetarian')
     is_vegan = request.GET.get('vegan')
     is_gluten_free = request.GET.get('gluten_free')
     
-    # Base queryset
-    menu_items = MenuItem.objects.filter(is_available=True)
+    # Base list, served from the cached catalog
+    menu_items = catalog.available_items()
     
     # Apply filters
     if is_vegetarian:
-        menu_items = menu_items.filter(is_vegetarian=True)
+        menu_items = [item for item in menu_items if item.is_vegetarian]
     if is_vegan:
-        menu_items = menu_items.filter(is_vegan=True)
+        menu_items = [item for item in menu_items if item.is_vegan]
     if is_gluten_free:
-        menu_items = menu_items.filter(is_gluten_free=True)
+        menu_items = [item for item in menu_items if item.is_gluten_free]
     
     context = {
         'categories': categories,
@@ -40,9 +48,13 @@ def menu_list(request):
     }
     return render(request, 'menu/menu_list.html', context)
 
+@query_budget(8)
 def category_detail(request, category_slug):
-    category = get_object_or_404(Category, slug=category_slug, is_active=True)
-    menu_items = MenuItem.objects.filter(category=category, is_available=True)
+    catalog = get_catalog()
+    category = catalog.get_category(category_slug)
+    if category is None or not category.is_active:
+        raise Http404('No Category matches the given query.')
+    menu_items = [item for item in catalog.items_in_category(category) if item.is_available]
     
     context = {
         'category': category,
@@ -50,9 +62,15 @@ def category_detail(request, category_slug):
     }
     return render(request, 'menu/category_detail.html', context)
 
+@query_budget(8)
 def menu_item_detail(request, item_slug):
-    menu_item = get_object_or_404(MenuItem, slug=item_slug, is_available=True)
-    related_items = MenuItem.objects.filter(category=menu_item.category).exclude(id=menu_item.id)[:4]
+    catalog = get_catalog()
+    menu_item = catalog.get_item(item_slug)
+    if menu_item is None or not menu_item.is_available:
+        raise Http404('No MenuItem matches the given query.')
+    related_items = [
+        item for item in catalog.items_in_category(menu_item.category) if item.id != menu_item.id
+    ][:4]
     
     context = {
         'menu_item': menu_item,
@@ -60,20 +78,29 @@ def menu_item_detail(request, item_slug):
     }
     return render(request, 'menu/menu_item_detail.html', context)
 
+@query_budget(10)
 def search_menu(request):
     query = request.GET.get('q', '')
     
-    if query:
-        menu_items = MenuItem.objects.filter(
-            Q(name__icontains=query) | 
-            Q(description__icontains=query) |
-            Q(category__name__icontains=query)
-        ).filter(is_available=True)
-    else:
-        menu_items = MenuItem.objects.none()
+    # Ranked lookup in the search index, prefix matching every word
+    menu_items = search_menu_items(query) if query else []
     
     context = {
         'menu_items': menu_items,
         'query': query,
     }
     return render(request, 'menu/search_results.html', context)
+
+def search_suggestions(request):
+    query = request.GET.get('q', '')
+    
+    # As-you-type results for the search box
+    menu_items = search_menu_items(query, limit=8) if query else []
+    
+    results = [{
+        'name': item.name,
+        'category': item.category.name,
+        'price': str(item.price),
+        'url': reverse('menu_item_detail', args=[item.slug]),
+    } for item in menu_items]
+    return JsonResponse({'query': query, 'results': results})
@@ -1,31 +1,62 @@
 from django.contrib import admin
+from django.db.models import OuterRef, Subquery, Sum
+from pagination.estimated import EstimatedCountPaginator
+from menu.models import MenuItemVariant
 from .models import Cart, CartItem, Order, OrderItem, OrderStatusUpdate
 
 class CartItemInline(admin.TabularInline):
     model = CartItem
     extra = 1
+    autocomplete_fields = ('menu_item', 'variant')
+    
+    def get_queryset(self, request):
+        # MenuItemVariant.__str__ reads its menu item
+        return super().get_queryset(request).select_related('menu_item', 'variant__menu_item')
+    
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        # The variant widgets label their selected choice from this queryset, not the inline rows
+        if db_field.name == 'variant':
+            kwargs['queryset'] = MenuItemVariant.objects.select_related('menu_item')
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
 
 @admin.register(Cart)
 class CartAdmin(admin.ModelAdmin):
-    list_display = ('user', 'total_items', 'total_price', 'updated_at')
+    # item_count and subtotal are stored on the cart, so the list needs no per-row queries
+    list_display = ('user', 'item_count', 'subtotal', 'updated_at')
+    list_select_related = ('user',)
+    search_fields = ('user__username',)
+    autocomplete_fields = ('user',)
     inlines = [CartItemInline]
 
 class OrderItemInline(admin.TabularInline):
     model = OrderItem
     extra = 0
     readonly_fields = ('menu_item', 'variant', 'quantity', 'unit_price', 'total_price', 'special_instructions')
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('menu_item')
 
 class OrderStatusUpdateInline(admin.TabularInline):
     model = OrderStatusUpdate
     extra = 1
     readonly_fields = ('created_at',)
+    autocomplete_fields = ('updated_by',)
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('updated_by')
 
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
-    list_display = ('order_number', 'user', 'customer_name', 'status', 'order_type', 'payment_status', 'total', 'created_at')
-    list_filter = ('status', 'order_type', 'payment_status', 'created_at')
+    list_display = ('order_number', 'user', 'customer_name', 'status', 'order_type', 'payment_status', 'item_count', 'total', 'created_at')
+    list_filter = ('status', 'order_type', 'payment_status')
+    list_select_related = ('user',)
     search_fields = ('order_number', 'customer_name', 'customer_phone', 'customer_email')
     readonly_fields = ('order_number', 'subtotal', 'tax', 'total', 'created_at', 'updated_at')
+    autocomplete_fields = ('user', 'assigned_to')
+    # business_date leads orders_order_bdate_idx, so drilling down is an index range scan
+    date_hierarchy = 'business_date'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     inlines = [OrderItemInline, OrderStatusUpdateInline]
     fieldsets = (
         ('Order Information', {
@@ -50,15 +81,35 @@ class OrderAdmin(admin.ModelAdmin):
             'fields': ('assigned_to',)
         }),
     )
+    
+    def get_queryset(self, request):
+        # Per-row subquery, evaluated only for the rows on the page
+        item_count = OrderItem.objects.filter(order=OuterRef('pk')).order_by().values('order').annotate(
+            count=Sum('quantity')
+        ).values('count')
+        return super().get_queryset(request).annotate(item_count=Subquery(item_count))
+    
+    @admin.display(description='Items', ordering='item_count')
+    def item_count(self, obj):
+        return obj.item_count or 0
 
 @admin.register(OrderItem)
 class OrderItemAdmin(admin.ModelAdmin):
     list_display = ('order', 'menu_item', 'variant', 'quantity', 'unit_price', 'total_price')
     list_filter = ('order__status',)
+    list_select_related = ('order', 'menu_item')
     search_fields = ('order__order_number', 'menu_item__name')
+    autocomplete_fields = ('order', 'menu_item')
+    date_hierarchy = 'order__business_date'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 @admin.register(OrderStatusUpdate)
 class OrderStatusUpdateAdmin(admin.ModelAdmin):
     list_display = ('order', 'status', 'updated_by', 'created_at')
     list_filter = ('status', 'created_at')
+    list_select_related = ('order', 'updated_by')
     search_fields = ('order__order_number', 'notes')
+    autocomplete_fields = ('order', 'updated_by')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class OrdersConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'orders'
+
+    def ready(self):
+        # Push status changes to subscribed screens and merge guest carts on login
+        from . import signals  # noqa: F401
@@ -0,0 +1,206 @@
+"""
+Cart storage.
+
+Signed-in customers keep their cart in the database (``Cart``/``CartItem``).
+Guests keep theirs in a signed cookie of compact
+``[menu_item_id, variant_id, quantity, special_instructions]`` lines, so
+browsing and filling a cart never writes to the database. The guest cart is
+merged into the customer's database cart when they log in, before checkout.
+
+``get_cart(request)`` returns the storage for the request; both backends
+expose ``lines()``, ``add()``, ``update()``, ``remove()`` and ``clear()``.
+``CartMiddleware`` writes a changed guest cart back to its cookie.
+"""
+import json
+
+from .models import Cart, CartItem
+from menu.models import MenuItem, MenuItemVariant
+
+COOKIE_NAME = 'cart'
+COOKIE_SALT = 'orders.cart'
+COOKIE_MAX_AGE = 60 * 60 * 24 * 14
+# Keeps the signed cookie well under the 4 KB browser limit
+MAX_GUEST_LINES = 30
+MAX_INSTRUCTIONS_LENGTH = 200
+
+
+class DatabaseCart:
+    """A signed-in customer's cart; the ``Cart`` row is only created on the first write."""
+
+    def __init__(self, user):
+        self.user = user
+        self._cart = None
+
+    @property
+    def cart(self):
+        if self._cart is None:
+            self._cart = Cart.objects.filter(user=self.user).first()
+        return self._cart
+
+    def get_or_create(self):
+        if self.cart is None:
+            self._cart, _ = Cart.objects.get_or_create(user=self.user)
+        return self._cart
+
+    def lines(self):
+        if self.cart is None:
+            return []
+        lines = list(self.cart.items.select_related('menu_item', 'variant').order_by('id'))
+        for line in lines:
+            line.key = line.id
+        return lines
+
+    def add(self, menu_item, variant=None, quantity=1, special_instructions=''):
+        """Add to the cart; returns True for a new line, False if an existing line grew."""
+        cart = self.get_or_create()
+        cart_item = CartItem.objects.filter(cart=cart, menu_item=menu_item, variant=variant).select_related(
+            'menu_item', 'variant'
+        ).first()
+        if cart_item is not None:
+            cart_item.quantity += quantity
+            cart_item.save()
+            return False
+        CartItem.objects.create(
+            cart=cart,
+            menu_item=menu_item,
+            variant=variant,
+            quantity=quantity,
+            special_instructions=special_instructions
+        )
+        return True
+
+    def update(self, key, quantity):
+        """Set a line's quantity (removing it at zero); returns False if there is no such line."""
+        cart_item = CartItem.objects.filter(id=key, cart__user=self.user).select_related('menu_item', 'variant').first()
+        if cart_item is None:
+            return False
+        if quantity > 0:
+            cart_item.quantity = quantity
+            cart_item.save()
+        else:
+            cart_item.delete()
+        return True
+
+    def remove(self, key):
+        return self.update(key, 0)
+
+    def clear(self):
+        if self.cart is not None:
+            self.cart.clear()
+
+    @property
+    def item_count(self):
+        return self.cart.item_count if self.cart is not None else 0
+
+    def persist(self, response):
+        pass
+
+
+class CookieCart:
+    """A guest's cart, held in a signed cookie."""
+
+    def __init__(self, request):
+        self.request = request
+        self.modified = False
+        self._lines = self._load()
+
+    def _load(self):
+        raw = self.request.get_signed_cookie(COOKIE_NAME, default=None, salt=COOKIE_SALT, max_age=COOKIE_MAX_AGE)
+        if not raw:
+            return []
+        try:
+            lines = json.loads(raw)
+            return [
+                [int(menu_item_id), int(variant_id), int(quantity), str(instructions)[:MAX_INSTRUCTIONS_LENGTH]]
+                for menu_item_id, variant_id, quantity, instructions in lines[:MAX_GUEST_LINES]
+                if int(quantity) > 0
+            ]
+        except (TypeError, ValueError):
+            return []
+
+    def lines(self):
+        """Unsaved ``CartItem`` objects for the stored lines, in two queries."""
+        menu_items = MenuItem.objects.in_bulk({line[0] for line in self._lines})
+        variants = MenuItemVariant.objects.in_bulk({line[1] for line in self._lines if line[1]})
+        lines = []
+        for key, (menu_item_id, variant_id, quantity, instructions) in enumerate(self._lines):
+            menu_item = menu_items.get(menu_item_id)
+            variant = variants.get(variant_id)
+            if menu_item is None or not menu_item.is_available:
+                continue
+            if variant is not None and variant.menu_item_id != menu_item_id:
+                variant = None
+            line = CartItem(
+                menu_item=menu_item, variant=variant, quantity=quantity, special_instructions=instructions
+            )
+            line.key = key
+            lines.append(line)
+        return lines
+
+    @property
+    def item_count(self):
+        return sum(line[2] for line in self._lines)
+
+    def add(self, menu_item, variant=None, quantity=1, special_instructions=''):
+        variant_id = variant.id if variant is not None else 0
+        for line in self._lines:
+            if line[0] == menu_item.id and line[1] == variant_id:
+                line[2] += quantity
+                self.modified = True
+                return False
+        if len(self._lines) >= MAX_GUEST_LINES:
+            raise ValueError(f'A guest cart holds at most {MAX_GUEST_LINES} different items')
+        self._lines.append([menu_item.id, variant_id, quantity, special_instructions[:MAX_INSTRUCTIONS_LENGTH]])
+        self.modified = True
+        return True
+
+    def update(self, key, quantity):
+        if not 0 <= key < len(self._lines):
+            return False
+        if quantity > 0:
+            self._lines[key][2] = quantity
+        else:
+            del self._lines[key]
+        self.modified = True
+        return True
+
+    def remove(self, key):
+        return self.update(key, 0)
+
+    def clear(self):
+        self._lines = []
+        self.modified = True
+
+    def persist(self, response):
+        if not self.modified:
+            return
+        if self._lines:
+            response.set_signed_cookie(
+                COOKIE_NAME, json.dumps(self._lines, separators=(',', ':')), salt=COOKIE_SALT,
+                max_age=COOKIE_MAX_AGE, httponly=True, samesite='Lax'
+            )
+        else:
+            response.delete_cookie(COOKIE_NAME, samesite='Lax')
+
+
+def get_cart(request):
+    """The cart storage for this request, created once per request."""
+    if not hasattr(request, '_cart_storage'):
+        if request.user.is_authenticated:
+            request._cart_storage = DatabaseCart(request.user)
+        else:
+            request._cart_storage = CookieCart(request)
+    return request._cart_storage
+
+
+def merge_guest_cart(request, user):
+    """Move a guest cookie cart into ``user``'s database cart (called on login)."""
+    guest_cart = CookieCart(request)
+    if guest_cart._lines:
+        database_cart = DatabaseCart(user)
+        for line in guest_cart.lines():
+            database_cart.add(line.menu_item, line.variant, line.quantity, line.special_instructions)
+        # CartMiddleware drops the cookie on the way out
+        request._cart_cookie_merged = True
+    if hasattr(request, '_cart_storage'):
+        del request._cart_storage
@@ -0,0 +1,7 @@
+from .cart import get_cart
+
+
+def cart_summary(request):
+    # Cart badge in base.html: guests' count comes from the cookie; for signed-in users
+    # reading item_count runs one query for their Cart row (by its unique user_id)
+    return {'cart_summary': get_cart(request)}
@@ -0,0 +1,264 @@
+"""
+Kitchen-load-aware delivery estimates.
+
+Every process keeps a model of the kitchen queue: the orders that are NEW or
+PREPARING, in the order they were placed, each with its cooking time (the
+longest ``preparation_time`` among its items; items cook side by side). The
+kitchen works through the queue first come, first served, at
+``KITCHEN_STATIONS`` minutes of cooking per minute. An order's estimate is::
+
+    now + (cooking time queued ahead of it - cooking done) / KITCHEN_STATIONS
+        + its own cooking time + DELIVERY_MINUTES for deliveries
+
+which stays put while the kitchen keeps pace. Cooking times sit in a Fenwick
+tree indexed by queue position, so the time queued ahead of any order, and a
+quote for a new order at checkout, are O(log n) without scanning the open
+orders. The queue is updated incrementally from ``Order`` saves (see
+orders.signals). When an order leaves it (ready, cancelled...) the orders
+behind it move up and their stored ``estimated_delivery_time`` is
+recomputed; changes of less than a minute aren't written.
+
+Other processes change the queue too, so it is reloaded from the database
+when it is older than ``KITCHEN_QUEUE_REFRESH`` seconds, keeping the
+cooking progress made so far. The checkout that finds it missing or stale
+pays one extra query for the reload; benchmark_checkout warms it up first.
+"""
+import math
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import Order
+
+QUEUED_STATUSES = (Order.OrderStatus.NEW, Order.OrderStatus.PREPARING)
+# Statuses for which an estimate is still worth showing
+LIVE_STATUSES = QUEUED_STATUSES + (Order.OrderStatus.READY, Order.OrderStatus.OUT_FOR_DELIVERY)
+RESHUFFLE_THRESHOLD = timedelta(minutes=1)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def order_minutes(menu_items):
+    """Cooking time of an order with these menu items."""
+    return max((item.preparation_time for item in menu_items), default=0)
+
+
+def minutes_until(order, now=None):
+    """Whole minutes until the order's estimate, or None once there is no live estimate."""
+    if order.status not in LIVE_STATUSES or order.estimated_delivery_time is None:
+        return None
+    remaining = order.estimated_delivery_time - (now or timezone.now())
+    return max(math.ceil(remaining.total_seconds() / 60), 0)
+
+
+class FenwickTree:
+    """Prefix sums over a growing list, with O(log n) updates, appends and queries."""
+
+    def __init__(self, values=()):
+        self.tree = [0]
+        for value in values:
+            self.append(value)
+
+    def __len__(self):
+        return len(self.tree) - 1
+
+    def add(self, index, delta):
+        position = index + 1
+        while position < len(self.tree):
+            self.tree[position] += delta
+            position += position & -position
+
+    def prefix(self, count):
+        """Sum of the first ``count`` values."""
+        total = 0
+        while count > 0:
+            total += self.tree[count]
+            count -= count & -count
+        return total
+
+    def append(self, value):
+        # The new node covers the values (position - lowbit, position]
+        position = len(self.tree)
+        self.tree.append(value + self.prefix(position - 1) - self.prefix(position - (position & -position)))
+
+
+class QueuedOrder:
+    __slots__ = ('order_id', 'minutes', 'delivery', 'eta')
+
+    def __init__(self, order_id, minutes, delivery, eta):
+        self.order_id = order_id
+        self.minutes = minutes
+        self.delivery = delivery
+        self.eta = eta
+
+
+class KitchenQueue:
+    """
+    The open orders in arrival order and the cooking done on them so far.
+    Orders that leave keep their slot with zero cooking time until enough
+    have left to make compacting worthwhile.
+    """
+
+    def __init__(self, stations, delivery_minutes, orders=(), now=None, done=0):
+        self.stations = max(stations, 1)
+        self.delivery_minutes = delivery_minutes
+        self.slots = []
+        self.positions = {}
+        self.work = FenwickTree()
+        self.vacant = 0
+        for order in orders:
+            self.add(order)
+        # Minutes of queued cooking done as of self.clock
+        self.done = min(done, self.total)
+        self.clock = now or timezone.now()
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, order_id):
+        return order_id in self.positions
+
+    @property
+    def total(self):
+        return self.work.prefix(len(self.work))
+
+    def advance(self, now):
+        """Account for the cooking done since the last call; the kitchen idles once it has caught up."""
+        elapsed = max((now - self.clock).total_seconds() / 60, 0)
+        self.done = min(self.done + elapsed * self.stations, self.total)
+        self.clock = max(now, self.clock)
+
+    def estimate(self, minutes_ahead, minutes, delivery, now):
+        wait = max((minutes_ahead - self.done) / self.stations + minutes, 0)
+        return now + timedelta(minutes=wait + (self.delivery_minutes if delivery else 0))
+
+    def quote(self, minutes, delivery, now):
+        """Estimate for an order joining the back of the queue now."""
+        self.advance(now)
+        return self.estimate(self.total, minutes, delivery, now)
+
+    def add(self, order):
+        self.positions[order.order_id] = len(self.slots)
+        self.slots.append(order)
+        self.work.append(order.minutes)
+
+    def remove(self, order_id, now):
+        """Take an order out; returns its position, from which later estimates move."""
+        self.advance(now)
+        position = self.positions.pop(order_id)
+        order = self.slots[position]
+        # Cooking the model had done on this order goes with it
+        self.done -= min(max(self.done - self.work.prefix(position), 0), order.minutes)
+        self.work.add(position, -order.minutes)
+        self.slots[position] = None
+        self.vacant += 1
+        if self.vacant > 64 and self.vacant > len(self.slots) // 2:
+            self.compact()
+            return 0
+        return position
+
+    def compact(self):
+        orders = [order for order in self.slots if order is not None]
+        self.slots = []
+        self.positions = {}
+        self.work = FenwickTree()
+        self.vacant = 0
+        for order in orders:
+            self.add(order)
+
+    def reflow(self, start, now):
+        """Recompute estimates from ``start`` on; returns the orders whose estimate moved."""
+        self.advance(now)
+        moved = []
+        minutes_ahead = self.work.prefix(start)
+        for order in self.slots[start:]:
+            if order is None:
+                continue
+            eta = self.estimate(minutes_ahead, order.minutes, order.delivery, now)
+            if order.eta is None or abs(eta - order.eta) >= RESHUFFLE_THRESHOLD:
+                order.eta = eta
+                moved.append(order)
+            minutes_ahead += order.minutes
+        return moved
+
+
+class Kitchen:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.queue = None
+        self.loaded_at = None
+
+    def load(self, now):
+        rows = Order.objects.filter(status__in=QUEUED_STATUSES).annotate(
+            minutes=Max('items__menu_item__preparation_time')
+        ).order_by('created_at', 'id').values_list('id', 'order_type', 'estimated_delivery_time', 'minutes')
+        done = 0
+        if self.queue is not None:
+            # Mostly the same orders, so carry the cooking progress over
+            self.queue.advance(now)
+            done = self.queue.done
+        self.queue = KitchenQueue(
+            _setting('KITCHEN_STATIONS', 2),
+            _setting('DELIVERY_MINUTES', 25),
+            [
+                QueuedOrder(order_id, minutes or 0, order_type == Order.OrderType.DELIVERY, eta)
+                for order_id, order_type, eta, minutes in rows
+            ],
+            now=now,
+            done=done,
+        )
+        self.loaded_at = time.monotonic()
+
+    def _current_queue(self, now):
+        """The queue, reloaded if stale; the flag says whether it was."""
+        if self.queue is None or time.monotonic() - self.loaded_at > _setting('KITCHEN_QUEUE_REFRESH', 60):
+            self.load(now)
+            return self.queue, True
+        return self.queue, False
+
+    def quote(self, minutes, order_type, now=None):
+        """Estimate for a new order, without adding it to the queue."""
+        now = now or timezone.now()
+        with self.lock:
+            queue, _ = self._current_queue(now)
+            return queue.quote(minutes, order_type == Order.OrderType.DELIVERY, now)
+
+    def sync(self, order_id, status, order_type, eta, minutes=None):
+        """Bring the queue in line with a saved order and store the estimates that moved."""
+        now = timezone.now()
+        moved = []
+        with self.lock:
+            queue, reloaded = self._current_queue(now)
+            if status in QUEUED_STATUSES and order_id not in queue:
+                if minutes is None:
+                    minutes = order_minutes(
+                        item.menu_item for item in Order(pk=order_id).items.select_related('menu_item')
+                    )
+                delivery = order_type == Order.OrderType.DELIVERY
+                order = QueuedOrder(order_id, minutes, delivery, eta)
+                if eta is None:
+                    order.eta = queue.quote(minutes, delivery, now)
+                    moved.append(order)
+                queue.add(order)
+            elif status not in QUEUED_STATUSES and (order_id in queue or reloaded):
+                # A reloaded queue no longer holds the order; recompute all of it
+                start = queue.remove(order_id, now) if order_id in queue else 0
+                moved = queue.reflow(start, now)
+        if moved:
+            Order.objects.bulk_update(
+                [Order(pk=order.order_id, estimated_delivery_time=order.eta) for order in moved],
+                ['estimated_delivery_time']
+            )
+
+    def reset(self):
+        with self.lock:
+            self.queue = None
+
+
+kitchen = Kitchen()
@@ -0,0 +1,147 @@
+"""
+Push channel for order status changes.
+
+Status updates are published to a broker after the transaction commits and
+streamed to browsers as server-sent events. The default broker keeps its
+subscribers in process; point ``ORDER_EVENTS_BROKER`` at another class with
+the same ``publish``/``subscribe`` interface to fan out across processes.
+
+Streams need an ASGI server, and Django 4.2 doesn't notice a client that
+disconnects mid-stream, so each stream closes after ``STREAM_SECONDS`` and
+the browser's EventSource reconnects. Requests served through WSGI get an
+error rather than a stream that would tie up the worker.
+"""
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from functools import lru_cache
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.module_loading import import_string
+
+# Staff screens listen on this channel, customers on ``order_channel(number)``
+STAFF_CHANNEL = 'orders'
+HEARTBEAT_SECONDS = 15
+# Lifetime of one stream; a closed tab holds its subscription at most this long
+STREAM_SECONDS = 300
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+def order_channel(order_number):
+    return f'order:{order_number}'
+
+
+class InProcessBroker:
+    """Fan messages out to asyncio queues of subscribers in this process."""
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, channel, message):
+        # Called from sync code (signal handlers), possibly in another thread
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._deliver, queue, message)
+            except RuntimeError:
+                # The subscriber's event loop has already closed
+                pass
+
+    @staticmethod
+    def _deliver(queue, message):
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Drop updates for a client that stopped reading; it can reload the order
+            pass
+
+    def subscribe(self, channel):
+        # ``async with broker.subscribe(channel) as queue`` yields an asyncio.Queue of messages
+        return _Subscription(self, channel)
+
+    def _add(self, channel, subscriber):
+        with self._lock:
+            self._subscribers[channel].add(subscriber)
+
+    def _remove(self, channel, subscriber):
+        with self._lock:
+            self._subscribers[channel].discard(subscriber)
+            if not self._subscribers[channel]:
+                del self._subscribers[channel]
+
+
+class _Subscription:
+    def __init__(self, broker, channel):
+        self.broker = broker
+        self.channel = channel
+        self.subscriber = None
+
+    async def __aenter__(self):
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.subscriber = (asyncio.get_running_loop(), queue)
+        self.broker._add(self.channel, self.subscriber)
+        return queue
+
+    async def __aexit__(self, *exc_info):
+        self.broker._remove(self.channel, self.subscriber)
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    broker_path = getattr(settings, 'ORDER_EVENTS_BROKER', 'orders.events.InProcessBroker')
+    return import_string(broker_path)()
+
+
+def status_update_message(status_update):
+    order = status_update.order
+    return {
+        'order_number': order.order_number,
+        'status': status_update.status,
+        'status_display': status_update.get_status_display(),
+        'notes': status_update.notes,
+        'created_at': status_update.created_at.isoformat(),
+    }
+
+
+def publish_status_update(status_update):
+    message = status_update_message(status_update)
+    broker = get_broker()
+    broker.publish(STAFF_CHANNEL, message)
+    broker.publish(order_channel(message['order_number']), message)
+
+
+async def event_stream(channel):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + STREAM_SECONDS
+    async with get_broker().subscribe(channel) as queue:
+        # Ask EventSource clients to reconnect after 5 seconds when the stream ends or drops
+        yield 'retry: 5000\n\n'
+        while (remaining := deadline - loop.time()) > 0:
+            try:
+                message = await asyncio.wait_for(queue.get(), timeout=min(HEARTBEAT_SECONDS, remaining))
+            except asyncio.TimeoutError:
+                yield ': keep-alive\n\n'
+                continue
+            yield f'event: status\ndata: {json.dumps(message)}\n\n'
+
+
+def event_stream_response(request, channel):
+    if not isinstance(request, ASGIRequest):
+        # WSGI would buffer the stream in the worker until it ends
+        return JsonResponse({'error': 'Order events are only served over ASGI'}, status=501)
+    response = StreamingHttpResponse(event_stream(channel), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@sync_to_async
+def get_authenticated_user(request):
+    # request.user is lazy and hits the session/user tables, which is sync-only
+    return request.user if request.user.is_authenticated else None
@@ -0,0 +1,110 @@
+import time
+from decimal import Decimal
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from menu.models import Category, MenuItem, MenuItemVariant
+from orders.forms import DeliveryOrderForm
+from orders.models import Cart, CartItem, Order
+from orders.views import create_order
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Check out carts of growing size and report the queries and time each checkout takes. '
+        'Everything runs inside a transaction that is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', default='1,5,25,100',
+            help='Comma separated cart sizes (lines per cart). Defaults to 1,5,25,100.'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options['sizes'].split(',')]
+        except ValueError:
+            raise CommandError('--sizes must be a comma separated list of integers.')
+
+        results = []
+        try:
+            with transaction.atomic():
+                menu_items, variants = self.menu()
+                # An untimed checkout first, so what a process loads once (the kitchen
+                # queue behind delivery estimates, see orders.eta) isn't counted
+                self.checkout(1, menu_items, variants, username='checkout-benchmark-warmup')
+                for size in sizes:
+                    results.append(self.checkout(size, menu_items, variants))
+                raise Rollback
+        except Rollback:
+            pass
+
+        self.stdout.write(f'{"lines":>6} {"queries":>8} {"ms":>9}')
+        for size, queries, elapsed in results:
+            self.stdout.write(f'{size:>6} {queries:>8} {elapsed * 1000:>9.2f}')
+
+        query_counts = {queries for _, queries, _ in results}
+        if len(query_counts) > 1:
+            raise CommandError(f'Checkout query count grows with cart size: {sorted(query_counts)}')
+        self.stdout.write(self.style.SUCCESS('Checkout query count is constant across cart sizes.'))
+
+    def menu(self):
+        menu_items = list(MenuItem.objects.filter(is_available=True)[:20])
+        if not menu_items:
+            category = Category.objects.create(name='Benchmark', slug='benchmark-checkout')
+            menu_items = [
+                MenuItem.objects.create(
+                    name=f'Benchmark item {number}', slug=f'benchmark-checkout-{number}',
+                    category=category, description='', price=Decimal('9.99'), image='menu_images/benchmark.jpg'
+                )
+                for number in range(5)
+            ]
+        variants = list(MenuItemVariant.objects.filter(menu_item__in=menu_items))
+        return menu_items, variants
+
+    def checkout(self, size, menu_items, variants, username=None):
+        user = get_user_model().objects.create_user(username=username or f'checkout-benchmark-{size}')
+        cart = Cart.objects.create(user=user)
+        lines = []
+        for number in range(size):
+            # Every other line uses a variant when the menu has any
+            if variants and number % 2:
+                variant = variants[number % len(variants)]
+                lines.append(CartItem(cart=cart, menu_item=variant.menu_item, variant=variant, quantity=2))
+            else:
+                lines.append(CartItem(cart=cart, menu_item=menu_items[number % len(menu_items)], quantity=1))
+        CartItem.objects.bulk_create(lines)
+        # bulk_create skips CartItem.save(), which keeps the stored totals current
+        Cart.objects.filter(pk=cart.pk).recompute_totals()
+
+        request = RequestFactory().post('/orders/checkout/delivery/')
+        request.user = user
+        request.session = import_module(settings.SESSION_ENGINE).SessionStore()
+        form = DeliveryOrderForm({
+            'customer_name': 'Benchmark',
+            'customer_phone': '555-0100',
+            'customer_email': 'benchmark@example.com',
+            'delivery_address': '1 Benchmark Street',
+            'payment_method': Order.PaymentMethod.CASH,
+        })
+        if not form.is_valid():
+            raise CommandError(f'Invalid benchmark order form: {form.errors.as_text()}')
+
+        # Start from a fresh cart instance, as the checkout views do
+        cart = Cart.objects.get(pk=cart.pk)
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            create_order(request, form, cart, Order.OrderType.DELIVERY)
+            elapsed = time.perf_counter() - started
+        return size, len(queries.captured_queries), elapsed
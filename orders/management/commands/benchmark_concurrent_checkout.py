@@ -0,0 +1,125 @@
+import os
+import tempfile
+import threading
+import time
+from decimal import Decimal
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections
+from django.test import RequestFactory
+
+from database.scratch import scratch_database
+from menu.models import Category, MenuItem
+from orders.forms import DeliveryOrderForm
+from orders.models import Cart, CartItem, Order
+from orders.views import create_order
+
+# profile -> (ENGINE, OPTIONS)
+PROFILES = {
+    'stock': ('django.db.backends.sqlite3', {}),
+    'tuned': ('database.sqlite3', {'timeout': 20}),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Run checkouts from several threads at once against scratch SQLite databases, '
+        'once with the stock backend and once with the tuned one, and report lock errors and throughput.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help='Concurrent customers. Defaults to 8.')
+        parser.add_argument('--checkouts', type=int, default=20, help='Checkouts per customer. Defaults to 20.')
+        parser.add_argument('--lines', type=int, default=3, help='Cart lines per checkout. Defaults to 3.')
+        parser.add_argument(
+            '--profiles', default='stock,tuned', help=f'Comma separated profiles out of {", ".join(PROFILES)}.'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('This benchmark compares SQLite configurations; the default database is not SQLite.')
+        profiles = [profile.strip() for profile in options['profiles'].split(',')]
+        unknown = [profile for profile in profiles if profile not in PROFILES]
+        if unknown:
+            raise CommandError(f'Unknown profile(s): {", ".join(unknown)}.')
+
+        results = []
+        with tempfile.TemporaryDirectory() as directory:
+            for profile in profiles:
+                engine, db_options = PROFILES[profile]
+                with scratch_database(os.path.join(directory, f'{profile}.sqlite3'), engine, db_options):
+                    users, menu_items = self.seed(options['threads'])
+                    connections.close_all()
+                    results.append((profile, *self.run(users, menu_items, options['checkouts'], options['lines'])))
+
+        self.stdout.write(f'{"profile":<8} {"orders":>7} {"locked":>7} {"seconds":>8} {"orders/s":>9}')
+        for profile, completed, locked, elapsed in results:
+            self.stdout.write(f'{profile:<8} {completed:>7} {locked:>7} {elapsed:>8.2f} {completed / elapsed:>9.1f}')
+
+    def seed(self, count):
+        category = Category.objects.create(name='Benchmark', slug='benchmark-concurrency')
+        menu_items = [
+            MenuItem.objects.create(
+                name=f'Benchmark item {number}', slug=f'benchmark-concurrency-{number}',
+                category=category, description='', price=Decimal('9.99'), image='menu_images/benchmark.jpg'
+            )
+            for number in range(5)
+        ]
+        users = [
+            get_user_model().objects.create_user(username=f'concurrency-benchmark-{number}')
+            for number in range(count)
+        ]
+        return users, menu_items
+
+    def run(self, users, menu_items, checkouts, lines):
+        totals = {'completed': 0, 'locked': 0}
+        lock = threading.Lock()
+        start = threading.Barrier(len(users))
+
+        def customer(user):
+            completed = locked = 0
+            try:
+                start.wait()
+                for _ in range(checkouts):
+                    try:
+                        self.checkout(user, menu_items, lines)
+                        completed += 1
+                    except OperationalError as e:
+                        if 'locked' not in str(e):
+                            raise
+                        locked += 1
+            finally:
+                connection.close()
+                with lock:
+                    totals['completed'] += completed
+                    totals['locked'] += locked
+
+        threads = [threading.Thread(target=customer, args=(user,)) for user in users]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return totals['completed'], totals['locked'], time.perf_counter() - started
+
+    def checkout(self, user, menu_items, lines):
+        cart, _ = Cart.objects.get_or_create(user=user)
+        for number in range(lines):
+            CartItem.objects.create(cart=cart, menu_item=menu_items[number % len(menu_items)], quantity=1)
+
+        request = RequestFactory().post('/orders/checkout/delivery/')
+        request.user = user
+        request.session = import_module(settings.SESSION_ENGINE).SessionStore()
+        form = DeliveryOrderForm({
+            'customer_name': 'Benchmark',
+            'customer_phone': '555-0100',
+            'customer_email': 'benchmark@example.com',
+            'delivery_address': '1 Benchmark Street',
+            'payment_method': Order.PaymentMethod.CASH,
+        })
+        if not form.is_valid():
+            raise CommandError(f'Invalid benchmark order form: {form.errors.as_text()}')
+        create_order(request, form, Cart.objects.get(pk=cart.pk), Order.OrderType.DELIVERY)
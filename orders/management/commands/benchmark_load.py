@@ -0,0 +1,166 @@
+import json
+import logging
+import os
+import platform
+import tempfile
+import time
+from contextlib import ExitStack
+
+import django
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from benchmarks.load import SCENARIOS, LoadContext, compare, run_scenario, select_scenarios
+from benchmarks.synthetic import ADMIN_USERNAME, SyntheticDataset, refresh_derived_data
+from database.scratch import scratch_database
+from orders.models import Order
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive the menu pages, add-to-cart, checkout, the kanban board and the owner reports in-process and '
+        'report throughput and p50/p95/p99 latency. With --scales, each scale gets its own scratch SQLite '
+        'database filled with that many synthetic orders; otherwise the current database is used (run '
+        'generate_synthetic_data first).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scales', default=None,
+            help='Comma separated order counts to generate and measure, e.g. 10000,100000,1000000.'
+        )
+        parser.add_argument(
+            '--scenarios', default='',
+            help=f'Comma separated scenarios or groups (menu, cart, checkout, kanban, reports). '
+                 f'Defaults to all: {", ".join(SCENARIOS)}.'
+        )
+        parser.add_argument('--requests', type=int, default=100, help='Timed requests per scenario. Defaults to 100.')
+        parser.add_argument('--warmup', type=int, default=5, help='Untimed requests per scenario first. Defaults to 5.')
+        parser.add_argument('--cold-cache', action='store_true', help='Clear every cache before each request.')
+        parser.add_argument(
+            '--data-dir', default=None,
+            help='Keep the --scales databases here and reuse them on later runs instead of regenerating.'
+        )
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for generated data. Defaults to 0.')
+        parser.add_argument('--label', default='', help='Free text stored with the results, e.g. a branch name.')
+        parser.add_argument('--output', default=None, help='Write the results as JSON to this file.')
+        parser.add_argument('--compare', default=None, help='Results JSON of an earlier run to compare p95 against.')
+
+    def handle(self, *args, **options):
+        try:
+            names = select_scenarios([name.strip() for name in options['scenarios'].split(',') if name.strip()])
+        except ValueError as e:
+            raise CommandError(f'Unknown scenario or group "{e}".')
+        try:
+            scales = [int(scale) for scale in options['scales'].split(',')] if options['scales'] else [None]
+        except ValueError:
+            raise CommandError('--scales must be a comma separated list of integers.')
+        if options['requests'] < 1:
+            raise CommandError('--requests must be at least 1.')
+        if scales != [None] and connection.vendor != 'sqlite':
+            raise CommandError(
+                '--scales builds scratch SQLite databases; on other databases run generate_synthetic_data '
+                'into a scratch database and benchmark that.'
+            )
+        baseline = self.read_baseline(options['compare'])
+
+        results = {
+            'label': options['label'],
+            'started_at': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'requests': options['requests'],
+            'warmup': options['warmup'],
+            'cold_cache': options['cold_cache'],
+            'runs': [],
+        }
+        # One JSON line per request would drown the output; over-budget warnings still show
+        instrumentation_logger = logging.getLogger('instrumentation')
+        level = instrumentation_logger.level
+        instrumentation_logger.setLevel(logging.WARNING)
+        try:
+            with ExitStack() as stack:
+                directory = options['data_dir'] or stack.enter_context(tempfile.TemporaryDirectory())
+                os.makedirs(directory, exist_ok=True)
+                for scale in scales:
+                    if scale is None:
+                        results['runs'].append(self.run(None, names, options))
+                        continue
+                    path = os.path.join(directory, f'synthetic-{scale}.sqlite3')
+                    with scratch_database(path):
+                        results['runs'].append(self.run(scale, names, options))
+        finally:
+            instrumentation_logger.setLevel(level)
+
+        self.report(results)
+        if baseline is not None:
+            self.report_comparison(compare(results, baseline))
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(results, output, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Wrote results to {options["output"]}.'))
+
+    def read_baseline(self, path):
+        if not path:
+            return None
+        try:
+            with open(path) as baseline:
+                return json.load(baseline)
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Could not read {path}: {e}')
+
+    def run(self, scale, names, options):
+        generated_seconds = None
+        has_data = get_user_model().objects.filter(username=ADMIN_USERNAME).exists()
+        if scale is not None and not has_data:
+            self.stdout.write(f'Generating {scale} orders...')
+            started = time.perf_counter()
+            SyntheticDataset(
+                orders=scale, users=max(scale // 100, 200), carts=200, seed=options['seed']
+            ).generate()
+            refresh_derived_data()
+            generated_seconds = round(time.perf_counter() - started, 1)
+        elif not has_data:
+            raise CommandError('No synthetic data in this database; run generate_synthetic_data or pass --scales.')
+
+        context = LoadContext()
+        scenarios = []
+        for name in names:
+            self.stdout.write(f'Running {name} ({scale or "current database"})...')
+            scenarios.append(run_scenario(
+                context, name, options['requests'], warmup=options['warmup'], cold_cache=options['cold_cache']
+            ))
+        return {
+            'scale': scale,
+            'orders': Order.objects.count(),
+            'generated_seconds': generated_seconds,
+            'scenarios': scenarios,
+        }
+
+    def report(self, results):
+        self.stdout.write(
+            f'{"scale":>8} {"scenario":<18} {"req/s":>8} {"p50 ms":>8} {"p95 ms":>8} '
+            f'{"p99 ms":>8} {"queries":>8}'
+        )
+        for run in results['runs']:
+            scale = run['scale'] or run['orders']
+            for row in run['scenarios']:
+                if row['error']:
+                    self.stdout.write(self.style.ERROR(f'{scale:>8} {row["scenario"]:<18} FAILED: {row["error"]}'))
+                    continue
+                self.stdout.write(
+                    f'{scale:>8} {row["scenario"]:<18} {row["throughput"] or 0:>8.1f} {row["p50_ms"]:>8.2f} '
+                    f'{row["p95_ms"]:>8.2f} {row["p99_ms"]:>8.2f} {row["queries"]:>8.1f}'
+                )
+
+    def report_comparison(self, rows):
+        if not rows:
+            self.stdout.write('Nothing in common with the baseline to compare.')
+            return
+        self.stdout.write(f'\n{"scale":>8} {"scenario":<18} {"base p95":>9} {"p95":>9} {"change":>8}')
+        for scale, name, before, after, change in rows:
+            change_text = f'{change:+.1f}%' if change is not None else '-'
+            self.stdout.write(f'{scale or "-":>8} {name:<18} {before:>9.2f} {after:>9.2f} {change_text:>8}')
@@ -0,0 +1,63 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks.synthetic import ADMIN_USERNAME, DEFAULT_PASSWORD, SyntheticDataset, refresh_derived_data
+
+
+class Command(BaseCommand):
+    help = (
+        'Fill the database with synthetic customers, menu, carts, expenses and orders spread over several '
+        'years, for benchmarks and load tests. Use a scratch database: nothing is cleaned up.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=100000, help='orders.Order rows. Defaults to 100000.')
+        parser.add_argument(
+            '--foodapp-orders', type=int, default=None, help='foodapp.Order rows. Defaults to --orders.'
+        )
+        parser.add_argument('--users', type=int, default=1000, help='Customer accounts. Defaults to 1000.')
+        parser.add_argument('--categories', type=int, default=12, help='Menu categories (at most 16). Defaults to 12.')
+        parser.add_argument('--items-per-category', type=int, default=12, help='Menu items per category. Defaults to 12.')
+        parser.add_argument('--years', type=int, default=3, help='Years of order history. Defaults to 3.')
+        parser.add_argument('--carts', type=int, default=200, help='Customers with an open cart. Defaults to 200.')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per bulk_create. Defaults to 5000.')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed. Defaults to 0.')
+        parser.add_argument(
+            '--password', default=DEFAULT_PASSWORD, help=f'Password of every generated account. Defaults to "{DEFAULT_PASSWORD}".'
+        )
+
+    def handle(self, *args, **options):
+        if get_user_model().objects.filter(username=ADMIN_USERNAME).exists():
+            raise CommandError('This database already has synthetic data; generate into an empty database.')
+        self.verbosity = options['verbosity']
+
+        dataset = SyntheticDataset(
+            orders=options['orders'],
+            foodapp_orders=options['foodapp_orders'],
+            users=options['users'],
+            categories=options['categories'],
+            items_per_category=options['items_per_category'],
+            years=options['years'],
+            carts=options['carts'],
+            batch_size=options['batch_size'],
+            seed=options['seed'],
+            password=options['password'],
+            progress=self.progress,
+        )
+        started = time.perf_counter()
+        counts = dataset.generate()
+        self.progress('Rebuilding report rollups, the search index and menu catalogs...')
+        refresh_derived_data()
+        elapsed = time.perf_counter() - started
+
+        for name, count in counts.items():
+            self.stdout.write(f'{name:<22} {count:>10}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated synthetic data in {elapsed:.1f}s. Log in as "{ADMIN_USERNAME}" to look around.'
+        ))
+
+    def progress(self, message):
+        if self.verbosity:
+            self.stdout.write(message)
@@ -0,0 +1,17 @@
+from .cart import COOKIE_NAME
+
+
+class CartMiddleware:
+    """Save changed guest carts to their signed cookie, and drop cookies merged at login."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if getattr(request, '_cart_cookie_merged', False):
+            response.delete_cookie(COOKIE_NAME, samesite='Lax')
+        storage = getattr(request, '_cart_storage', None)
+        if storage is not None:
+            storage.persist(response)
+        return response
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-16 22:41
+
+from django.db import migrations, models
+from django.db.models.functions import TruncDate
+import django.utils.timezone
+
+
+def fill_business_date(apps, schema_editor):
+    Order = apps.get_model('orders', 'Order')
+    Order.objects.update(business_date=TruncDate('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='business_date',
+            field=models.DateField(default=django.utils.timezone.localdate, editable=False),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_business_date, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['status', 'created_at'], name='orders_order_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['business_date', 'status'], name='orders_order_bdate_idx'),
+        ),
+    ]
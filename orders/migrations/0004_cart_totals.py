@@ -0,0 +1,46 @@
+# Generated by Django 4.2.7 on 2026-10-16 23:58
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import ExpressionWrapper, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_cart_totals(apps, schema_editor):
+    Cart = apps.get_model('orders', 'Cart')
+    CartItem = apps.get_model('orders', 'CartItem')
+    unit_price = F('menu_item__price') + Coalesce(F('variant__price_adjustment'), Value(Decimal('0')))
+    lines = CartItem.objects.filter(cart=OuterRef('pk')).order_by().values('cart')
+    Cart.objects.update(
+        subtotal=Coalesce(
+            Subquery(lines.annotate(total=Sum(ExpressionWrapper(
+                F('quantity') * unit_price, output_field=models.DecimalField(max_digits=10, decimal_places=2)
+            ))).values('total')),
+            Value(Decimal('0')),
+            output_field=models.DecimalField(max_digits=10, decimal_places=2)
+        ),
+        item_count=Coalesce(Subquery(lines.annotate(count=Sum('quantity')).values('count')), 0)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0001_initial'),
+        ('orders', '0003_order_user_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cart',
+            name='item_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='cart',
+            name='subtotal',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=10),
+        ),
+        migrations.RunPython(fill_cart_totals, migrations.RunPython.noop),
+    ]
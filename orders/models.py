@@ -1,22 +1,50 @@
+from decimal import Decimal
 from django.db import models
+from django.db.models import ExpressionWrapper, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
 from django.conf import settings
+from django.utils import timezone
 from menu.models import MenuItem, MenuItemVariant
 
+class CartQuerySet(models.QuerySet):
+    def recompute_totals(self):
+        """Recalculate the stored totals of every cart in the queryset with one UPDATE."""
+        lines = CartItem.objects.filter(cart=OuterRef('pk')).order_by().values('cart')
+        return self.update(
+            subtotal=Coalesce(
+                Subquery(lines.annotate(total=Sum(CartItem.line_total_expression())).values('total')),
+                Value(Decimal('0')),
+                output_field=models.DecimalField(max_digits=10, decimal_places=2)
+            ),
+            item_count=Coalesce(Subquery(lines.annotate(count=Sum('quantity')).values('count')), 0)
+        )
+
 class Cart(models.Model):
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='cart')
+    # Kept current by CartItem.save()/delete() and by the menu price signals
+    subtotal = models.DecimalField(max_digits=10, decimal_places=2, default=0, editable=False)
+    item_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = CartQuerySet.as_manager()
+    
     def __str__(self):
         return f"Cart for {self.user.username}"
     
     @property
     def total_price(self):
-        return sum(item.total_price for item in self.items.all())
+        return self.subtotal
     
     @property
     def total_items(self):
-        return sum(item.quantity for item in self.items.all())
+        return self.item_count
+    
+    def clear(self):
+        self.items.all().delete()
+        Cart.objects.filter(pk=self.pk).update(subtotal=0, item_count=0)
+        self.subtotal = Decimal('0')
+        self.item_count = 0
 
 class CartItem(models.Model):
     cart = models.ForeignKey(Cart, on_delete=models.CASCADE, related_name='items')
@@ -30,6 +58,49 @@ class CartItem(models.Model):
     def __str__(self):
         return f"{self.quantity} x {self.menu_item.name}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what is counted in the cart totals so save() can apply just the difference
+        if {'menu_item_id', 'variant_id', 'quantity'} <= set(field_names):
+            instance._counted = (instance.menu_item_id, instance.variant_id, instance.quantity)
+        return instance
+    
+    @staticmethod
+    def line_total_expression():
+        unit_price = F('menu_item__price') + Coalesce(F('variant__price_adjustment'), Value(Decimal('0')))
+        return ExpressionWrapper(
+            F('quantity') * unit_price, output_field=models.DecimalField(max_digits=10, decimal_places=2)
+        )
+    
+    def save(self, *args, **kwargs):
+        counted = getattr(self, '_counted', None)
+        super().save(*args, **kwargs)
+        if counted is None:
+            self._add_to_cart(self.quantity)
+        elif counted[:2] == (self.menu_item_id, self.variant_id):
+            self._add_to_cart(self.quantity - counted[2])
+        else:
+            Cart.objects.filter(pk=self.cart_id).recompute_totals()
+        self._counted = (self.menu_item_id, self.variant_id, self.quantity)
+    
+    def delete(self, *args, **kwargs):
+        counted = getattr(self, '_counted', None)
+        result = super().delete(*args, **kwargs)
+        if counted is not None and counted[:2] == (self.menu_item_id, self.variant_id):
+            self._add_to_cart(-counted[2])
+        else:
+            Cart.objects.filter(pk=self.cart_id).recompute_totals()
+        self._counted = None
+        return result
+    
+    def _add_to_cart(self, quantity):
+        if quantity:
+            Cart.objects.filter(pk=self.cart_id).update(
+                subtotal=F('subtotal') + self.unit_price * quantity,
+                item_count=F('item_count') + quantity
+            )
+    
     @property
     def unit_price(self):
         base_price = self.menu_item.price
@@ -98,6 +169,8 @@ class Order(models.Model):
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Local date the order was placed on; reports filter on it instead of created_at__date
+    business_date = models.DateField(editable=False)
     estimated_delivery_time = models.DateTimeField(null=True, blank=True)
     actual_delivery_time = models.DateTimeField(null=True, blank=True)
     
@@ -110,9 +183,22 @@ class Order(models.Model):
         related_name='assigned_orders'
     )
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='orders_order_status_idx'),
+            models.Index(fields=['business_date', 'status'], name='orders_order_bdate_idx'),
+            # Customer order history pages on (created_at, id)
+            models.Index(fields=['user', 'created_at', 'id'], name='orders_order_user_created_idx'),
+        ]
+    
     def __str__(self):
         return f"Order #{self.order_number}"
     
+    def save(self, *args, **kwargs):
+        if self.business_date is None:
+            self.business_date = timezone.localdate(self.created_at or timezone.now())
+        super().save(*args, **kwargs)
+    
     @property
     def is_delivery(self):
         return self.order_type == self.OrderType.DELIVERY
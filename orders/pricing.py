@@ -0,0 +1,67 @@
+"""
+Checkout pricing.
+
+The cart is read once with its menu items and variants joined in, priced in
+``Decimal`` and turned into unsaved ``OrderItem`` rows for ``bulk_create``,
+so checkout costs the same number of queries whatever the size of the cart.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+
+from .models import Order, OrderItem
+
+TAX_RATE = Decimal('0.08')  # 8% tax rate
+DELIVERY_FEE = Decimal('2.99')
+CENT = Decimal('0.01')
+ZERO = Decimal('0.00')
+
+
+def to_cents(amount):
+    return amount.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def cart_lines(cart):
+    """All cart items with ``menu_item`` and ``variant`` loaded in one query."""
+    return list(cart.items.select_related('menu_item', 'variant').order_by('id'))
+
+
+def price_lines(lines, order_type):
+    """
+    Return ``(priced_lines, totals)``: ``priced_lines`` pairs each cart item
+    with its unit and line price, ``totals`` holds the order's subtotal, tax,
+    delivery fee and total.
+    """
+    priced_lines = []
+    subtotal = ZERO
+    for line in lines:
+        unit_price = line.menu_item.price
+        if line.variant is not None:
+            unit_price += line.variant.price_adjustment
+        line_total = unit_price * line.quantity
+        priced_lines.append((line, unit_price, line_total))
+        subtotal += line_total
+
+    tax = to_cents(subtotal * TAX_RATE)
+    delivery_fee = DELIVERY_FEE if order_type == Order.OrderType.DELIVERY else ZERO
+    totals = {
+        'subtotal': subtotal,
+        'tax': tax,
+        'delivery_fee': delivery_fee,
+        'total': subtotal + tax + delivery_fee,
+    }
+    return priced_lines, totals
+
+
+def build_order_items(order, priced_lines):
+    """Unsaved ``OrderItem`` rows for ``OrderItem.objects.bulk_create``."""
+    return [
+        OrderItem(
+            order=order,
+            menu_item=line.menu_item,
+            variant=line.variant.name if line.variant is not None else '',
+            quantity=line.quantity,
+            unit_price=unit_price,
+            total_price=line_total,
+            special_instructions=line.special_instructions,
+        )
+        for line, unit_price, line_total in priced_lines
+    ]
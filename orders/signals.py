@@ -0,0 +1,67 @@
+from django.contrib.auth.signals import user_logged_in
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .cart import merge_guest_cart
+from .eta import kitchen
+from .events import publish_status_update
+from .models import Cart, Order, OrderStatusUpdate
+from menu.models import MenuItem, MenuItemVariant
+
+
+@receiver(post_save, sender=OrderStatusUpdate)
+def status_update_created(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: publish_status_update(instance))
+
+
+@receiver(post_save, sender=Order)
+def update_kitchen_queue(sender, instance, **kwargs):
+    # Values as saved; the instance may change again before the commit
+    order_id, status, order_type = instance.pk, instance.status, instance.order_type
+    eta, minutes = instance.estimated_delivery_time, getattr(instance, '_kitchen_minutes', None)
+    transaction.on_commit(lambda: kitchen.sync(order_id, status, order_type, eta, minutes))
+
+
+@receiver(user_logged_in)
+def merge_cart_on_login(sender, request, user, **kwargs):
+    if request is not None:
+        merge_guest_cart(request, user)
+
+
+# Cart totals follow menu price changes. Price edits and deletions (which
+# cascade to or null out cart lines without calling CartItem.delete()) are
+# detected before the write and the affected carts recomputed after it.
+
+@receiver(pre_save, sender=MenuItem)
+@receiver(pre_save, sender=MenuItemVariant)
+def note_price_change(sender, instance, **kwargs):
+    price_field = 'price' if sender is MenuItem else 'price_adjustment'
+    if instance.pk is None:
+        instance._price_changed = False
+        return
+    stored_price = sender.objects.filter(pk=instance.pk).values_list(price_field, flat=True).first()
+    instance._price_changed = stored_price is not None and stored_price != getattr(instance, price_field)
+
+
+@receiver(post_save, sender=MenuItem)
+@receiver(post_save, sender=MenuItemVariant)
+def recompute_carts_for_price(sender, instance, **kwargs):
+    if getattr(instance, '_price_changed', False):
+        lookup = 'items__menu_item' if sender is MenuItem else 'items__variant'
+        Cart.objects.filter(**{lookup: instance}).recompute_totals()
+
+
+@receiver(pre_delete, sender=MenuItem)
+@receiver(pre_delete, sender=MenuItemVariant)
+def note_carts_for_deletion(sender, instance, **kwargs):
+    lookup = 'items__menu_item' if sender is MenuItem else 'items__variant'
+    instance._cart_ids = list(Cart.objects.filter(**{lookup: instance}).values_list('pk', flat=True).distinct())
+
+
+@receiver(post_delete, sender=MenuItem)
+@receiver(post_delete, sender=MenuItemVariant)
+def recompute_carts_after_deletion(sender, instance, **kwargs):
+    if getattr(instance, '_cart_ids', None):
+        Cart.objects.filter(pk__in=instance._cart_ids).recompute_totals()
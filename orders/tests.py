@@ -0,0 +1,27 @@
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.test import RequestFactory, SimpleTestCase
+
+from . import events
+
+
+class EventStreamTests(SimpleTestCase):
+    @mock.patch.object(events, 'HEARTBEAT_SECONDS', 0.02)
+    @mock.patch.object(events, 'STREAM_SECONDS', 0.05)
+    def test_stream_ends_and_unsubscribes_after_its_lifetime(self):
+        broker = events.InProcessBroker()
+
+        async def read_stream():
+            return [chunk async for chunk in events.event_stream('test')]
+
+        with mock.patch.object(events, 'get_broker', return_value=broker):
+            chunks = async_to_sync(read_stream)()
+        self.assertEqual(chunks[0], 'retry: 5000\n\n')
+        self.assertIn(': keep-alive\n\n', chunks)
+        self.assertFalse(broker._subscribers)
+
+    def test_wsgi_requests_get_an_error_instead_of_a_stream(self):
+        response = events.event_stream_response(RequestFactory().get('/orders/events/'), 'test')
+        self.assertEqual(response.status_code, 501)
+        self.assertFalse(response.streaming)
@@ -19,4 +19,5 @@ urlpatterns = [
     path('orders/', views.order_list, name='order_list'),
     path('orders/<str:order_number>/', views.order_detail, name='order_detail'),
     path('orders/<str:order_number>/cancel/', views.cancel_order, name='cancel_order'),
+    path('orders/<str:order_number>/events/', views.order_events, name='order_events'),
 ]
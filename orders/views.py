@@ -4,12 +4,19 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.utils import timezone
-from django.db import transaction
 from django.conf import settings
-from .models import Cart, CartItem, Order, OrderItem, OrderStatusUpdate
+from django.http import Http404, JsonResponse
+from .models import Cart, Order, OrderItem, OrderStatusUpdate
 from .forms import AddToCartForm, DeliveryOrderForm, PickupOrderForm
+from .cart import get_cart
+from .pricing import build_order_items, cart_lines, price_lines
+from .eta import kitchen, minutes_until, order_minutes
 from menu.models import MenuItem, MenuItemVariant
 from accounts.models import DeliveryAddress
+from pagination.keyset import paginate
+from database.transactions import write_atomic
+from instrumentation.metrics import query_budget
+from .events import event_stream_response, get_authenticated_user, order_channel
 
 def get_or_create_cart(request):
     if request.user.is_authenticated:
@@ -17,16 +24,19 @@ def get_or_create_cart(request):
         return cart
     return None
 
-@login_required
+@query_budget(6)
 def cart_detail(request):
-    cart = get_or_create_cart(request)
-    context = {'cart': cart}
+    cart = get_cart(request)
+    lines = cart.lines()
+    context = {
+        'cart': cart,
+        'cart_lines': lines,
+        'total': sum(line.total_price for line in lines),
+    }
     return render(request, 'orders/cart_detail.html', context)
 
-@login_required
 def add_to_cart(request, menu_item_id):
     menu_item = get_object_or_404(MenuItem, id=menu_item_id, is_available=True)
-    cart = get_or_create_cart(request)
     
     if request.method == 'POST':
         form = AddToCartForm(request.POST)
@@ -39,25 +49,14 @@ def add_to_cart(request, menu_item_id):
             if variant_id:
                 variant = get_object_or_404(MenuItemVariant, id=variant_id, menu_item=menu_item)
             
-            # Check if this item is already in the cart
+            # Guests' carts go to a signed cookie, customers' to the database
             try:
-                cart_item = CartItem.objects.get(
-                    cart=cart,
-                    menu_item=menu_item,
-                    variant=variant
-                )
-                cart_item.quantity += quantity
-                cart_item.save()
-                messages.success(request, f'Updated quantity for {menu_item.name} in your cart.')
-            except CartItem.DoesNotExist:
-                CartItem.objects.create(
-                    cart=cart,
-                    menu_item=menu_item,
-                    variant=variant,
-                    quantity=quantity,
-                    special_instructions=special_instructions
-                )
-                messages.success(request, f'Added {menu_item.name} to your cart.')
+                if get_cart(request).add(menu_item, variant, quantity, special_instructions):
+                    messages.success(request, f'Added {menu_item.name} to your cart.')
+                else:
+                    messages.success(request, f'Updated quantity for {menu_item.name} in your cart.')
+            except ValueError as e:
+                messages.error(request, str(e))
             
             return redirect('cart_detail')
     else:
@@ -69,42 +68,35 @@ def add_to_cart(request, menu_item_id):
     }
     return render(request, 'orders/add_to_cart.html', context)
 
-@login_required
 def update_cart_item(request, cart_item_id):
-    cart_item = get_object_or_404(CartItem, id=cart_item_id, cart__user=request.user)
-    
     if request.method == 'POST':
         quantity = int(request.POST.get('quantity', 1))
+        if not get_cart(request).update(cart_item_id, quantity):
+            raise Http404('No such item in your cart')
         if quantity > 0:
-            cart_item.quantity = quantity
-            cart_item.save()
             messages.success(request, 'Cart updated successfully.')
         else:
-            cart_item.delete()
             messages.success(request, 'Item removed from cart.')
     
     return redirect('cart_detail')
 
-@login_required
 def remove_from_cart(request, cart_item_id):
-    cart_item = get_object_or_404(CartItem, id=cart_item_id, cart__user=request.user)
-    cart_item.delete()
+    if not get_cart(request).remove(cart_item_id):
+        raise Http404('No such item in your cart')
     messages.success(request, 'Item removed from cart.')
     return redirect('cart_detail')
 
-@login_required
 def clear_cart(request):
-    cart = get_or_create_cart(request)
-    if cart:
-        cart.items.all().delete()
-        messages.success(request, 'Your cart has been cleared.')
+    get_cart(request).clear()
+    messages.success(request, 'Your cart has been cleared.')
     return redirect('cart_detail')
 
 @login_required
+@query_budget(8)
 def checkout(request):
     cart = get_or_create_cart(request)
     
-    if not cart or cart.items.count() == 0:
+    if not cart or cart.item_count == 0:
         messages.warning(request, 'Your cart is empty. Please add some items before checkout.')
         return redirect('menu_list')
     
@@ -118,10 +110,11 @@ def checkout(request):
     return render(request, 'orders/checkout.html', context)
 
 @login_required
+@query_budget(16)
 def delivery_checkout(request):
     cart = get_or_create_cart(request)
     
-    if not cart or cart.items.count() == 0:
+    if not cart or cart.item_count == 0:
         messages.warning(request, 'Your cart is empty. Please add some items before checkout.')
         return redirect('menu_list')
     
@@ -155,10 +148,11 @@ def delivery_checkout(request):
     return render(request, 'orders/delivery_checkout.html', context)
 
 @login_required
+@query_budget(16)
 def pickup_checkout(request):
     cart = get_or_create_cart(request)
     
-    if not cart or cart.items.count() == 0:
+    if not cart or cart.item_count == 0:
         messages.warning(request, 'Your cart is empty. Please add some items before checkout.')
         return redirect('menu_list')
     
@@ -185,42 +179,29 @@ def pickup_checkout(request):
     }
     return render(request, 'orders/pickup_checkout.html', context)
 
-@transaction.atomic
+@write_atomic()
 def create_order(request, form, cart, order_type):
-    # Calculate order totals
-    subtotal = cart.total_price
-    tax_rate = 0.08  # 8% tax rate
-    tax = subtotal * tax_rate
-    
-    # Set delivery fee based on order type
-    delivery_fee = 0
-    if order_type == Order.OrderType.DELIVERY:
-        delivery_fee = 2.99  # Example delivery fee
-    
-    total = subtotal + tax + delivery_fee
+    # Read the cart once and price it in Decimal
+    lines = cart_lines(cart)
+    priced_lines, totals = price_lines(lines, order_type)
     
     # Create the order
     order = form.save(commit=False)
     order.user = request.user
     order.order_number = str(uuid.uuid4())[:8].upper()
     order.order_type = order_type
-    order.subtotal = subtotal
-    order.tax = tax
-    order.delivery_fee = delivery_fee
-    order.total = total
+    order.subtotal = totals['subtotal']
+    order.tax = totals['tax']
+    order.delivery_fee = totals['delivery_fee']
+    order.total = totals['total']
+    
+    # Quote against the current kitchen queue; the order joins it once committed
+    order._kitchen_minutes = order_minutes(line.menu_item for line in lines)
+    order.estimated_delivery_time = kitchen.quote(order._kitchen_minutes, order_type)
     order.save()
     
-    # Create order items from cart items
-    for cart_item in cart.items.all():
-        OrderItem.objects.create(
-            order=order,
-            menu_item=cart_item.menu_item,
-            variant=cart_item.variant.name if cart_item.variant else '',
-            quantity=cart_item.quantity,
-            unit_price=cart_item.unit_price,
-            total_price=cart_item.total_price,
-            special_instructions=cart_item.special_instructions
-        )
+    # Create order items from cart items in a single insert
+    OrderItem.objects.bulk_create(build_order_items(order, priced_lines))
     
     # Create initial status update
     OrderStatusUpdate.objects.create(
@@ -231,7 +212,7 @@ def create_order(request, form, cart, order_type):
     )
     
     # Clear the cart
-    cart.items.all().delete()
+    cart.clear()
     
     # Store order number in session for confirmation page
     request.session['order_number'] = order.order_number
@@ -239,6 +220,7 @@ def create_order(request, form, cart, order_type):
     return redirect('checkout_complete')
 
 @login_required
+@query_budget(6)
 def checkout_complete(request):
     order_number = request.session.get('order_number')
     if not order_number:
@@ -252,25 +234,46 @@ def checkout_complete(request):
     
     context = {
         'order': order,
+        'eta_minutes': minutes_until(order),
     }
     return render(request, 'orders/checkout_complete.html', context)
 
 @login_required
+@query_budget(8)
 def order_list(request):
-    orders = Order.objects.filter(user=request.user).order_by('-created_at')
+    # Newest first, one keyset page at a time on (created_at, id)
+    try:
+        page = paginate(Order.objects.filter(user=request.user), request.GET.get('cursor'), 20)
+    except ValueError:
+        raise Http404('Invalid cursor')
+    
     context = {
-        'orders': orders,
+        'orders': page.items,
+        'page': page,
     }
     return render(request, 'orders/order_list.html', context)
 
 @login_required
+@query_budget(6)
 def order_detail(request, order_number):
     order = get_object_or_404(Order, order_number=order_number, user=request.user)
     context = {
         'order': order,
+        'eta_minutes': minutes_until(order),
     }
     return render(request, 'orders/order_detail.html', context)
 
+async def order_events(request, order_number):
+    # Server-sent events stream of status changes for one of the customer's orders
+    user = await get_authenticated_user(request)
+    if user is None:
+        return JsonResponse({'error': 'Authentication required'}, status=401)
+    
+    if not await Order.objects.filter(order_number=order_number, user=user).aexists():
+        return JsonResponse({'error': 'Order not found'}, status=404)
+    
+    return event_stream_response(request, order_channel(order_number))
+
 @login_required
 def cancel_order(request, order_number):
     order = get_object_or_404(Order, order_number=order_number, user=request.user)
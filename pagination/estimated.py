@@ -0,0 +1,52 @@
+"""
+Estimated counts for admin changelists over very large tables.
+
+An unfiltered changelist runs ``SELECT COUNT(*)`` over the whole table just to
+draw its page links. ``EstimatedCountPaginator`` asks the database for its own
+row estimate instead (planner statistics on PostgreSQL and MySQL, the largest
+rowid on SQLite) once a table is past ``ESTIMATE_THRESHOLD`` rows. Filtered
+lists, and tables too small for it to matter, are still counted exactly.
+
+The estimate can be slightly off, so the last page link of a huge unfiltered
+list may overshoot; the admin then falls back to the first page.
+"""
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+ESTIMATE_THRESHOLD = 10000
+
+
+def estimated_count(model, using='default'):
+    """The database's row estimate for ``model``'s table, or None if it has none."""
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table])
+        elif connection.vendor == 'mysql':
+            cursor.execute(
+                'SELECT table_rows FROM information_schema.tables '
+                'WHERE table_schema = DATABASE() AND table_name = %s',
+                [table]
+            )
+        elif connection.vendor == 'sqlite':
+            # Reads one end of the rowid b-tree; over-counts only by deleted rows
+            cursor.execute(f'SELECT MAX(rowid) FROM {connection.ops.quote_name(table)}')
+        else:
+            return None
+        row = cursor.fetchone()
+    if row is None or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is not None and not query.where and not query.distinct:
+            estimate = estimated_count(self.object_list.model, self.object_list.db)
+            if estimate is not None and estimate >= ESTIMATE_THRESHOLD:
+                return estimate
+        return super().count
@@ -0,0 +1,182 @@
+"""
+Keyset (seek) pagination.
+
+Pages are selected with ``WHERE (created_at, id) < (last created_at, last id)``
+instead of ``OFFSET``, so a deep page costs the same as the first one and rows
+inserted while a client is paging don't shift it onto rows it has already
+seen. The ordering must end in a unique field (normally ``id``) and its fields
+must not be nullable.
+
+Cursors are opaque URL-safe strings holding the ordering values of the row at
+the edge of a page.
+"""
+import base64
+import json
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+DEFAULT_ORDERING = ('-created_at', '-id')
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+class KeysetPage:
+    def __init__(self, items, next_cursor=None, previous_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+
+def _split(ordering):
+    return [(name.lstrip('-'), name.startswith('-')) for name in ordering]
+
+
+def encode_cursor(direction, values):
+    payload = json.dumps([direction, values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, model, ordering):
+    """Return ``(direction, values)``; raises ``ValueError`` for anything malformed."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        direction, raw_values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError('Invalid cursor') from e
+    fields = _split(ordering)
+    if direction not in (NEXT, PREVIOUS) or not isinstance(raw_values, list) or len(raw_values) != len(fields):
+        raise ValueError('Invalid cursor')
+
+    values = []
+    for (name, _), raw in zip(fields, raw_values):
+        try:
+            values.append(model._meta.get_field(name).to_python(raw))
+        except Exception as e:
+            raise ValueError('Invalid cursor') from e
+    return direction, values
+
+
+def _row_values(obj, ordering):
+    # JSON-safe values; ``decode_cursor`` turns them back with the model fields
+    values = []
+    for name, _ in _split(ordering):
+        value = getattr(obj, obj._meta.get_field(name).attname)
+        if hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        elif not isinstance(value, (int, str)):
+            value = str(value)
+        values.append(value)
+    return values
+
+
+def _after(ordering, values):
+    """``Q`` for rows strictly after ``values`` in ``ordering``."""
+    fields = _split(ordering)
+    condition = Q()
+    equal = Q()
+    for (name, descending), value in zip(fields, values):
+        lookup = 'lt' if descending else 'gt'
+        condition |= equal & Q(**{f'{name}__{lookup}': value})
+        equal &= Q(**{name: value})
+
+    # Redundant bound on the leading field so the database can seek the index
+    # to the cursor instead of reading past every earlier row
+    name, descending = fields[0]
+    return Q(**{f'{name}__{"lte" if descending else "gte"}': values[0]}) & condition
+
+
+def _reverse(ordering):
+    return [name[1:] if name.startswith('-') else f'-{name}' for name in ordering]
+
+
+def paginate(queryset, cursor=None, page_size=20, ordering=DEFAULT_ORDERING):
+    """
+    Return a ``KeysetPage`` of ``queryset`` in ``ordering``, starting after
+    (or, for a previous-page cursor, ending before) the row in ``cursor``.
+    """
+    ordering = list(ordering)
+    direction, values = NEXT, None
+    if cursor:
+        direction, values = decode_cursor(cursor, queryset.model, ordering)
+
+    # Walk backwards from the cursor for previous pages, then flip the rows
+    walk = ordering if direction == NEXT else _reverse(ordering)
+    queryset = queryset.order_by(*walk)
+    if values is not None:
+        queryset = queryset.filter(_after(walk, values))
+    rows = list(queryset[:page_size + 1])
+    more = len(rows) > page_size
+    rows = rows[:page_size]
+    if direction == PREVIOUS:
+        rows.reverse()
+
+    next_cursor = previous_cursor = None
+    if rows:
+        if direction == PREVIOUS or more:
+            next_cursor = encode_cursor(NEXT, _row_values(rows[-1], ordering))
+        if (direction == NEXT and values is not None) or (direction == PREVIOUS and more):
+            previous_cursor = encode_cursor(PREVIOUS, _row_values(rows[0], ordering))
+    return KeysetPage(rows, next_cursor, previous_cursor)
+
+
+class KeysetPagination(BasePagination):
+    """
+    DRF pagination on ``(created_at, id)``, newest first. Views whose model
+    has no ``created_at`` set ``keyset_ordering``, e.g. ``('-id',)``.
+    """
+
+    page_size = api_settings.PAGE_SIZE or 10
+    cursor_query_param = 'cursor'
+    ordering = DEFAULT_ORDERING
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        ordering = getattr(view, 'keyset_ordering', self.ordering)
+        try:
+            self.page = paginate(
+                queryset, request.query_params.get(self.cursor_query_param), self.page_size, ordering
+            )
+        except ValueError:
+            raise NotFound('Invalid cursor')
+        return self.page.items
+
+    def get_link(self, cursor):
+        if cursor is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_link(self.page.next_cursor),
+            'previous': self.get_link(self.page.previous_cursor),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
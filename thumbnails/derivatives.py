@@ -0,0 +1,149 @@
+"""
+Resized derivatives of uploaded menu and category photos.
+
+Every original gets a WebP and a JPEG copy at each width in ``WIDTHS``,
+stored next to it as ``<dir>/derivatives/<filename>-<width>w.<ext>``, e.g.
+``derivatives/pizza.png-320w.webp``; keeping the original's extension gives
+``pizza.jpg`` and ``pizza.png`` derivatives of their own. Originals narrower
+than a width aren't upscaled; that derivative is a re-encoded copy at the
+original size, so every URL in a ``srcset`` exists.
+
+Derivatives are written when an image is uploaded (see the ``signals``
+modules of ``menu`` and ``foodapp``). ``generate_many`` regenerates a batch
+in a process pool, for the ``generate_image_derivatives`` command.
+"""
+import logging
+import posixpath
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from PIL import Image, ImageOps
+
+from caching.helpers import get_cache
+
+logger = logging.getLogger(__name__)
+
+WIDTHS = (320, 640, 960)
+# extension -> (Pillow format, MIME type)
+FORMATS = {
+    'webp': ('WEBP', 'image/webp'),
+    'jpeg': ('JPEG', 'image/jpeg'),
+}
+QUALITY = 80
+DERIVATIVES_DIR = 'derivatives'
+CACHE_ALIAS = 'menu'
+
+
+def derivative_name(name, width, extension):
+    directory, filename = posixpath.split(name)
+    return posixpath.join(directory, DERIVATIVES_DIR, f'{filename}-{width}w.{extension}')
+
+
+def derivative_names(name):
+    """``{(width, extension): storage name}`` for every derivative of ``name``."""
+    return {
+        (width, extension): derivative_name(name, width, extension)
+        for width in WIDTHS
+        for extension in FORMATS
+    }
+
+
+def _open(storage, name):
+    with storage.open(name, 'rb') as original:
+        image = Image.open(original)
+        # Let the JPEG decoder skip detail we're about to throw away
+        image.draft('RGB', (max(WIDTHS), max(WIDTHS)))
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    return image.convert('RGBA' if image.mode in ('RGBA', 'LA', 'P', 'PA') else 'RGB')
+
+
+def _resize(image, width):
+    if image.width <= width:
+        return image
+    return image.resize((width, round(image.height * width / image.width)), Image.Resampling.LANCZOS)
+
+
+def _encode(image, pil_format):
+    if pil_format == 'JPEG' and image.mode == 'RGBA':
+        # JPEG has no alpha channel; flatten onto white
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        image = background
+    buffer = BytesIO()
+    image.save(buffer, pil_format, quality=QUALITY, optimize=True)
+    return buffer.getvalue()
+
+
+def generate_derivatives(name, storage=default_storage, force=False):
+    """Write the derivatives of the stored image ``name``; returns how many were written."""
+    names = derivative_names(name)
+    if not force and all(storage.exists(target) for target in names.values()):
+        return 0
+
+    image = _open(storage, name)
+    for width in WIDTHS:
+        resized = _resize(image, width)
+        for extension, (pil_format, _) in FORMATS.items():
+            target = names[width, extension]
+            # Replace in place; saving over an existing name would get a random suffix
+            if storage.exists(target):
+                storage.delete(target)
+            storage.save(target, ContentFile(_encode(resized, pil_format)))
+    return len(names)
+
+
+def has_derivatives(field_file):
+    """Whether ``field_file``'s derivatives exist; only positive answers are cached."""
+    cache = get_cache(CACHE_ALIAS)
+    # The widest JPEG is written last, so its presence means the set is complete
+    last = derivative_name(field_file.name, WIDTHS[-1], 'jpeg')
+    key = f'thumbnails:{last}'
+    if cache.get(key):
+        return True
+    exists = field_file.storage.exists(last)
+    if exists:
+        cache.set(key, True, timeout=None)
+    return exists
+
+
+def _generate_safely(name, storage=default_storage, force=False):
+    try:
+        return generate_derivatives(name, storage, force), None
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        # Covers missing files and anything Pillow can't decode
+        logger.warning('Could not generate derivatives of %s: %s', name, e)
+        return 0, str(e)
+
+
+def generate_on_commit(field_file):
+    """Write the derivatives of a just-saved image once the transaction commits."""
+    if field_file:
+        name, storage = field_file.name, field_file.storage
+        transaction.on_commit(lambda: _generate_safely(name, storage))
+
+
+def _init_worker():
+    import django
+    django.setup()
+
+
+def _generate_in_worker(job):
+    name, force = job
+    return (name, *_generate_safely(name, force=force))
+
+
+def generate_many(names, force=False, processes=None):
+    """
+    Generate derivatives for ``names`` (default storage) in a process pool,
+    yielding ``(name, written, error)`` as each image finishes.
+    """
+    jobs = [(name, force) for name in names]
+    if processes == 1 or len(jobs) < 2:
+        yield from map(_generate_in_worker, jobs)
+        return
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker) as pool:
+        yield from pool.map(_generate_in_worker, jobs, chunksize=4)
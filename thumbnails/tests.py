@@ -0,0 +1,38 @@
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.test import SimpleTestCase
+from PIL import Image
+
+from .derivatives import derivative_names, generate_derivatives
+
+
+class DerivativeNameTests(SimpleTestCase):
+    def setUp(self):
+        self.location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.location)
+        self.storage = FileSystemStorage(location=self.location)
+
+    def save_image(self, name, color, pil_format):
+        buffer = BytesIO()
+        Image.new('RGB', (400, 300), color).save(buffer, pil_format)
+        return self.storage.save(name, ContentFile(buffer.getvalue()))
+
+    def test_same_stem_uploads_get_their_own_derivatives(self):
+        jpeg = self.save_image('menu_images/pizza.jpg', 'red', 'JPEG')
+        png = self.save_image('menu_images/pizza.png', 'blue', 'PNG')
+        self.assertEqual(
+            derivative_names(png)[320, 'webp'], 'menu_images/derivatives/pizza.png-320w.webp'
+        )
+        self.assertFalse(set(derivative_names(jpeg).values()) & set(derivative_names(png).values()))
+
+        self.assertEqual(generate_derivatives(jpeg, self.storage), 6)
+        # Not skipped as already generated
+        self.assertEqual(generate_derivatives(png, self.storage), 6)
+        with self.storage.open(derivative_names(png)[320, 'jpeg']) as derivative:
+            red, green, blue = Image.open(derivative).convert('RGB').getpixel((0, 0))
+        self.assertGreater(blue, 200)
+        self.assertLess(red, 50)